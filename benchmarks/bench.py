@@ -0,0 +1,247 @@
+# File: benchmarks/bench.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# Benchmark suite used to track the performance of feedgen over time. Each
+# benchmark case is run at several sizes (number of containers or items), and
+# for each run the following are reported:
+#    - throughput, in items per second (best of `--repeat` runs)
+#    - peak resident memory of the process running the case
+#    - peak memory traced by `tracemalloc` during the run
+#    - the number of memory blocks still live at the end of the run (while
+#      the case's result is held), which shows what a case retains rather
+#      than how many allocations it made
+# Only throughput is compared against the baseline; the memory figures are
+# reported for information.
+# Every (case, size) pair runs in its own process so that peak memory is not
+# polluted by earlier cases.
+#
+# Results can be saved as a baseline and later runs compared against it:
+#    python benchmarks/bench.py --save baseline.json
+#    python benchmarks/bench.py --compare baseline.json
+# The comparison exits with an error if any case is slower than the baseline
+# by more than `--tolerance`.
+# =============================================================================
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Update the path so that we pull from the current version of the code
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from feedgen.parsers import ParserResult, YahooNews
+from feedgen.testing import make_response, synthetic_page
+from feedgen.validators import RssValidator
+from feedgen.writers import JsonFeed, RssFeed
+
+# Sizes run for each case by default and with `--full`
+SIZES = {
+    'extract'            : ([10, 1000, 50000], [10, 1000, 50000]),
+    'rss_feed_str'       : ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+    'rss_write'          : ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+    'json_write_pretty'  : ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+    'json_write_compact' : ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+    'rss_validate'       : ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+    'rss_validate_stream': ([10, 1000, 100000], [10, 1000, 100000, 1000000]),
+}
+
+
+class PageTransport():
+    """ Transport that answers every request with the same page """
+
+    def __init__(self, body:bytes) -> None:
+        self.body = body
+
+    def get(self, url, params=None, headers=None, stream=False, parser_type=None):
+        return make_response(url, 200, {}, self.body, 'utf-8')
+
+
+def make_results(size:int) -> list:
+    """ Synthetic parsed results """
+    return [ParserResult(title   = f'Story {n}',
+                         link    = f'https://example.com/news/{n}',
+                         descrip = f'Synthetic result {n} for benchmarking',
+                         extras  = {'src_name': 'Example', 'src_url': 'https://example.com'})
+            for n in range(size)]
+
+
+def make_feeds() -> tuple:
+    rss = RssFeed(title='bench', link='https://example.com', descrip='Benchmark feed')
+    jsn = JsonFeed(title='bench', link='https://example.com', descrip='Benchmark feed')
+    return rss, jsn
+
+
+def setup_case(case:str, size:int, workdir:str):
+    """
+    Prepare a benchmark case
+
+    Returns
+    -------
+    Function that runs the case once
+    """
+    rss, jsn = make_feeds()
+    output   = os.path.join(workdir, 'output')
+
+    if case == 'extract':
+        page   = synthetic_page('yahoonews', 'bench', count=size)
+        parser = YahooNews(limit=size, transport=PageTransport(page))
+        parser.search_term('bench')
+
+        # All results are on the one page, so don't fetch any others
+        parser.offset_tag = None
+        return parser.parse_html
+
+    results = make_results(size)
+    if case == 'rss_feed_str':
+        return lambda: rss.feed_str(results)
+    elif case == 'rss_write':
+        return lambda: rss.write(results, output)
+    elif case == 'json_write_pretty':
+        return lambda: jsn.write(results, output, pretty_print=True)
+    elif case == 'json_write_compact':
+        return lambda: jsn.write(results, output, pretty_print=False)
+    elif case == 'rss_validate':
+        rss.write(results, output)
+        validator = RssValidator()
+        return lambda: validator.validate(output)
+    elif case == 'rss_validate_stream':
+        rss.write_stream(results, output)
+        validator = RssValidator()
+        return lambda: validator.validate_stream(output)
+
+    raise ValueError(f'Unknown benchmark case: {case}')
+
+
+def run_case(case:str, size:int, repeat:int) -> dict:
+    """
+    Run a single case in the current process
+
+    Returns
+    -------
+    Dictionary of measurements
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        func = setup_case(case, size, workdir)
+
+        # Timing runs, without tracing overhead
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+
+        # Allocation run
+        tracemalloc.start()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        live    = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+        del result
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_rss //= 1024
+
+    return {
+        'seconds'       : best,
+        'items_per_s'   : size / best if best > 0 else float('inf'),
+        'peak_rss_kb'   : peak_rss,
+        'peak_traced_kb': peak // 1024,
+        'live_blocks'   : live
+    }
+
+
+def run_all(cases:list, full:bool, repeat:int) -> dict:
+    """
+    Run each case and size in a separate process
+
+    Returns
+    -------
+    <'case:size', measurements> dictionary
+    """
+    report = {}
+    for case in cases:
+        for size in SIZES[case][1 if full else 0]:
+            # Large runs are slow enough that repeating them adds little
+            runs = repeat if size <= 10000 else 1
+            proc = subprocess.run([sys.executable, __file__, '--child', case, str(size), str(runs)],
+                                  stdout=subprocess.PIPE, check=True)
+            result = json.loads(proc.stdout)
+            report[f'{case}:{size}'] = result
+            print(f"{case:20s} {size:>8d}  {result['items_per_s']:>12,.0f} items/s  "
+                  f"rss {result['peak_rss_kb']/1024:>8.1f} MB  "
+                  f"traced {result['peak_traced_kb']/1024:>8.1f} MB  "
+                  f"live blocks {result['live_blocks']:>9d}", flush=True)
+
+    return report
+
+
+def compare(report:dict, baseline:dict, tolerance:float) -> bool:
+    """
+    Print the change of each result relative to the baseline
+
+    Returns
+    -------
+    True if no case regressed by more than `tolerance`
+    """
+    ok = True
+    print(f"\n{'case':29s} {'throughput':>10s} {'peak rss':>10s}")
+    for key,result in report.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f'{key:29s} {"(new)":>10s}')
+            continue
+
+        speed  = result['items_per_s'] / base['items_per_s'] - 1
+        memory = result['peak_rss_kb'] / base['peak_rss_kb'] - 1
+        flag   = ''
+        if speed < -tolerance:
+            flag = '  REGRESSION'
+            ok   = False
+        print(f'{key:29s} {speed:>+10.1%} {memory:>+10.1%}{flag}')
+
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the feedgen benchmark suite')
+    parser.add_argument('cases', nargs='*', default=list(SIZES),
+                        help=f"cases to run (default: all of {', '.join(SIZES)})")
+    parser.add_argument('--full', action='store_true',
+                        help='run the largest sizes (up to 1M items)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timing runs for each small case')
+    parser.add_argument('--save', metavar='FILE', help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results to a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed slowdown relative to the baseline (default: 0.1)')
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, size, repeat = args.child
+        print(json.dumps(run_case(case, int(size), int(repeat))))
+        sys.exit(0)
+
+    unknown = [case for case in args.cases if case not in SIZES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    report = run_all(args.cases, args.full, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as fl:
+            json.dump(report, fl, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as fl:
+            baseline = json.load(fl)
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,8 @@
+# File: feedgen/filters/__init__.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the imports and sets up the `feedgen.filters` submodule.
+# =============================================================================
+
+from .dedup     import Deduplicator, MinHashIndex, SimHashIndex, canonicalize_url, simhash
+from .seenstore import SeenStore
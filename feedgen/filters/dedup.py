@@ -0,0 +1,601 @@
+# File: feedgen/filters/dedup.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the duplicate detection stage used to merge results from
+# several sources (e.g. the same story returned by GoogleNews, BingNews and
+# YahooNews).
+#
+# Two results are considered duplicates if either:
+#    - their links are the same once canonicalized by `canonicalize_url()`,
+#      which unwraps search engine redirect links, strips tracking parameters
+#      and normalizes the host name
+#    - the SimHash fingerprints of their title and description differ by no
+#      more than a configurable number of bits
+#
+# Headlines of the same story that differ by a single word measure roughly
+# 4-12 bits apart, while unrelated headlines are rarely closer than 20 bits,
+# so results within `NEAR_DUPLICATE_DISTANCE` bits are treated as duplicates
+# by default. Across many thousands of results some unrelated fingerprints
+# still fall that close by chance, so `Deduplicator` confirms each match by
+# checking that the two results share most of their words. Results without
+# any words in their title or description are only compared by link.
+#
+# Fingerprints that far apart cannot be found by exact band matches on the
+# fingerprint itself without probing a large share of the stored results, so
+# `Deduplicator` looks up candidates with a `MinHashIndex` over the sets of
+# content words instead. Each set is summarized by the smallest hash of its
+# words under each of `num_bands * rows` hash functions; two sets agree on
+# each of these with a probability equal to their Jaccard similarity. The
+# signature is split into bands of `rows` values that must match exactly, so
+# headlines sharing all but a word or two agree on some band almost surely,
+# while unrelated headlines, which share few words once common stop words
+# are dropped, almost never do. A lookup costs one table access per band and
+# only compares the few results stored under the same band keys, however
+# many results are remembered. The exact `SimHashIndex` is kept for lookups
+# with small distances, where each band only needs to match exactly.
+#
+# The `Deduplicator` class combines both checks and bounds its memory use by
+# forgetting the oldest results once `max_size` results have been seen.
+# =============================================================================
+
+import hashlib
+import re
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable, Iterator, List
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+from ..parsers.parser import ParserResult
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    'ocid', 'cmpid', 'cmp', 'CMP', 'icid', 'ncid', 'ref', 'ref_src',
+    'referrer', 'taid', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+    'soc_src', 'soc_trk', 'smid', 'sr_share', 'at_medium', 'at_campaign',
+    'ito', 'traffic_source'
+}
+
+# Prefixes of query parameters that only track where a click came from
+TRACKING_PREFIXES = ('utm_', 'mkt_', 'pk_', 'hsa_', 'vero_', '_hs')
+
+# Parameters holding the destination of search engine redirect links
+REDIRECT_PARAMS = ('url', 'u', 'q', 'RU', 'target', 'dest')
+
+# Host name prefixes that serve the same content as the bare domain
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# Words used to build SimHash fingerprints
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Default maximum number of differing fingerprint bits between near-duplicates
+NEAR_DUPLICATE_DISTANCE = 12
+
+# Minimum fraction of the words of the shorter text that near-duplicates share
+MIN_WORD_OVERLAP = 0.5
+
+# Common words left out of word sets, since unrelated headlines share them
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'he', 'her', 'his', 'in', 'is', 'it', 'its', 'of', 'on', 'or',
+    's', 'she', 'that', 'the', 'their', 'they', 'this', 'to', 'was', 'were',
+    'will', 'with'
+}
+
+
+def canonicalize_url(url:str) -> str:
+    """
+    Normalize a URL so that links to the same article compare equal
+
+    Parameters
+    ----------
+    url : `str`
+        URL to be normalized
+
+    Returns
+    -------
+    Canonical form of the URL
+    """
+    if not url:
+        return url
+
+    parts = urlsplit(url.strip())
+
+    # Yahoo redirects embed the destination in the path ('/RU=<url>/RK=...')
+    if parts.path.find('/RU=') >= 0:
+        target = parts.path.split('/RU=', 1)[1].split('/R', 1)[0]
+        return canonicalize_url(unquote(target))
+
+    # Other redirect links pass the destination as a query parameter
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for name,value in query:
+        if name in REDIRECT_PARAMS and value.startswith(('http://', 'https://')):
+            return canonicalize_url(value)
+
+    # Normalize the host
+    host = (parts.hostname or '').lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    port = parts.port
+    if port is not None and port not in (80, 443):
+        host += f':{port}'
+
+    # Drop tracking parameters and sort the rest
+    query = sorted((name, value) for name,value in query
+                   if name not in TRACKING_PARAMS and
+                      not name.lower().startswith(TRACKING_PREFIXES))
+
+    path = parts.path.rstrip('/') or '/'
+    if path.endswith(('/amp', '.amp')):
+        path = path[:-4] or '/'
+
+    # Both schemes serve the same article
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+# Translation from a string of '0'/'1' characters to bytes of 0/1
+TO_LANES = bytes.maketrans(b'01', b'\x00\x01')
+
+# Maximum number of features counted in a fingerprint, since each bit count is
+# accumulated in a single byte
+MAX_FEATURES = 255
+
+
+@lru_cache(maxsize=65536)
+def feature_lanes(feature:str) -> int:
+    """
+    Hash a feature to 64 bits and spread each bit into its own byte, so that
+    summing the results of many features counts how often each bit is set.
+    Results are cached since the same words appear in many headlines.
+
+    Returns
+    -------
+    512-bit integer with one byte (0 or 1) per hash bit
+    """
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+    bits   = format(int.from_bytes(digest, 'big'), '064b').encode('ascii')
+    return int.from_bytes(bits.translate(TO_LANES), 'big')
+
+
+@lru_cache(maxsize=MAX_FEATURES + 1)
+def majority_table(num_features:int) -> bytes:
+    """
+    Returns
+    -------
+    Translation table that maps a bit count to '1' if the bit was set for
+    most of the features, or to '0' otherwise
+    """
+    return bytes(ord('1') if 2 * count > num_features else ord('0')
+                 for count in range(256))
+
+
+@lru_cache(maxsize=64)
+def probe_masks(width:int, radius:int) -> List[int]:
+    """
+    Returns
+    -------
+    Every `width`-bit mask with at most `radius` bits set
+    """
+    masks = []
+    for num_bits in range(radius + 1):
+        for bits in combinations(range(width), num_bits):
+            masks.append(sum(1 << bit for bit in bits))
+
+    return masks
+
+
+def word_set(text:str) -> bytes:
+    """
+    Returns
+    -------
+    Compact set of the words in some text, as sorted 32-bit word hashes.
+    Stop words are left out unless the text has no other words.
+    """
+    words = set(WORD_RE.findall(text.lower()))
+    words = words.difference(STOP_WORDS) or words
+    hashes = sorted(hash(word) & 0xffffffff for word in words)
+    return array('I', hashes).tobytes()
+
+
+def word_overlap(first:bytes, second:bytes) -> float:
+    """
+    Returns
+    -------
+    Fraction of the words of the smaller of two `word_set()` results that
+    are also in the other
+    """
+    first  = array('I', first)
+    second = array('I', second)
+    if len(first) == 0 or len(second) == 0:
+        return 0.0
+
+    return len(set(first).intersection(second)) / min(len(first), len(second))
+
+
+def simhash(text:str, ngram:int=1) -> int:
+    """
+    Compute a 64-bit SimHash fingerprint of some text. Texts that share most
+    of their words have fingerprints that differ in only a few bits.
+
+    Parameters
+    ----------
+    text : `str`
+        Text to be fingerprinted
+    ngram : `int` (default=1)
+        Number of consecutive words combined into each feature. Single words
+        work best for short texts such as headlines.
+
+    Returns
+    -------
+    Fingerprint of the text
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) >= ngram:
+        features = [' '.join(words[i:i+ngram]) for i in range(len(words) - ngram + 1)]
+    else:
+        features = words
+
+    features = features[:MAX_FEATURES]
+    if len(features) == 0:
+        return 0
+
+    # Each bit of the fingerprint is set if most feature hashes have it set.
+    # The counts for all 64 bits are summed at once, one per byte.
+    counts = sum(feature_lanes(feature) for feature in features)
+    votes  = counts.to_bytes(64, 'big').translate(majority_table(len(features)))
+    return int(votes, 2)
+
+
+class SimHashIndex():
+    """
+    Index of SimHash fingerprints supporting near-duplicate lookups
+    """
+
+    def __init__(self, max_distance:int=NEAR_DUPLICATE_DISTANCE, num_bands:int=None) -> None:
+        """
+        Parameters
+        ----------
+        max_distance : `int` (default=NEAR_DUPLICATE_DISTANCE)
+            Maximum number of differing bits for two fingerprints to be
+            considered near-duplicates
+        num_bands : `int` (default=None)
+            Number of bands the fingerprints are split into. Fewer, wider
+            bands compare fewer fingerprints but probe more values per
+            lookup. Defaults to `max_distance + 1` bands, which only need to
+            match exactly, for small distances and to 5 bands otherwise.
+        """
+        self.max_distance = max_distance
+
+        if num_bands is None:
+            num_bands = min(max_distance + 1, 5)
+
+        # Some band of a near-duplicate differs in at most `radius` bits
+        self.radius = max_distance // num_bands
+
+        band_width = 64 // num_bands
+        self.bands = []
+        for band in range(num_bands):
+            start = band * band_width
+            width = band_width if band < num_bands - 1 else 64 - start
+            self.bands.append((start, (1 << width) - 1, probe_masks(width, self.radius)))
+
+        # <band value, {key: fingerprint}> table for each band
+        self.tables = [{} for _ in self.bands]
+        self.fingerprints = {}
+
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+
+    def band_values(self, fingerprint:int) -> List[int]:
+        """
+        Returns
+        -------
+        Value of each band of a fingerprint
+        """
+        return [fingerprint >> start & mask for start,mask,_ in self.bands]
+
+
+    def add(self, key:object, fingerprint:int) -> None:
+        """
+        Add a fingerprint to the index
+
+        Parameters
+        ----------
+        key : `object`
+            Hashable key identifying the fingerprint
+        fingerprint : `int`
+            Fingerprint returned by `simhash()`
+        """
+        self.remove(key)
+        self.fingerprints[key] = fingerprint
+        for table,value in zip(self.tables, self.band_values(fingerprint)):
+            table.setdefault(value, {})[key] = fingerprint
+
+
+    def remove(self, key:object) -> None:
+        """
+        Remove a fingerprint from the index, if present
+        """
+        fingerprint = self.fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+
+        for table,value in zip(self.tables, self.band_values(fingerprint)):
+            entries = table[value]
+            del entries[key]
+            if len(entries) == 0:
+                del table[value]
+
+
+    def candidates(self, fingerprint:int) -> Iterator[object]:
+        """
+        Lazily find the near-duplicates of a fingerprint
+
+        Parameters
+        ----------
+        fingerprint : `int`
+            Fingerprint returned by `simhash()`
+
+        Returns
+        -------
+        Iterator over the keys of stored fingerprints within `max_distance`
+        bits. A key may be repeated.
+        """
+        for table,(start,mask,probes) in zip(self.tables, self.bands):
+            value = fingerprint >> start & mask
+
+            # Probe the nearby band values, or scan the band's values if
+            # there are fewer of them
+            if len(table) <= len(probes):
+                matches = [entries for other,entries in table.items()
+                           if bin(value ^ other).count('1') <= self.radius]
+            else:
+                matches = [table[value ^ probe] for probe in probes
+                           if value ^ probe in table]
+
+            for entries in matches:
+                for key,other in entries.items():
+                    if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                        yield key
+
+
+    def find(self, fingerprint:int) -> object:
+        """
+        Look for a near-duplicate of a fingerprint
+
+        Parameters
+        ----------
+        fingerprint : `int`
+            Fingerprint returned by `simhash()`
+
+        Returns
+        -------
+        Key of a stored fingerprint within `max_distance` bits, or None
+        """
+        return next(self.candidates(fingerprint), None)
+
+
+class MinHashIndex():
+    """
+    Locality-sensitive index of word sets supporting near-duplicate lookups
+    """
+
+    def __init__(self, num_bands:int=16, rows:int=4, seed:int=0) -> None:
+        """
+        Parameters
+        ----------
+        num_bands : `int` (default=16)
+            Number of bands the MinHash signatures are split into. More
+            bands find less similar word sets at the cost of a larger index.
+        rows : `int` (default=4)
+            Number of signature values in each band. More rows make each
+            band key more selective, so fewer unrelated sets are compared.
+        seed : `int` (default=0)
+            Seed of the hash functions
+        """
+        self.num_bands = num_bands
+        self.rows      = rows
+        self.salt      = seed.to_bytes(8, 'little')
+
+        # <band key, {key: None}> table for each band
+        self.tables = [{} for _ in range(num_bands)]
+        self.band_keys = {}
+
+
+    def __len__(self) -> int:
+        return len(self.band_keys)
+
+
+    def signature(self, words:bytes) -> List[int]:
+        """
+        Returns
+        -------
+        Key of each band of the MinHash signature of a `word_set()` result
+        """
+        # Every hash function is applied to a word at once by drawing one
+        # 32-bit value per function from an extendable-output hash of it
+        size   = 4 * self.num_bands * self.rows
+        hashes = [array('I', hashlib.shake_128(self.salt + words[start:start+4]).digest(size))
+                  for start in range(0, len(words), 4)]
+        mins   = list(map(min, zip(*hashes)))
+        return [hash(tuple(mins[start:start+self.rows]))
+                for start in range(0, len(mins), self.rows)]
+
+
+    def add(self, key:object, words:bytes) -> None:
+        """
+        Add a word set to the index
+
+        Parameters
+        ----------
+        key : `object`
+            Hashable key identifying the word set
+        words : `bytes`
+            Non-empty word set returned by `word_set()`
+        """
+        self.remove(key)
+        band_keys = self.signature(words)
+        self.band_keys[key] = band_keys
+        for table,band_key in zip(self.tables, band_keys):
+            table.setdefault(band_key, {})[key] = None
+
+
+    def remove(self, key:object) -> None:
+        """
+        Remove a word set from the index, if present
+        """
+        band_keys = self.band_keys.pop(key, None)
+        if band_keys is None:
+            return
+
+        for table,band_key in zip(self.tables, band_keys):
+            entries = table[band_key]
+            del entries[key]
+            if len(entries) == 0:
+                del table[band_key]
+
+
+    def candidates(self, words:bytes) -> Iterator[object]:
+        """
+        Lazily find the likely near-duplicates of a word set
+
+        Parameters
+        ----------
+        words : `bytes`
+            Non-empty word set returned by `word_set()`
+
+        Returns
+        -------
+        Iterator over the keys of stored word sets that match the query in
+        at least one band. Each key is returned once.
+        """
+        found = set()
+        for table,band_key in zip(self.tables, self.signature(words)):
+            for key in table.get(band_key, ()):
+                if key not in found:
+                    found.add(key)
+                    yield key
+
+
+class Deduplicator():
+    """
+    Filters duplicate results out of a stream of parsed results
+    """
+
+    def __init__(self, threshold:float=None, max_size:int=100000,
+                       use_content:bool=True) -> None:
+        """
+        Parameters
+        ----------
+        threshold : `float` (default=None)
+            Fraction of matching fingerprint bits above which the title and
+            description of two results are considered the same story. Use
+            1.0 to only match identical text. By default fingerprints within
+            `NEAR_DUPLICATE_DISTANCE` bits match (a threshold of about 0.8).
+        max_size : `int` (default=100000)
+            Maximum number of results remembered. The oldest are forgotten
+            first, which bounds memory use in long-running processes.
+        use_content : `bool` (default=True)
+            Compare titles and descriptions. If False, only canonical links
+            are compared.
+        """
+        self.max_size    = max_size
+        self.use_content = use_content
+
+        if threshold is None:
+            self.max_distance = NEAR_DUPLICATE_DISTANCE
+        else:
+            self.max_distance = int(round((1.0 - threshold) * 64))
+        self.index = MinHashIndex()
+
+        # Canonical links of the remembered results, oldest first
+        self.links = OrderedDict()
+        self.count = 0
+
+        # <key, (fingerprint, word set)> of the remembered results, to
+        # confirm the candidates found by the index
+        self.texts = {}
+
+
+    def fingerprint(self, result:ParserResult) -> int:
+        """
+        Returns
+        -------
+        SimHash fingerprint of the title and description of a result, or
+        None if they contain no words
+        """
+        text = f'{result.title or ""} {result.descrip or ""}'
+        if WORD_RE.search(text) is None:
+            return None
+
+        return simhash(text)
+
+
+    def is_duplicate(self, result:ParserResult) -> bool:
+        """
+        Check a result against the results seen so far, and remember it if
+        it's new
+
+        Parameters
+        ----------
+        result : `ParserResult`
+            Result to be checked
+
+        Returns
+        -------
+        True if the result duplicates one that has already been seen
+        """
+        link = canonicalize_url(result.link)
+        if link in self.links:
+            return True
+
+        fingerprint = None
+        if self.use_content:
+            fingerprint = self.fingerprint(result)
+
+        if fingerprint is not None:
+            words = word_set(f'{result.title or ""} {result.descrip or ""}')
+            for key in self.index.candidates(words):
+                other,other_words = self.texts[key]
+                if bin(fingerprint ^ other).count('1') <= self.max_distance and \
+                   word_overlap(words, other_words) >= MIN_WORD_OVERLAP:
+                    return True
+
+        # Remember the result, forgetting the oldest if needed
+        self.count += 1
+        self.links[link] = self.count
+        if fingerprint is not None:
+            self.index.add(self.count, words)
+            self.texts[self.count] = (fingerprint, words)
+
+        while len(self.links) > self.max_size:
+            _,key = self.links.popitem(last=False)
+            self.index.remove(key)
+            self.texts.pop(key, None)
+
+        return False
+
+
+    def filter(self, results:Iterable[ParserResult]) -> Iterator[ParserResult]:
+        """
+        Lazily remove duplicates from a stream of results. The first result
+        of each story is kept.
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be filtered
+
+        Returns
+        -------
+        Iterator over unique results
+        """
+        for result in results:
+            if not self.is_duplicate(result):
+                yield result
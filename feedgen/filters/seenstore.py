@@ -0,0 +1,287 @@
+# File: feedgen/filters/seenstore.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the `SeenStore` class, a persistent record of the results
+# that have already been published. When the same queries are polled over and
+# over, most of the returned results have been seen before, and the store lets
+# a parser yield only the new ones so writers and downstream consumers never
+# pay for items that were already handled.
+#
+# The store is a single SQLite table. Each result is keyed by a 64-bit hash of
+# its source and canonicalized link (see `canonicalize_url()`), stored as the
+# table's INTEGER PRIMARY KEY so lookups use the rowid B-tree directly and the
+# database stays small with millions of keys. Lookups and inserts are done in
+# batches, and entries older than the time-to-live are ignored and can be
+# purged with `expire()` or `vacuum()`.
+#
+# `filter()` never holds results back waiting for a batch to fill: the first
+# result is looked up on its own and the batches grow from there. A result is
+# only marked as seen once the consumer has taken it and come back for the
+# next one, so results lost to a failing consumer are returned again on the
+# next run. Callers that need a result to be marked only after it has been
+# written can filter with `mark=False` and `add()` the results afterwards.
+# =============================================================================
+
+import hashlib
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Set
+
+from ..parsers.parser import ParserResult
+from .dedup import canonicalize_url
+
+
+class SeenStore():
+    """
+    SQLite-backed store of previously seen results
+    """
+
+    # Maximum number of keys in a single SQL statement (SQLite's default
+    # limit on bound parameters is 999 for older versions)
+    MAX_VARIABLES = 500
+
+    def __init__(self, filename:str, ttl:float=None, batch_size:int=100) -> None:
+        """
+        Parameters
+        ----------
+        filename : `str`
+            Name of the SQLite database file. It is created if it does not
+            exist. Use ':memory:' for a store that is not persisted.
+        ttl : `float` (default=None)
+            Number of seconds a result is remembered for. Results are kept
+            forever if None.
+        batch_size : `int` (default=100)
+            Number of results checked at a time by `filter()`
+        """
+        self.filename   = filename
+        self.ttl        = ttl
+        self.batch_size = batch_size
+
+        # Parsers may share a store across threads, so calls are serialized
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS seen ('
+                              'key INTEGER PRIMARY KEY, '
+                              'seen_at REAL NOT NULL)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS seen_at_idx ON seen (seen_at)')
+            self.conn.commit()
+
+
+    def __enter__(self) -> 'SeenStore':
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+
+    @staticmethod
+    def key(result:ParserResult) -> int:
+        """
+        Returns
+        -------
+        Signed 64-bit key identifying a result by its source and canonical link
+        """
+        source = result.extras.get('src_name') or ''
+        text   = f'{source}\0{canonicalize_url(result.link)}'
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+
+
+    def cutoff(self) -> float:
+        """
+        Returns
+        -------
+        Time before which entries have expired
+        """
+        if self.ttl is None:
+            return float('-inf')
+
+        return time.time() - self.ttl
+
+
+    def seen_keys(self, keys:Iterable[int]) -> Set[int]:
+        """
+        Look up many keys at once
+
+        Parameters
+        ----------
+        keys : `Iterable[int]`
+            Keys returned by `key()`
+
+        Returns
+        -------
+        Subset of `keys` that are in the store and have not expired
+        """
+        keys   = list(keys)
+        cutoff = self.cutoff()
+        found  = set()
+        with self.lock:
+            for start in range(0, len(keys), self.MAX_VARIABLES):
+                chunk = keys[start:start+self.MAX_VARIABLES]
+                query = ('SELECT key FROM seen WHERE seen_at >= ? AND key IN '
+                         f'({",".join("?" * len(chunk))})')
+                found.update(row[0] for row in self.conn.execute(query, [cutoff, *chunk]))
+
+        return found
+
+
+    def add_keys(self, keys:Iterable[int]) -> None:
+        """
+        Record many keys at once. Keys already in the store have their
+        timestamp refreshed.
+
+        Parameters
+        ----------
+        keys : `Iterable[int]`
+            Keys returned by `key()`
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO seen (key, seen_at) VALUES (?, ?)',
+                                  ((key, now) for key in keys))
+            self.conn.commit()
+
+
+    def seen(self, results:Iterable[ParserResult]) -> List[bool]:
+        """
+        Check whether each of a batch of results has been seen
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be checked
+
+        Returns
+        -------
+        List with True for each result already in the store
+        """
+        keys  = [self.key(result) for result in results]
+        found = self.seen_keys(keys)
+        return [key in found for key in keys]
+
+
+    def add(self, results:Iterable[ParserResult]) -> None:
+        """
+        Record a batch of results as seen
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be recorded
+        """
+        self.add_keys(self.key(result) for result in results)
+
+
+    def filter(self, results:Iterable[ParserResult], mark:bool=True) -> Iterator[ParserResult]:
+        """
+        Lazily remove previously seen results from a stream of results.
+        The first result is checked on its own so it is passed on straight
+        away, and the batches then double in size up to `batch_size`.
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be filtered
+        mark : `bool` (default=True)
+            Record each unseen result as seen once the consumer has taken it
+            and asked for the next one. Results that are never taken, such as
+            the last one yielded before the iterator is closed or the consumer
+            fails, stay unseen. Set to False to call `add()` once the results
+            have been published.
+
+        Returns
+        -------
+        Iterator over results that have not been seen before
+        """
+        results = iter(results)
+        size    = 1
+        taken   = []
+        fresh   = set()
+        try:
+            while True:
+                batch = list(islice(results, size))
+                if len(batch) == 0:
+                    break
+                size = min(size * 2, self.batch_size)
+
+                # Mark the results handed over so far before looking further
+                if len(taken) > 0:
+                    self.add_keys(taken)
+                    taken = []
+
+                keys  = [self.key(result) for result in batch]
+                found = self.seen_keys(keys)
+                for key,result in zip(keys, batch):
+                    # Also skip repeats within the stream
+                    if key in found or key in fresh:
+                        continue
+
+                    fresh.add(key)
+                    yield result
+                    if mark:
+                        taken.append(key)
+
+        finally:
+            if len(taken) > 0:
+                self.add_keys(taken)
+
+
+    def expire(self) -> int:
+        """
+        Delete the entries older than the time-to-live
+
+        Returns
+        -------
+        Number of deleted entries
+        """
+        if self.ttl is None:
+            return 0
+
+        with self.lock:
+            cursor = self.conn.execute('DELETE FROM seen WHERE seen_at < ?', (self.cutoff(),))
+            self.conn.commit()
+
+        return cursor.rowcount
+
+
+    def vacuum(self) -> int:
+        """
+        Delete expired entries and compact the database file
+
+        Returns
+        -------
+        Number of deleted entries
+        """
+        deleted = self.expire()
+        with self.lock:
+            self.conn.execute('VACUUM')
+
+        return deleted
+
+
+    def clear(self) -> None:
+        """
+        Forget every result
+        """
+        with self.lock:
+            self.conn.execute('DELETE FROM seen')
+            self.conn.commit()
+
+
+    def close(self) -> None:
+        """
+        Close the database connection
+        """
+        with self.lock:
+            self.conn.close()
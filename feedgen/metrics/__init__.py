@@ -0,0 +1,8 @@
+# File: feedgen/metrics/__init__.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the imports and sets up the `feedgen.metrics` submodule.
+# =============================================================================
+
+from .hooks      import Metrics, MetricsHook, Timer, metrics
+from .prometheus import PrometheusExporter
@@ -0,0 +1,274 @@
+# File: feedgen/metrics/hooks.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the instrumentation surface of the feed pipeline. Parsers,
+# writers and the validator report to the process-wide `metrics` object:
+#    - stage timings (`timer()`): 'fetch', 'parse', 'extract', 'serialize' and
+#      'validate', labelled by parser type or writer
+#    - counters (`count()`): bytes fetched and written, items extracted and
+#      written, and errors raised in each stage
+#
+# Writers pull their entries from upstream iterators such as
+# `Parser.iter_results()`, so the time spent producing each entry (and any
+# error raised upstream) is left out of the 'serialize' timer with `untimed()`.
+#
+# Metrics are passed on to hooks (see `MetricsHook`) such as the Prometheus
+# exporter. While no hooks are registered `metrics.enabled` is False and every
+# call returns straight away, so instrumentation costs next to nothing.
+# =============================================================================
+
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+
+class MetricsHook():
+    """
+    Base class for receivers of pipeline metrics. Subclasses override the
+    methods for the events they are interested in.
+    """
+
+    def observe(self, stage:str, seconds:float, labels:dict) -> None:
+        """
+        Called with the time spent in a stage
+
+        Parameters
+        ----------
+        stage : `str`
+            Name of the pipeline stage (e.g. 'fetch')
+        seconds : `float`
+            Time spent in the stage
+        labels : `dict`
+            Labels of the measurement (e.g. {'parser': 'googlenews'})
+        """
+        pass
+
+
+    def count(self, name:str, value:float, labels:dict) -> None:
+        """
+        Called when a counter is incremented
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the counter (e.g. 'bytes_fetched')
+        value : `float`
+            Amount added to the counter
+        labels : `dict`
+            Labels of the counter
+        """
+        pass
+
+
+class Timer():
+    """
+    Context manager that reports the time spent in a stage. Errors raised
+    inside the block are counted against the stage.
+    """
+
+    __slots__ = ('metrics', 'stage', 'labels', 'start', 'excluded', 'upstream_error')
+
+    def __init__(self, metrics:'Metrics', stage:str, labels:dict) -> None:
+        self.metrics = metrics
+        self.stage   = stage
+        self.labels  = labels
+        self.start   = None
+
+        # Time spent in, and error raised by, iterators wrapped by `untimed()`
+        self.excluded       = 0.0
+        self.upstream_error = None
+
+
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.start - self.excluded
+        self.metrics.observe(self.stage, elapsed, **self.labels)
+        if exc_type is not None and exc is not self.upstream_error:
+            self.metrics.count('errors', 1, stage=self.stage, **self.labels)
+
+
+class NullTimer():
+    """
+    Timer used while metrics are disabled
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> 'NullTimer':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics():
+    """
+    Dispatcher of pipeline metrics to the registered hooks
+    """
+
+    def __init__(self) -> None:
+        self.hooks   = []
+        self.enabled = False
+        self.lock    = threading.Lock()
+
+
+    def add_hook(self, hook:MetricsHook) -> MetricsHook:
+        """
+        Register a hook, enabling metrics
+
+        Parameters
+        ----------
+        hook : `MetricsHook`
+            Receiver of the metrics
+
+        Returns
+        -------
+        The registered hook
+        """
+        with self.lock:
+            self.hooks = self.hooks + [hook]
+            self.enabled = True
+
+        return hook
+
+
+    def remove_hook(self, hook:MetricsHook) -> None:
+        """
+        Unregister a hook. Metrics are disabled once no hooks remain.
+        """
+        with self.lock:
+            self.hooks = [other for other in self.hooks if other is not hook]
+            self.enabled = len(self.hooks) > 0
+
+
+    def timer(self, stage:str, **labels) -> Timer:
+        """
+        Time a stage of the pipeline
+
+        Parameters
+        ----------
+        stage : `str`
+            Name of the stage
+        labels
+            Labels of the measurement
+
+        Returns
+        -------
+        Context manager that times the enclosed block
+        """
+        if not self.enabled:
+            return NULL_TIMER
+
+        return Timer(self, stage, labels)
+
+
+    def observe(self, stage:str, seconds:float, **labels) -> None:
+        """
+        Report the time spent in a stage
+        """
+        if not self.enabled:
+            return
+
+        for hook in self.hooks:
+            hook.observe(stage, seconds, labels)
+
+
+    def count(self, name:str, value:float=1, **labels) -> None:
+        """
+        Increment a counter
+        """
+        if not self.enabled:
+            return
+
+        for hook in self.hooks:
+            hook.count(name, value, labels)
+
+
+    def counted(self, items:Iterable[Any], name:str, measure:Callable[[Any],float]=None,
+                      **labels) -> Iterable[Any]:
+        """
+        Count the items pulled from an iterable
+
+        Parameters
+        ----------
+        items : `Iterable`
+            Items to be counted
+        name : `str`
+            Name of the counter
+        measure : `Callable` (default=None)
+            Amount each item adds to the counter (e.g. `len` to count bytes).
+            Each item counts as one by default.
+        labels
+            Labels of the counter
+
+        Returns
+        -------
+        Iterable over the same items. The count is reported once the
+        iterable is exhausted or closed.
+        """
+        if not self.enabled:
+            return items
+
+        return self._counted(items, name, measure, labels)
+
+
+    def untimed(self, items:Iterable[Any], timer:Timer) -> Iterable[Any]:
+        """
+        Leave the time spent pulling items from an iterable out of a timer
+
+        Parameters
+        ----------
+        items : `Iterable`
+            Items produced by an earlier stage (e.g. `Parser.iter_results()`)
+        timer : `Timer`
+            Timer of the stage consuming the items, as returned by `timer()`
+
+        Returns
+        -------
+        Iterable over the same items. Errors raised by `items` are not counted
+        against the timer's stage.
+        """
+        if timer is NULL_TIMER:
+            return items
+
+        return self._untimed(items, timer)
+
+
+    @staticmethod
+    def _untimed(items:Iterable[Any], timer:Timer) -> Iterator[Any]:
+        items = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            except BaseException as e:
+                timer.upstream_error = e
+                raise
+            finally:
+                timer.excluded += time.perf_counter() - start
+
+            yield item
+
+
+    def _counted(self, items:Iterable[Any], name:str, measure:Callable[[Any],float],
+                       labels:dict) -> Iterator[Any]:
+        total = 0
+        try:
+            for item in items:
+                total += 1 if measure is None else measure(item)
+                yield item
+        finally:
+            self.count(name, total, **labels)
+
+
+# Process-wide metrics reported by the pipeline
+metrics = Metrics()
@@ -0,0 +1,164 @@
+# File: feedgen/metrics/prometheus.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the PrometheusExporter class, a metrics hook that aggregates
+# pipeline metrics and renders them in the Prometheus text exposition format:
+#    - stage timings become the `feedgen_stage_seconds` summary (count and sum)
+#    - counters become `feedgen_<name>_total` counters
+# The text can be written to a file for the node exporter's textfile
+# collector, or served over HTTP with `serve()`.
+# =============================================================================
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from .hooks import MetricsHook
+
+
+class PrometheusExporter(MetricsHook):
+    """
+    Metrics hook that exposes metrics in the Prometheus text format
+    """
+
+    def __init__(self, namespace:str='feedgen') -> None:
+        """
+        Parameters
+        ----------
+        namespace : `str` (default='feedgen')
+            Prefix of every metric name
+        """
+        self.namespace = namespace
+
+        # <(stage, labels), [count, total seconds]> timings
+        self.timings = {}
+
+        # <(name, labels), total> counters
+        self.counters = {}
+
+        self.lock   = threading.Lock()
+        self.server = None
+
+
+    @staticmethod
+    def label_key(labels:dict) -> Tuple[Tuple[str,str],...]:
+        return tuple(sorted((name, str(value)) for name,value in labels.items()))
+
+
+    def observe(self, stage:str, seconds:float, labels:dict) -> None:
+        key = (stage, self.label_key(labels))
+        with self.lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                timing = self.timings[key] = [0, 0.0]
+            timing[0] += 1
+            timing[1] += seconds
+
+
+    def count(self, name:str, value:float, labels:dict) -> None:
+        key = (name, self.label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    @staticmethod
+    def format_labels(labels:Tuple[Tuple[str,str],...]) -> str:
+        """
+        Returns
+        -------
+        Labels in the exposition format (e.g. '{parser="googlenews"}')
+        """
+        if len(labels) == 0:
+            return ''
+
+        def escape(value:str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        return '{' + ','.join(f'{name}="{escape(value)}"' for name,value in labels) + '}'
+
+
+    def render(self) -> str:
+        """
+        Returns
+        -------
+        All metrics in the Prometheus text exposition format
+        """
+        with self.lock:
+            timings  = sorted(self.timings.items())
+            counters = sorted(self.counters.items())
+
+        lines = []
+        if len(timings) > 0:
+            name = f'{self.namespace}_stage_seconds'
+            lines.append(f'# HELP {name} Time spent in each stage of the feed pipeline')
+            lines.append(f'# TYPE {name} summary')
+            for (stage,labels),(count,total) in timings:
+                label_str = self.format_labels((('stage', stage),) + labels)
+                lines.append(f'{name}_count{label_str} {count}')
+                lines.append(f'{name}_sum{label_str} {total:.9g}')
+
+        previous = None
+        for (counter,labels),total in counters:
+            name = f'{self.namespace}_{counter}_total'
+            if counter != previous:
+                lines.append(f'# TYPE {name} counter')
+                previous = counter
+            lines.append(f'{name}{self.format_labels(labels)} {total:.9g}')
+
+        return '\n'.join(lines) + '\n'
+
+
+    def write(self, filename:str) -> None:
+        """
+        Write the metrics to a file, e.g. for the node exporter's textfile
+        collector. The file is replaced atomically.
+        """
+        tmp_file = filename + '.tmp'
+        with open(tmp_file, 'w') as fl:
+            fl.write(self.render())
+        os.replace(tmp_file, filename)
+
+
+    def serve(self, port:int=9464, host:str='') -> ThreadingHTTPServer:
+        """
+        Serve the metrics over HTTP from a background thread
+
+        Parameters
+        ----------
+        port : `int` (default=9464)
+            Port to listen on
+        host : `str` (default='')
+            Address to listen on. All interfaces by default.
+
+        Returns
+        -------
+        The running HTTP server
+        """
+        exporter = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='feedgen-metrics',
+                         daemon=True).start()
+        return self.server
+
+
+    def reset(self) -> None:
+        """
+        Clear all collected metrics
+        """
+        with self.lock:
+            self.timings  = {}
+            self.counters = {}
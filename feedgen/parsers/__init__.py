@@ -4,8 +4,18 @@
 # This file defines the imports and sets up the `feedgen.parsers` submodule.
 # =============================================================================
 
-from .parser     import Parser, ParserResult, SearchParser, TagConfig
+from .parser     import Parser, ParserResult, SearchParser, SiteSearchParser, TagConfig
 from .parser     import CSSInnerText, CSSAttribute
 from .googlenews import GoogleNews
 from .bingnews   import BingNews
 from .yahoonews  import YahooNews
+from .fanout     import ParserGroup, GroupResult
+from .aio        import AsyncTransport, gather_parsers
+from .transport  import HttpTransport, get_default_transport, set_default_transport
+from .ratelimit  import DEFAULT_LIMITS, RateLimiter, RetryPolicy, TokenBucket, rate_limiter
+from .cache      import HttpCache
+from .selectors  import CompiledSelector, SelectorCache, selector_cache
+from .plan       import ExtractionPlan
+from .profiler   import ProfileReport, SelectorProfile, SelectorProfiler, explain
+from .batch      import ResultBatch, MISSING
+from .offline    import extract_offline, iter_offline, register_parser
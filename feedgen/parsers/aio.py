@@ -0,0 +1,210 @@
+# File: feedgen/parsers/aio.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the AsyncTransport class, which fetches pages for parsers from
+# within an asyncio event loop. When the optional `aiohttp` module is installed
+# pages are fetched natively on the event loop. Otherwise each request is run
+# on the parser's blocking transport (the shared pooled transport by default)
+# in the loop's default executor so that the loop is never blocked.
+#
+# Requests wait on the same per-host rate limits as the blocking transport,
+# and throttled or failing responses (429, 5xx) are retried with the same
+# `RetryPolicy`, honouring `Retry-After` and pausing the host's bucket.
+# `request()` gives parsers the response itself, so that they can send
+# conditional requests for cached pages and read the status and headers.
+#
+# File defines the `gather_parsers()` helper, which runs many parsers on the
+# event loop while limiting the number of queries in flight at once.
+# =============================================================================
+
+import asyncio
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List
+
+from .ratelimit import RateLimiter, RetryPolicy, rate_limiter
+from .transport import HttpTransport, get_default_transport
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncTransport():
+    """
+    Asynchronous transport used to fetch pages for parsers
+    """
+
+    def __init__(self, timeout:float=30.0, limiter:RateLimiter=None,
+                       retry_policy:RetryPolicy=None) -> None:
+        """
+        Parameters
+        ----------
+        timeout : `float` (default=30.0)
+            Total number of seconds to wait on a single request when using
+            `aiohttp`. The fallback uses the timeouts of the shared transport.
+        limiter : `RateLimiter` (default=None)
+            Per-host rate limiter. By default the process-wide `rate_limiter`
+            is shared with all other transports.
+        retry_policy : `RetryPolicy` (default=None)
+            Policy for retrying throttled or failing responses when using
+            `aiohttp`. The fallback uses the policy of the shared transport.
+        """
+        self.timeout      = timeout
+        self.session      = None
+        self.limiter      = rate_limiter if limiter is None else limiter
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+
+
+    async def __aenter__(self) -> 'AsyncTransport':
+        return self
+
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+    @property
+    def native(self) -> bool:
+        """
+        True if pages are fetched natively on the event loop with `aiohttp`
+        """
+        return aiohttp is not None
+
+
+    @asynccontextmanager
+    async def request(self, url:str, params:dict, headers:dict=None,
+                            parser_type:str=None) -> AsyncIterator[Any]:
+        """
+        Submit a GET request with `aiohttp`, waiting on the host's rate limit
+        and retrying throttled or failing responses
+
+        Parameters
+        ----------
+        url : `str`
+            URL to be queried
+        params : `dict`
+            Query parameters to pass with the URL
+        headers : `dict` (default=None)
+            Extra request headers
+        parser_type : `str` (default=None)
+            Type of the parser sending the request, which selects its rate limit
+
+        Returns
+        -------
+        Context manager giving the `aiohttp` response, whose body has not
+        been read yet. If every retry fails, the last response is given.
+        """
+        # Sessions must be created from within a running loop
+        if self.session is None:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(timeout=timeout)
+
+        attempt = 0
+        while True:
+            # Wait for the host's rate limit without blocking the loop
+            delay = self.limiter.reserve(url, parser_type)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with self.session.get(url, params=params, headers=headers) as resp:
+                if not self.retry_policy.should_retry(attempt, resp.status):
+                    yield resp
+                    return
+
+                # Hold back every request to the host if the server asked for it
+                delay = self.retry_policy.delay(attempt, resp.headers)
+                if resp.status == 429 or 'Retry-After' in resp.headers:
+                    self.limiter.pause(url, parser_type, delay)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+    async def get_text(self, url:str, params:dict, parser_type:str=None,
+                             fallback:HttpTransport=None) -> str:
+        """
+        Fetch a page and return its text
+
+        Parameters
+        ----------
+        url : `str`
+            URL to be queried
+        params : `dict`
+            Query parameters to pass with the URL
+        parser_type : `str` (default=None)
+            Type of the parser sending the request, which selects its rate limit
+        fallback : `HttpTransport` (default=None)
+            Blocking transport used when `aiohttp` is not installed (normally
+            `Parser.get_transport()`). Defaults to the process-wide transport.
+
+        Returns
+        -------
+        Text of the returned page. If every retry fails, the text of the last
+        response is returned.
+        """
+        if aiohttp is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._get_text_sync, url,
+                                              params, parser_type, fallback)
+
+        async with self.request(url, params, parser_type=parser_type) as resp:
+            return await resp.text()
+
+
+    def _get_text_sync(self, url:str, params:dict, parser_type:str=None,
+                             transport:HttpTransport=None) -> str:
+        """
+        Blocking fallback used when `aiohttp` is not available
+        """
+        if transport is None:
+            transport = get_default_transport()
+
+        return transport.get(url, params=params, parser_type=parser_type).text
+
+
+    async def close(self) -> None:
+        """
+        Close any open connections held by the transport
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+async def gather_parsers(parsers:List[Any], concurrency:int=10,
+                         offload:bool=False, executor:Executor=None,
+                         return_exceptions:bool=True) -> List[Any]:
+    """
+    Run `aparse_html()` on many parsers, sharing a single transport
+
+    Parameters
+    ----------
+    parsers : `List[Parser]`
+        Configured parsers to be run
+    concurrency : `int` (default=10)
+        Maximum number of queries in flight at the same time
+    offload : `bool` (default=False)
+        Run HTML extraction in `executor` rather than on the event loop
+    executor : `Executor` (default=None)
+        Executor used for extraction when `offload` is True
+    return_exceptions : `bool` (default=True)
+        Return exceptions raised by a parser in place of its results rather
+        than raising the first one
+
+    Returns
+    -------
+    List of results (or exceptions) in the same order as `parsers`
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncTransport() as transport:
+        async def run(parser):
+            async with semaphore:
+                return await parser.aparse_html(transport=transport,
+                                                executor=executor,
+                                                offload=offload)
+
+        return await asyncio.gather(*[run(parser) for parser in parsers],
+                                    return_exceptions=return_exceptions)
@@ -0,0 +1,180 @@
+# File: feedgen/parsers/batch.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the ResultBatch class, a columnar container of parsed results.
+# Rather than holding one `ParserResult` (and one `extras` dictionary) per
+# article, a batch holds parallel lists of titles, links and descriptions, one
+# column per extra tag, and a small table of the unique sources that results
+# came from. This keeps memory use low when a long-running process holds
+# hundreds of thousands of results.
+#
+# Iterating over a batch yields `ParserResult` objects, so a batch can be
+# passed directly to the writers.
+# =============================================================================
+
+from array import array
+from sys import intern
+from typing import Any, Iterable, Iterator, List
+
+from .parser import ParserResult
+
+
+class Missing():
+    """
+    Placeholder for an extra tag that a result does not have
+    """
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __reduce__(self) -> str:
+        # Unpickle to the module-level singleton
+        return 'MISSING'
+
+
+MISSING = Missing()
+
+
+class ResultBatch():
+    """
+    Columnar collection of parsed results
+    """
+
+    # Extra tags that describe the source of a result
+    SOURCE_TAGS = ('src_name', 'src_url')
+
+    def __init__(self, results:Iterable[ParserResult]=()) -> None:
+        """
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]` (default=())
+            Results to add to the batch
+        """
+        self.titles   = []
+        self.links    = []
+        self.descrips = []
+
+        # Columns for each extra tag, padded with MISSING
+        self.extras = {}
+
+        # Table of unique (src_name, src_url) pairs, and the index of the
+        # source of each result
+        self.sources      = []
+        self.source_ids   = array('I')
+        self.source_index = {}
+
+        self.extend(results)
+
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+
+    def __iter__(self) -> Iterator[ParserResult]:
+        for indx in range(len(self)):
+            yield self[indx]
+
+
+    def __getitem__(self, indx:int) -> ParserResult:
+        """
+        Returns
+        -------
+        Result at position `indx`, assembled from the columns
+        """
+        extras = {}
+        for tag,value in zip(self.SOURCE_TAGS, self.sources[self.source_ids[indx]]):
+            if value is not MISSING:
+                extras[tag] = value
+
+        for tag,column in self.extras.items():
+            value = column[indx]
+            if value is not MISSING:
+                extras[tag] = value
+
+        return ParserResult(title   = self.titles[indx],
+                            link    = self.links[indx],
+                            descrip = self.descrips[indx],
+                            extras  = extras)
+
+
+    def append(self, result:ParserResult) -> None:
+        """
+        Add a result to the batch
+
+        Parameters
+        ----------
+        result : `ParserResult`
+            Result to be added
+        """
+        size = len(self)
+
+        self.titles.append(result.title)
+        self.links.append(result.link)
+        self.descrips.append(result.descrip)
+
+        # Store the source once in the source table
+        source = tuple(result.extras.get(tag, MISSING) for tag in self.SOURCE_TAGS)
+        source_id = self.source_index.get(source)
+        if source_id is None:
+            source_id = len(self.sources)
+            self.sources.append(tuple(intern(value) if type(value) is str else value
+                                      for value in source))
+            self.source_index[source] = source_id
+        self.source_ids.append(source_id)
+
+        # Store the other extras in their columns
+        for tag,value in result.extras.items():
+            if tag in self.SOURCE_TAGS:
+                continue
+
+            column = self.extras.get(tag)
+            if column is None:
+                column = self.extras[tag] = [MISSING] * size
+            column.append(value)
+
+        # Pad the columns of tags this result doesn't have
+        for column in self.extras.values():
+            if len(column) == size:
+                column.append(MISSING)
+
+
+    def extend(self, results:Iterable[ParserResult]) -> None:
+        """
+        Add many results to the batch
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be added
+        """
+        for result in results:
+            self.append(result)
+
+
+    def column(self, tag:str) -> List[Any]:
+        """
+        Return all of the values of a single tag
+
+        Parameters
+        ----------
+        tag : `str`
+            One of 'title', 'link', 'descrip', or the name of an extra tag
+
+        Returns
+        -------
+        List with the value of `tag` for each result. Results without an
+        extra tag have a value of `MISSING`.
+        """
+        if tag == 'title':
+            return self.titles
+        elif tag == 'link':
+            return self.links
+        elif tag == 'descrip':
+            return self.descrips
+        elif tag in self.SOURCE_TAGS:
+            pos = self.SOURCE_TAGS.index(tag)
+            return [self.sources[source_id][pos] for source_id in self.source_ids]
+        elif tag in self.extras:
+            return self.extras[tag]
+
+        raise KeyError(tag)
@@ -10,14 +10,19 @@
 #    - src_url: https://news.bing.com/
 # =============================================================================
 
-from .parser import SearchParser, TagConfig
+from .parser import SiteSearchParser, TagConfig
 from .parser import CSSInnerText, CSSAttribute
 
-class BingNews(SearchParser):
+class BingNews(SiteSearchParser):
     """
     Parser that pulls results from 'https://news.bing.com'
     """
 
+    # Results are paged 10 at a time, with the position of the first result
+    # given by the 'first' parameter
+    page_size  = 10
+    offset_tag = 'first'
+
     def __init__(self, **kwargs) -> None:
         """
         Initializes the Bing News parser
@@ -25,7 +30,7 @@ class BingNews(SearchParser):
         Parameters
         ----------
         kwargs
-            List of extra parameters to pass to the `SearchParser` parent class
+            List of extra parameters to pass to the `SiteSearchParser` parent class
         """
         super().__init__(search_tag='q', **kwargs)
 
@@ -43,33 +48,3 @@ class BingNews(SearchParser):
             link      = CSSAttribute('a.title', 'href'),
             descrip   = CSSInnerText('div.snippet')
         )
-        
-        # Sites to have Google News
-        self.sites = []
-
-
-    def add_site(self, site:str) -> None:
-        """
-        Append a site to the list of sites to restrict querying to
-
-        Parameters
-        ----------
-        site : `str`
-            Site to be queried (examples: 'wsj.com', 'npr.org')
-        """
-        self.sites.append(site)
-
-
-    def get_params(self) -> dict:
-        """
-        Assemble query parameters
-
-        Returns
-        -------
-        Python dict() object of the form <name,value>
-        """
-        # Assemble the sites
-        if len(self.sites) > 0:
-            self.search_text += ' site:' + ('OR site:'.join(self.sites))
-
-        return super().get_params()
@@ -0,0 +1,288 @@
+# File: feedgen/parsers/cache.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the HttpCache class, which stores the pages fetched by parsers
+# on disk along with their `ETag` and `Last-Modified` validators. When a
+# parser re-runs the same query it sends these validators back to the site
+# with `If-None-Match`/`If-Modified-Since`. If the site responds with
+# '304 Not Modified' the results extracted on the previous run are reused so
+# that the page is neither downloaded nor parsed again.
+#
+# File defines the CacheEntry class, which represents a single cached page.
+#
+# Entries are keyed by the full URL plus the query parameters and are evicted
+# in least-recently-used order once the configured size limits are exceeded.
+# =============================================================================
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import List
+from urllib.parse import urlencode
+
+
+class CacheEntry():
+    """
+    A single page stored in the cache
+    """
+
+    def __init__(self, key:str, body:str, etag:str=None, last_modified:str=None,
+                       results:list=None, limit:int=None) -> None:
+        """
+        Parameters
+        ----------
+        key : `str`
+            Cache key of the entry
+        body : `str`
+            HTML text returned by the site
+        etag : `str` (default=None)
+            Value of the 'ETag' response header
+        last_modified : `str` (default=None)
+            Value of the 'Last-Modified' response header
+        results : `list` (default=None)
+            Results previously extracted from `body`
+        limit : `int` (default=None)
+            Parser limit that was used when extracting `results`
+        """
+        self.key           = key
+        self.body          = body
+        self.etag          = etag
+        self.last_modified = last_modified
+        self.results       = results
+        self.limit         = limit
+
+
+    def validators(self) -> dict:
+        """
+        Returns
+        -------
+        Conditional request headers for revalidating this entry
+        """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+
+class HttpCache():
+    """
+    On-disk cache of fetched pages and their extracted results
+    """
+
+    def __init__(self, directory:str, max_entries:int=1000,
+                       max_bytes:int=100*1024*1024) -> None:
+        """
+        Parameters
+        ----------
+        directory : `str`
+            Directory in which cached pages are stored. It is created if it
+            does not already exist.
+        max_entries : `int` (default=1000)
+            Maximum number of pages to keep
+        max_bytes : `int` (default=100 MB)
+            Maximum number of bytes of page bodies and results to keep
+        """
+        self.directory   = directory
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+
+        # Index of <key, metadata> pairs in least- to most-recently-used order
+        self.index = OrderedDict()
+        self.index_file = os.path.join(directory, 'index.json')
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'r') as fl:
+                self.index = OrderedDict(json.load(fl))
+
+
+    def key(self, url:str, params:dict=None) -> str:
+        """
+        Compute the cache key for a query
+
+        Parameters
+        ----------
+        url : `str`
+            URL to be queried
+        params : `dict` (default=None)
+            Query parameters passed with the URL
+
+        Returns
+        -------
+        Key identifying the query
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f'{url}?{query}'.encode('utf-8')).hexdigest()
+
+
+    def lookup(self, key:str) -> CacheEntry:
+        """
+        Load an entry from the cache
+
+        Parameters
+        ----------
+        key : `str`
+            Key returned by `key()`
+
+        Returns
+        -------
+        Cached entry, or None if the query is not cached
+        """
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is None:
+                return None
+
+            try:
+                with open(self.path(key, 'html'), 'r', encoding='utf-8') as fl:
+                    body = fl.read()
+
+                results = None
+                if os.path.isfile(self.path(key, 'pkl')):
+                    with open(self.path(key, 'pkl'), 'rb') as fl:
+                        results = pickle.load(fl)
+            except (OSError, pickle.PickleError, EOFError):
+                # Entry was removed or corrupted outside of the cache
+                self.remove(key)
+                self.save_index()
+                return None
+
+            self.index.move_to_end(key)
+            self.save_index()
+
+        return CacheEntry(key, body,
+                          etag=meta['etag'],
+                          last_modified=meta['last_modified'],
+                          results=results,
+                          limit=meta['limit'])
+
+
+    def store(self, key:str, body:str, etag:str=None, last_modified:str=None,
+                    results:List=None, limit:int=None) -> None:
+        """
+        Add a page to the cache. Pages without validators are not stored since
+        they can never be revalidated.
+
+        Parameters
+        ----------
+        key : `str`
+            Key returned by `key()`
+        body : `str`
+            HTML text returned by the site
+        etag : `str` (default=None)
+            Value of the 'ETag' response header
+        last_modified : `str` (default=None)
+            Value of the 'Last-Modified' response header
+        results : `List[ParserResult]` (default=None)
+            Results extracted from `body`
+        limit : `int` (default=None)
+            Parser limit used when extracting `results`
+        """
+        if etag is None and last_modified is None:
+            return
+
+        with self.lock:
+            self.remove(key)
+
+            with open(self.path(key, 'html'), 'w', encoding='utf-8') as fl:
+                fl.write(body)
+            size = os.path.getsize(self.path(key, 'html'))
+            if results is not None:
+                with open(self.path(key, 'pkl'), 'wb') as fl:
+                    size += fl.write(pickle.dumps(results))
+
+            self.index[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'limit': limit,
+                'size': size
+            }
+            self.evict()
+            self.save_index()
+
+
+    def store_results(self, key:str, results:List, limit:int=None) -> None:
+        """
+        Replace the extracted results of an existing entry
+
+        Parameters
+        ----------
+        key : `str`
+            Key returned by `key()`
+        results : `List[ParserResult]`
+            Results extracted from the cached page
+        limit : `int` (default=None)
+            Parser limit used when extracting `results`
+        """
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is None:
+                return
+
+            with open(self.path(key, 'pkl'), 'wb') as fl:
+                meta['size'] = os.path.getsize(self.path(key, 'html')) + \
+                               fl.write(pickle.dumps(results))
+            meta['limit'] = limit
+            self.evict()
+            self.save_index()
+
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache
+        """
+        with self.lock:
+            for key in list(self.index.keys()):
+                self.remove(key)
+            self.save_index()
+
+
+    def path(self, key:str, ext:str) -> str:
+        """
+        Returns
+        -------
+        Filename used to store part of an entry
+        """
+        return os.path.join(self.directory, f'{key}.{ext}')
+
+
+    def remove(self, key:str) -> None:
+        """
+        Remove an entry. The caller must hold `self.lock`.
+        """
+        self.index.pop(key, None)
+        for ext in ('html', 'pkl'):
+            try:
+                os.remove(self.path(key, ext))
+            except FileNotFoundError:
+                pass
+
+
+    def evict(self) -> None:
+        """
+        Remove least-recently-used entries until the cache is within its limits.
+        The caller must hold `self.lock`.
+        """
+        total = sum(meta['size'] for meta in self.index.values())
+        while len(self.index) > 0 and \
+              (len(self.index) > self.max_entries or total > self.max_bytes):
+            key, meta = next(iter(self.index.items()))
+            total -= meta['size']
+            self.remove(key)
+
+
+    def save_index(self) -> None:
+        """
+        Write the index to disk. The caller must hold `self.lock`.
+        """
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w') as fl:
+            json.dump(list(self.index.items()), fl)
+        os.replace(tmp_file, self.index_file)
@@ -0,0 +1,164 @@
+# File: feedgen/parsers/fanout.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the ParserGroup class, which runs many configured parsers at
+# the same time on a bounded thread pool. Since each parser spends nearly all
+# of its time waiting on the network, the wall-clock time of a group run is set
+# by the slowest source rather than by the sum of all of them. A `timeout`
+# bounds the whole run: sources that haven't finished by then are reported as
+# errors and the run returns without waiting on them.
+#
+# File defines the GroupResult class, which holds the results of a group run
+# tagged by source along with any errors raised by individual sources. Each
+# result's extras record the label of its source under 'src_label', so
+# merged results can still be traced back to the source that returned them.
+# =============================================================================
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from .parser import Parser, ParserResult
+
+
+class GroupResult():
+    """
+    Results of running a `ParserGroup`, keyed by the label of each source
+    """
+
+    def __init__(self) -> None:
+        # Successfully parsed results for each source
+        self.results = {}
+
+        # Exceptions raised by sources that failed
+        self.errors = {}
+
+
+    def merged(self) -> List[ParserResult]:
+        """
+        Merge the results from all sources into a single list. Results keep
+        the order in which sources were added to the group, and the label of
+        each result's source is in its `extras['src_label']`.
+
+        Returns
+        -------
+        List of all parsed results
+        """
+        merged = []
+        for results in self.results.values():
+            merged.extend(results)
+
+        return merged
+
+
+    def ok(self) -> bool:
+        """
+        Returns
+        -------
+        True if every source in the group was parsed without error
+        """
+        return len(self.errors) == 0
+
+
+class ParserGroup():
+    """
+    Collection of parsers that are run concurrently
+    """
+
+    def __init__(self, parsers:List[Parser]=[], max_workers:int=8,
+                       timeout:float=None) -> None:
+        """
+        Parameters
+        ----------
+        parsers : `List[Parser]` (default=[])
+            Parsers to add to the group
+        max_workers : `int` (default=8)
+            Maximum number of sources that are queried at the same time
+        timeout : `float` (default=None)
+            Maximum number of seconds to wait for the whole group. Sources
+            still running after this are reported with a `TimeoutError`. No
+            limit by default.
+        """
+        self.max_workers = max_workers
+        self.timeout     = timeout
+        self.sources = []
+
+        for parser in parsers:
+            self.add(parser)
+
+
+    def add(self, parser:Parser, label:str=None) -> str:
+        """
+        Add a parser to the group
+
+        Parameters
+        ----------
+        parser : `Parser`
+            Configured parser to be run
+        label : `str` (default=None)
+            Name used to tag the results of this parser. By default this is
+            the parser type, followed by the search text for search parsers.
+
+        Returns
+        -------
+        Label assigned to the parser
+        """
+        if label is None:
+            label = parser.type
+            search_text = getattr(parser, 'search_text', '')
+            if search_text:
+                label += f':{search_text}'
+
+        # Make sure labels remain unique
+        labels = [name for name,_ in self.sources]
+        unique = label
+        count  = 1
+        while unique in labels:
+            count += 1
+            unique = f'{label}#{count}'
+
+        self.sources.append((unique, parser))
+        return unique
+
+
+    def run(self) -> GroupResult:
+        """
+        Run all of the parsers in the group. Errors raised by a parser, or
+        sources that run past `timeout`, are collected in the returned result
+        rather than aborting the batch.
+
+        Returns
+        -------
+        Results from each parser tagged by its label
+        """
+        group = GroupResult()
+        if len(self.sources) == 0:
+            return group
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        workers  = max(1, min(self.max_workers, len(self.sources)))
+        pool     = ThreadPoolExecutor(max_workers=workers)
+        futures  = [(label, pool.submit(parser.parse_html)) for label,parser in self.sources]
+        try:
+            # Collect in submission order so merged results are deterministic
+            for label,future in futures:
+                try:
+                    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    results   = future.result(timeout=remaining)
+                except Exception as e:
+                    if not future.done():
+                        # Still running past the deadline
+                        future.cancel()
+                        e = TimeoutError(f'{label} did not finish within {self.timeout} seconds')
+                    group.errors[label] = e
+                    continue
+
+                for result in results:
+                    result.extras['src_label'] = label
+                group.results[label] = results
+
+        finally:
+            # Don't wait on sources that timed out
+            pool.shutdown(wait=all(future.done() for _,future in futures))
+
+        return group
@@ -10,15 +10,18 @@
 #    - src_url: https://news.google.com/
 # =============================================================================
 
-from .parser import SearchParser, TagConfig
+from .parser import SiteSearchParser, TagConfig
 from .parser import CSSInnerText, CSSAttribute
 import datetime
 
-class GoogleNews(SearchParser):
+class GoogleNews(SiteSearchParser):
     """
     Parser that pulls news results from 'https://news.google.com'
     """
 
+    # Google ignores every word of a query past the 32nd
+    max_terms = 32
+
     def __init__(self, **kwargs) -> None:
         """
         Initializes the Google News parser
@@ -26,7 +29,7 @@ class GoogleNews(SearchParser):
         Parameters
         ----------
         kwargs
-            List of extra parameters to pass to the `SearchParser` parent class
+            List of extra parameters to pass to the `SiteSearchParser` parent class
         """
         super().__init__(search_tag='q', **kwargs)
 
@@ -49,36 +52,6 @@ class GoogleNews(SearchParser):
                                         default=datetime.datetime.now().isoformat())
             }
         ) 
-        
-        # Sites to have Google News
-        self.sites = []
-
-
-    def add_site(self, site:str) -> None:
-        """
-        Append a site to the list of sites to restrict querying to
-
-        Parameters
-        ----------
-        site : `str`
-            Site to be queried (examples: 'wsj.com', 'npr.org')
-        """
-        self.sites.append(site)
-
-
-    def get_params(self) -> dict:
-        """
-        Return a dictionary of parameters to pass to the query
-
-        Returns
-        -------
-        Python dict() object of the form <name,value>
-        """
-        # Assemble the sites
-        if len(self.sites) > 0:
-            self.search_text += ' site:' + ('OR site:'.join(self.sites))
-
-        return super().get_params()
 
 
     def process_link(self, link:str) -> str:
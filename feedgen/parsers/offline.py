@@ -0,0 +1,315 @@
+# File: feedgen/parsers/offline.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the offline extraction mode, which re-runs a site parser's tag
+# extraction over archived HTML (e.g. after a selector fix) without touching
+# the network.
+#
+# Snapshots can be a directory of '.html'/'.htm' files or a tar archive. Each
+# file is extracted in a worker process so throughput scales with the number
+# of cores:
+#    - files and members of uncompressed tar archives are memory-mapped by the
+#      worker, so only their location is sent to it, and the HTML parser
+#      reads them straight from the mapping without copying them
+#    - members of compressed archives are streamed by the main process and
+#      their contents are sent to the workers
+# Files are sent to the workers in chunks, and only a few chunks per worker
+# are in flight at a time, so the main process never reads far ahead of the
+# workers no matter how large the archive is.
+#
+# Parsers can't be pickled (they hold per-thread compiled XPaths), so the
+# parser class is looked up in a registry of parser types by the main process
+# and sent to the workers, which build their own parser once. Classes added
+# with `register_parser()` therefore work with any start method.
+#
+# Results are returned in file order, so they can be written directly to a
+# feed or to newline-delimited JSON with `extract_offline()`.
+# =============================================================================
+
+import mmap
+import os
+import re
+import sys
+import tarfile
+from collections import deque
+from contextlib import contextmanager
+from io import BytesIO
+from itertools import islice
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Tuple, Type, Union
+
+from .parser import Parser, ParserResult
+from .googlenews import GoogleNews
+from .bingnews import BingNews
+from .yahoonews import YahooNews
+
+# <parser type, parser class> registry used by the worker processes
+PARSER_TYPES = {
+    'googlenews': GoogleNews,
+    'bingnews'  : BingNews,
+    'yahoonews' : YahooNews
+}
+
+# File extensions treated as HTML snapshots
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# Matches the first character of a snapshot that isn't blank
+NOT_BLANK = re.compile(rb'\S')
+
+# Number of chunks of files in flight per worker process
+CHUNKS_PER_WORKER = 2
+
+# Parser used by the current worker process
+_worker_parser = None
+
+
+def register_parser(parser_type:str, parser_cls:Type[Parser]) -> None:
+    """
+    Make a parser class available to offline extraction
+
+    Parameters
+    ----------
+    parser_type : `str`
+        Name used to select the parser (normally its `Parser.type`)
+    parser_cls : `Type[Parser]`
+        Parser class, which must be importable by the worker processes (it is
+    sent to them by reference)
+    """
+    PARSER_TYPES[parser_type] = parser_cls
+
+
+def get_parser_class(parser_type:Union[str,Type[Parser]]) -> Type[Parser]:
+    """
+    Returns
+    -------
+    Parser class registered for `parser_type`, or `parser_type` itself if it
+    is already a class
+    """
+    if isinstance(parser_type, type):
+        return parser_type
+
+    try:
+        return PARSER_TYPES[parser_type]
+    except KeyError:
+        raise ValueError(f"Unknown parser type '{parser_type}'. Known types: "
+                         f"{', '.join(sorted(PARSER_TYPES))}") from None
+
+
+def iter_tasks(source:str) -> Iterator[Tuple]:
+    """
+    List the HTML snapshots in a directory or tar archive
+
+    Parameters
+    ----------
+    source : `str`
+        Directory or tar archive (optionally compressed)
+
+    Returns
+    -------
+    Iterator over (name, path, offset, size) tasks for files that can be
+    memory-mapped, or (name, contents) tasks for compressed archive members
+    """
+    if os.path.isdir(source):
+        for root,dirs,files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(HTML_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield (path, path, 0, os.path.getsize(path))
+        return
+
+    # Members of an uncompressed archive are stored as-is in the file, so
+    # workers can map them directly. Compressed archives are streamed.
+    try:
+        tar = tarfile.open(source, 'r:')
+        seekable = True
+    except tarfile.ReadError:
+        tar = tarfile.open(source, 'r|*')
+        seekable = False
+
+    with tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith(HTML_EXTENSIONS):
+                continue
+
+            if seekable and not member.issparse():
+                yield (member.name, source, member.offset_data, member.size)
+            else:
+                yield (member.name, tar.extractfile(member).read())
+
+
+@contextmanager
+def open_task(task:Tuple) -> Iterator[Any]:
+    """
+    Open the snapshot described by a task
+
+    Returns
+    -------
+    Context manager giving a binary file-like object positioned at the start
+    of the snapshot, or None if the snapshot is blank. Memory-mapped
+    snapshots are read from the mapping rather than copied.
+    """
+    if len(task) == 2:
+        contents = task[1]
+        yield BytesIO(contents) if NOT_BLANK.search(contents) else None
+        return
+
+    _, path, offset, size = task
+    if size == 0:
+        yield None
+        return
+
+    with open(path, 'rb') as fl:
+        # Map the pages around the snapshot; offsets must be page aligned
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(fl.fileno(), offset + size - start, offset=start,
+                       access=mmap.ACCESS_READ) as mm:
+            if not NOT_BLANK.search(mm, offset - start):
+                yield None
+                return
+
+            mm.seek(offset - start)
+            yield mm
+
+
+def init_worker(parser_cls:Type[Parser], limit:int, parser_kwargs:Dict[str,Any]) -> None:
+    """
+    Create the parser used by a worker process
+    """
+    global _worker_parser
+    _worker_parser = parser_cls(limit=limit, **parser_kwargs)
+
+
+def extract_task(task:Tuple) -> Tuple[str, List[ParserResult], Exception]:
+    """
+    Extract the results from a single snapshot in a worker process
+
+    Returns
+    -------
+    (name, results, error) tuple. If extraction failed, `results` is empty
+    and `error` holds the exception.
+    """
+    try:
+        with open_task(task) as html:
+            if html is None:
+                return (task[0], [], None)
+
+            return (task[0], _worker_parser.extract(html), None)
+    except Exception as e:
+        return (task[0], [], e)
+
+
+def extract_chunk(tasks:List[Tuple]) -> List[Tuple[str, List[ParserResult], Exception]]:
+    """
+    Extract the results from a chunk of snapshots in a worker process
+    """
+    return [extract_task(task) for task in tasks]
+
+
+def iter_chunk_results(pool:Pool, tasks:Iterator[Tuple], chunksize:int,
+                       max_pending:int) -> Iterator[Tuple[str, List[ParserResult], Exception]]:
+    """
+    Run tasks on a pool in chunks, keeping at most `max_pending` chunks in
+    flight
+
+    Returns
+    -------
+    Iterator over the outcome of each task, in task order
+    """
+    tasks   = iter(tasks)
+    pending = deque()
+    while True:
+        while len(pending) < max_pending:
+            chunk = list(islice(tasks, chunksize))
+            if len(chunk) == 0:
+                break
+            pending.append(pool.apply_async(extract_chunk, (chunk,)))
+
+        if len(pending) == 0:
+            return
+
+        yield from pending.popleft().get()
+
+
+def iter_offline(source:str, parser_type:Union[str,Type[Parser]],
+                 processes:int=None, chunksize:int=4, limit:int=None,
+                 errors:Dict[str,Exception]=None,
+                 parser_kwargs:Dict[str,Any]=None) -> Iterator[ParserResult]:
+    """
+    Extract results from archived HTML snapshots on a process pool
+
+    Parameters
+    ----------
+    source : `str`
+        Directory or tar archive of HTML files
+    parser_type : `str` or `Type[Parser]`
+        Registered parser type (e.g. 'googlenews') or parser class whose
+        `TagConfig` is applied to each file
+    processes : `int` (default=None)
+        Number of worker processes. Defaults to the number of cores.
+    chunksize : `int` (default=4)
+        Number of files sent to a worker at a time. At most
+        `CHUNKS_PER_WORKER` chunks per worker are read ahead.
+    limit : `int` (default=None)
+        Maximum number of results extracted from each file. No limit by
+        default.
+    errors : `Dict[str,Exception]` (default=None)
+        If given, files that fail to parse are recorded here by name and
+        skipped. Otherwise the first error is raised.
+    parser_kwargs : `Dict[str,Any]` (default=None)
+        Extra keyword arguments used to construct the parser
+
+    Returns
+    -------
+    Iterator over the extracted results, in file order
+    """
+    # Resolved here so that registered types are known to every worker, and
+    # an unknown type fails early
+    parser_cls = get_parser_class(parser_type)
+
+    limit     = sys.maxsize if limit is None else limit
+    processes = (os.cpu_count() or 1) if processes is None else processes
+    initargs  = (parser_cls, limit, {} if parser_kwargs is None else parser_kwargs)
+
+    with Pool(processes=processes, initializer=init_worker, initargs=initargs) as pool:
+        outcomes = iter_chunk_results(pool, iter_tasks(source), chunksize,
+                                      max_pending=CHUNKS_PER_WORKER * processes)
+        for name,results,error in outcomes:
+            if error is not None:
+                if errors is None:
+                    raise error
+                errors[name] = error
+                continue
+
+            yield from results
+
+
+def extract_offline(source:str, parser_type:Union[str,Type[Parser]], writer:Any,
+                    output:str, ndjson:bool=False, pretty_print:bool=True,
+                    **kwargs) -> None:
+    """
+    Extract results from archived HTML snapshots and write them to a feed
+
+    Parameters
+    ----------
+    source : `str`
+        Directory or tar archive of HTML files
+    parser_type : `str` or `Type[Parser]`
+        Registered parser type or parser class
+    writer : `RssFeed` or `JsonFeed`
+        Writer used to generate the output. Items are written as they are
+        extracted, so memory use does not grow with the size of the archive.
+    output : `str`
+        Name of the file to write
+    ndjson : `bool` (default=False)
+        Write newline-delimited JSON (requires a `JsonFeed` writer)
+    pretty_print : `bool` (default=True)
+        Pretty print the feed. Ignored for newline-delimited JSON.
+    kwargs
+        Extra parameters passed to `iter_offline()`
+    """
+    results = iter_offline(source, parser_type, **kwargs)
+    if ndjson:
+        writer.write_ndjson(results, output)
+    else:
+        writer.write_stream(results, output, pretty_print=pretty_print)
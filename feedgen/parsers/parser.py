@@ -5,7 +5,26 @@
 # inherit. 
 #
 # File defines the SearchParser base class, from which all search engine based
-# parsers inherit.
+# parsers inherit. Search parsers for sites with paged results fetch as many
+# pages as needed to reach `limit`: the first page is fetched as usual, and if
+# it is full the following pages are fetched with at most `page_workers` in
+# flight, stopping at the first short page. `iter_results()` fetches every
+# page through the same cache and streaming aware path (`iter_query()`) as
+# the first, and `aparse_html()` fetches the same pages on the event loop
+# through `aquery()`, at most `page_workers` at a time. `aquery()` revalidates
+# pages with the parser's cache, or streams them, in the same way as
+# `iter_query()`.
+#
+# File defines the SiteSearchParser base class for search parsers that can
+# restrict results to specific sites ('site:a OR site:b'). Long site lists are
+# split into chunks that keep each query under the site's length limits, the
+# chunks are queried concurrently and their results are merged. Every way of
+# running the query (`iter_results()`, `parse_cached()` and `aparse_html()`)
+# uses the chunks and pages through them the same way, and each chunk is
+# cached or streamed like a single query.
+#
+# Each parser reports the time spent fetching, parsing and extracting pages,
+# along with the bytes fetched and items extracted, to `feedgen.metrics`.
 #
 # File defines the ParserResult class, which defines a single article extracted
 # by a site parser.
@@ -22,10 +41,23 @@
 # to be extracted from a site.
 # =============================================================================
 
-import requests
-from lxml.html import fromstring
-from lxml.cssselect import CSSSelector
-from typing import Any, List
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from lxml.etree import HTMLPullParser
+from lxml.html import fromstring, parse, HtmlElement, HtmlElementClassLookup
+from itertools import chain, islice, repeat, zip_longest
+from typing import Any, Iterable, Iterator, List, TYPE_CHECKING
+from urllib.parse import quote_plus
+
+from ..metrics import metrics
+from .aio import AsyncTransport
+from .cache import HttpCache
+from .selectors import selector_cache
+from .transport import HttpTransport, get_default_transport
+
+if TYPE_CHECKING:
+    from ..filters.seenstore import SeenStore
 
 
 class ParserResult():
@@ -33,7 +65,10 @@ class ParserResult():
     A compressed representation of the parsed results
     """
 
-    def __init__(self, title:str, link:str, descrip:str, extras:dict={}) -> None:
+    # Avoid a per-instance __dict__ since many results may be held at once
+    __slots__ = ('title', 'link', 'descrip', 'extras')
+
+    def __init__(self, title:str, link:str, descrip:str, extras:dict=None) -> None:
         """
         Parameters
         ----------
@@ -43,13 +78,13 @@ class ParserResult():
             Url associated with the result
         descrip : `str`
             Description of the parsed result
-        extras : `dict` (default={})
+        extras : `dict` (default=None)
             Dictionary of extra tags extracted
         """
         self.title   = title
         self.link    = link
         self.descrip = descrip
-        self.extras  = extras
+        self.extras  = {} if extras is None else extras
     
 
     def __str__(self) -> str:
@@ -69,11 +104,14 @@ class ParserResult():
         return rep
 
 
-class CSSInnerText(CSSSelector):
+class CSSInnerText():
     """
     Class used to define a tag that we want to pull out the inner text from.
     """
 
+    # Attribute to extract the value from (None means the inner text)
+    attribute = None
+
     def __init__(self, css:str, default:Any=None) -> None:
         """
         Initialize CSSInnerText class
@@ -85,9 +123,22 @@ class CSSInnerText(CSSSelector):
         default : `str`
             Default value to be returned if no valid entry is found
         """
-        super().__init__(css=css)
+        self.css     = css
         self.default = default
 
+        # Compiled selectors are shared by all parsers in the process
+        self.selector = selector_cache.get(css, self.attribute)
+        self.path     = self.selector.path
+
+
+    def __call__(self, div:HtmlElement) -> List[HtmlElement]:
+        """
+        Returns
+        -------
+        Elements under `div` that match the CSS selector
+        """
+        return self.selector(div)
+
 
     def get(self, div:str) -> str:
         """
@@ -126,7 +177,33 @@ class CSSInnerText(CSSSelector):
         -------
         Value from the inner text of the element
         """
-        return self(div)[indx].text_content()
+        return self.selector.value(div, indx)
+
+
+    def matchable(self) -> bool:
+        """
+        Returns
+        -------
+        True if `matches()` can test elements against this selector, which is
+        only possible for selectors without combinators
+        """
+        return self.selector.matchable
+
+
+    def matches(self, element:HtmlElement) -> bool:
+        """
+        Test whether an element itself is selected by this selector
+
+        Parameters
+        ----------
+        element : `HtmlElement`
+            Element to be tested
+
+        Returns
+        -------
+        True if `element` matches the selector
+        """
+        return self.selector.matches(element)
 
 
 class CSSAttribute(CSSInnerText):
@@ -147,26 +224,8 @@ class CSSAttribute(CSSInnerText):
         default : `Any` (default=None)
             Default value to be returned if no valid entry is found
         """
-        super().__init__(css=css, default=default)
         self.attribute = attr
-
-    
-    def getValue(self, div:str, indx:int=0) -> str:
-        """
-        Returns the value from the user defined attribute
-
-        Parameters
-        ----------
-        div : `str`
-            'div' element extracted from webpage
-        indx : `int` (default=0)
-            Index of the element to extract the element from
-
-        Returns
-        -------
-        Value from a user defined attribute
-        """
-        return self(div)[indx].get(self.attribute)
+        super().__init__(css=css, default=default)
 
 
 class TagConfig():
@@ -204,6 +263,10 @@ class TagConfig():
         for name,css in extras.items():
             self.add_tag(name, css)
 
+        # Compiled extraction plan, along with the selectors it was built from
+        self.plan     = None
+        self.plan_key = None
+
 
     def add_tag(self, name:str, css:str) -> None:
         """
@@ -220,13 +283,36 @@ class TagConfig():
         self.extras[name] = css
 
 
+    def compile(self) -> Any:
+        """
+        Compile the configuration into a plan that extracts every field from a
+        container in a single pass. The plan is rebuilt whenever the selectors
+        in the configuration change.
+
+        Returns
+        -------
+        `ExtractionPlan` for this configuration
+        """
+        from .plan import ExtractionPlan
+
+        key = (self.title, self.link, self.descrip, tuple(self.extras.items()))
+        if self.plan is None or self.plan_key != key:
+            self.plan     = ExtractionPlan(self)
+            self.plan_key = key
+
+        return self.plan
+
+
 class Parser():
     """
     Base class for all Parsers. For a default parser, use GoogleNews and set the
     'site' value to the url you want to query
     """
 
-    def __init__(self, limit:int=100, **kwargs) -> None:
+    def __init__(self, limit:int=100, transport:HttpTransport=None,
+                       cache:HttpCache=None, stream:bool=False,
+                       chunk_size:int=16384, seen_store:'SeenStore'=None,
+                       mark_seen:bool=True, **kwargs) -> None:
         """
         Initialize the parser class
         
@@ -234,6 +320,23 @@ class Parser():
         ----------
         limit : `int` (default=100)
             Maximum number of results to return
+        transport : `HttpTransport` (default=None)
+            Transport used to submit queries. By default the process-wide
+            transport is shared with all other parsers.
+        cache : `HttpCache` (default=None)
+            Cache used to revalidate previously fetched pages with conditional
+            requests. No caching is done by default.
+        stream : `bool` (default=False)
+            Download and parse the page incrementally, closing the connection
+            once `limit` results are found. Ignored when `cache` is set.
+        chunk_size : `int` (default=16384)
+            Number of bytes read at a time when `stream` is True
+        seen_store : `SeenStore` (default=None)
+            Store of previously seen results. If given, only results that are
+            not in the store are returned, and they are then added to it.
+        mark_seen : `bool` (default=True)
+            Add returned results to `seen_store` as they are taken. Set to
+            False to `add()` them to the store once they have been published.
         kwargs:
             Extra parameters
         """
@@ -251,6 +354,18 @@ class Parser():
         # Note that the inheriting class must instatiate a tag_config variable
         self.tag_config = None
 
+        # Transport used to query the site
+        self.transport = transport
+        self.cache     = cache
+
+        # Incremental download/parsing
+        self.stream     = stream
+        self.chunk_size = chunk_size
+
+        # Only return results that haven't been seen on a previous run
+        self.seen_store = seen_store
+        self.mark_seen  = mark_seen
+
 
     def get_params(self) -> dict:
         """
@@ -264,6 +379,427 @@ class Parser():
         return self.url['params']
 
 
+    def get_url(self) -> str:
+        """
+        Returns
+        -------
+        Full URL (without query parameters) to be queried
+        """
+        return f"{self.url['base']}/{self.url['endpoint']}"
+
+
+    def get_transport(self) -> HttpTransport:
+        """
+        Returns
+        -------
+        Transport used by this parser
+        """
+        if self.transport is None:
+            return get_default_transport()
+
+        return self.transport
+
+
+    def request(self, params:dict=None, headers:dict=None, stream:bool=False) -> Any:
+        """
+        Submits a GET request for the site's URL through the parser's
+        transport, recording the fetch metrics
+
+        Parameters
+        ----------
+        params : `dict` (default=None)
+            Query parameters. Defaults to `self.get_params()`.
+        headers : `dict` (default=None)
+            Extra request headers
+        stream : `bool` (default=False)
+            Defer downloading the body
+
+        Returns
+        -------
+        Response returned by the transport
+        """
+        if params is None:
+            params = self.get_params()
+
+        with metrics.timer('fetch', parser=self.type):
+            req = self.get_transport().get(self.get_url(), params=params, headers=headers,
+                                           stream=stream, parser_type=self.type)
+
+        if metrics.enabled:
+            if req.status_code >= 400:
+                metrics.count('errors', stage='fetch', parser=self.type)
+            if not stream:
+                metrics.count('bytes_fetched', len(req.content), parser=self.type)
+
+        return req
+
+
+    def fetch_html(self) -> str:
+        """
+        Submits the query to the website
+
+        Returns
+        -------
+        HTML text returned by the site
+        """
+        return self.request().text
+
+
+    def extract_item(self, div:HtmlElement, plan:Any=None) -> ParserResult:
+        """
+        Extracts the tags defined in `self.tag_config` from a single container
+
+        Parameters
+        ----------
+        div : `HtmlElement`
+            Container element extracted from the webpage
+        plan : `ExtractionPlan` (default=None)
+            Compiled plan for `self.tag_config`. It is looked up if not given.
+
+        Returns
+        -------
+        Parsed result for the container
+        """
+        if plan is None:
+            plan = self.tag_config.compile()
+
+        # Get the required tags
+        title, link, descrip, *values = plan.extract(div)
+
+        # Parse the extra components
+        extras = {
+            'src_name': self.name,
+            'src_url' : self.url['base']
+        }
+        extras.update(zip(plan.extra_names, values))
+
+        # Assemble the parsed results
+        return ParserResult(
+            title   = title,
+            link    = self.process_link(link),
+            descrip = descrip,
+            extras  = extras)
+
+
+    def iter_extract(self, html:Any) -> Iterator[ParserResult]:
+        """
+        Parses the HTML returned by a site to extract the information requested
+        by the user. Results are yielded as each container is extracted.
+
+        Parameters
+        ----------
+        html : `str`, `bytes` or binary file-like object
+            HTML text returned by the site. A file-like object (such as a
+            memory-mapped snapshot) is read by the parser without first being
+            copied into memory.
+
+        Returns
+        -------
+        Iterator over the parsed results from the HTML
+        """
+        with metrics.timer('parse', parser=self.type):
+            if isinstance(html, (str, bytes)):
+                req = fromstring(html)
+            else:
+                req = parse(html).getroot()
+        plan = self.tag_config.compile()
+
+        # Parse the HTML, quitting when we've reached our limit
+        for count,div in enumerate(self.tag_config.container(req), start=1):
+            with metrics.timer('extract', parser=self.type):
+                item = self.extract_item(div, plan)
+            metrics.count('items_extracted', parser=self.type)
+            yield item
+
+            if count >= self.limit:
+                break
+
+
+    def extract(self, html:Any) -> List[ParserResult]:
+        """
+        Parses the HTML returned by a site to extract the information requested
+        by the user.
+
+        Parameters
+        ----------
+        html : `str`, `bytes` or binary file-like object
+            HTML text returned by the site
+
+        Returns
+        -------
+        Parsed results from the HTML
+        """
+        return list(self.iter_extract(html))
+
+
+    def iter_extract_stream(self, chunks:Iterable[bytes], encoding:str=None) -> Iterator[ParserResult]:
+        """
+        Incrementally parses HTML as it is received. Each container is
+        extracted as soon as its closing tag is seen, and no more of `chunks`
+        is consumed once `self.limit` results have been found.
+
+        Containers defined with combinators (e.g. 'div.a > div.b') can't be
+        matched until the whole page is known, in which case the full page is
+        read before extraction.
+
+        Parameters
+        ----------
+        chunks : `Iterable[bytes]`
+            Raw HTML received from the site
+        encoding : `str` (default=None)
+            Encoding of the page, if known
+
+        Returns
+        -------
+        Iterator over the parsed results from the HTML
+        """
+        container = self.tag_config.container
+        if not container.matchable():
+            yield from self.iter_extract(b''.join(chunks))
+            return
+
+        parser = self.pull_parser(encoding)
+        plan   = self.tag_config.compile()
+
+        count = 0
+        for chunk in chain(chunks, [None]):
+            for item in self.feed_chunk(parser, plan, chunk):
+                yield item
+                count += 1
+                if count >= self.limit:
+                    return
+
+
+    def pull_parser(self, encoding:str=None) -> HTMLPullParser:
+        """
+        Returns
+        -------
+        Incremental HTML parser reporting the end of each element
+        """
+        parser = HTMLPullParser(events=('end',), encoding=encoding)
+        parser.set_element_class_lookup(HtmlElementClassLookup())
+        return parser
+
+
+    def feed_chunk(self, parser:HTMLPullParser, plan:Any, chunk:bytes) -> Iterator[ParserResult]:
+        """
+        Feed a chunk of HTML to a parser from `pull_parser()` and extract the
+        containers it completes
+
+        Parameters
+        ----------
+        parser : `HTMLPullParser`
+            Parser the earlier chunks of the page were fed to
+        plan : `ExtractionPlan`
+            Compiled plan for `self.tag_config`
+        chunk : `bytes`
+            Raw HTML received from the site, or None at the end of the page
+
+        Returns
+        -------
+        Iterator over the results extracted from the completed containers
+        """
+        # A chunk of `None` marks the end of the page
+        if chunk is None:
+            parser.close()
+        else:
+            parser.feed(chunk)
+
+        # Extract any containers that have been closed
+        container = self.tag_config.container
+        for _,element in parser.read_events():
+            if not container.matches(element):
+                continue
+
+            with metrics.timer('extract', parser=self.type):
+                item = self.extract_item(element, plan)
+            metrics.count('items_extracted', parser=self.type)
+            yield item
+
+            # The container is no longer needed
+            element.clear()
+
+
+    def extract_stream(self, chunks:Iterable[bytes], encoding:str=None) -> List[ParserResult]:
+        """
+        List version of `iter_extract_stream()`
+
+        Parameters
+        ----------
+        chunks : `Iterable[bytes]`
+            Raw HTML received from the site
+        encoding : `str` (default=None)
+            Encoding of the page, if known
+
+        Returns
+        -------
+        Parsed results from the HTML
+        """
+        return list(self.iter_extract_stream(chunks, encoding=encoding))
+
+
+    def parse_cached(self, params:dict=None) -> List[ParserResult]:
+        """
+        Submits the query as a conditional request, revalidating any copy of
+        the page held in `self.cache`. If the page is unchanged the results
+        extracted on a previous run are returned without parsing the page.
+
+        Parameters
+        ----------
+        params : `dict` (default=None)
+            Query parameters. Defaults to `self.get_params()`.
+
+        Returns
+        -------
+        Parsed results from the specified URL
+        """
+        params = self.get_params() if params is None else params
+        key, entry, headers = self.cache_lookup(params)
+        req = self.request(params, headers=headers)
+        return self.cache_results(key, entry, req.status_code, req.headers, req.text)
+
+
+    def cache_lookup(self, params:dict) -> tuple:
+        """
+        Look up the cached copy of a query's page
+
+        Parameters
+        ----------
+        params : `dict`
+            Query parameters
+
+        Returns
+        -------
+        Tuple of the cache key, the cached entry (or None) and the headers
+        making the request conditional on the cached copy
+        """
+        key   = self.cache.key(self.get_url(), params)
+        entry = self.cache.lookup(key)
+        return key, entry, {} if entry is None else entry.validators()
+
+
+    def cache_results(self, key:str, entry:Any, status:int, headers:dict,
+                            text:str) -> List[ParserResult]:
+        """
+        Parse the response to a conditional request from `cache_lookup()`,
+        reusing the cached page and results if it is unchanged and storing
+        it in `self.cache` otherwise
+
+        Parameters
+        ----------
+        key : `str`
+            Cache key of the query
+        entry : `CacheEntry`
+            Cached entry of the query, or None
+        status : `int`
+            HTTP status of the response
+        headers : `dict`
+            Response headers
+        text : `str`
+            Body of the response
+
+        Returns
+        -------
+        Parsed results of the query
+        """
+        if status == 304 and entry is not None:
+            # Page is unchanged, so skip parsing if possible
+            if entry.results is not None and entry.limit == self.limit:
+                return entry.results
+
+            results = self.extract(entry.body)
+            self.cache.store_results(key, results, limit=self.limit)
+            return results
+
+        results = self.extract(text)
+        if status < 400:
+            self.cache.store(key, text,
+                             etag=headers.get('ETag'),
+                             last_modified=headers.get('Last-Modified'),
+                             results=results,
+                             limit=self.limit)
+
+        return results
+
+
+    def iter_query(self, params:dict=None) -> Iterator[ParserResult]:
+        """
+        Submits a single query and lazily yields the results extracted from
+        the returned HTML, revalidating with `self.cache` or streaming the
+        page as configured
+
+        Parameters
+        ----------
+        params : `dict` (default=None)
+            Query parameters. Defaults to `self.get_params()`.
+
+        Returns
+        -------
+        Iterator over the parsed results of the query
+        """
+        if self.cache is not None:
+            yield from self.parse_cached(params)
+
+        elif self.stream:
+            req = self.request(params, stream=True)
+            with req:
+                req.raise_for_status()
+                chunks = metrics.counted(req.iter_content(chunk_size=self.chunk_size),
+                                         'bytes_fetched', measure=len, parser=self.type)
+                yield from self.iter_extract_stream(chunks, encoding=req.encoding)
+
+        elif params is None:
+            yield from self.iter_extract(self.fetch_html())
+
+        else:
+            yield from self.iter_extract(self.request(params).text)
+
+
+    def iter_page_results(self) -> Iterator[ParserResult]:
+        """
+        Submits the query and lazily yields every result extracted from the
+        returned HTML, whether or not it has been seen before
+
+        Returns
+        -------
+        Iterator over the parsed results from the specified URL
+        """
+        return self.iter_query()
+
+
+    def filter_seen(self, results:Iterable[ParserResult]) -> Iterator[ParserResult]:
+        """
+        Remove results found in `self.seen_store`, if one is set
+
+        Parameters
+        ----------
+        results : `Iterable[ParserResult]`
+            Results to be filtered
+
+        Returns
+        -------
+        Iterator over the results that haven't been seen before
+        """
+        if self.seen_store is None:
+            return iter(results)
+
+        return self.seen_store.filter(results, mark=self.mark_seen)
+
+
+    def iter_results(self) -> Iterator[ParserResult]:
+        """
+        Assembles and submits a given query to a website and lazily yields the
+        results as they are extracted from the returned HTML. Downstream
+        consumers can start work on the first result before the rest of the
+        page has been parsed.
+
+        Returns
+        -------
+        Iterator over the parsed results from the specified URL
+        """
+        return self.filter_seen(self.iter_page_results())
+
+
     def parse_html(self) -> List[ParserResult]:
         """
         Assembles and submits a given query to a website and parses the returned
@@ -273,45 +809,168 @@ class Parser():
         -------
         Parsed results from the specified URL
         """
-        # Get the HTML text
-        full_url = f"{self.url['base']}/{self.url['endpoint']}"
-        req = requests.get(full_url, params=self.get_params())
-        req = fromstring(req.text)
+        return list(self.iter_results())
 
-        # Resutl to be returned
-        results = []
 
-        # Parse the HTML
-        for div in self.tag_config.container(req):
-            # Get the required tags
-            # title   = self.tag_config.title(div)[0].text_content()
-            title   = self.tag_config.title.get(div)
-            link    = self.tag_config.link.get(div)
-            descrip = self.tag_config.descrip.get(div)
-
-            # Parse the extra components
-            extras = {
-                'src_name': self.name,
-                'src_url' : self.url['base']
-            }
-            for name,tag in self.tag_config.extras.items():
-                extras[name] = tag.get(div)
-
-            # Assemble the parsed results
-            res = ParserResult(
-                title   = title,
-                link    = self.process_link(link),
-                descrip = descrip,
-                extras  = extras)
-            
-            results.append(res)
-
-            # Quit when we've reached our limit
-            if len(results) >= self.limit:
-                break
+    async def aparse_html(self, transport:AsyncTransport=None, 
+                          executor:Executor=None, offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of `parse_html()`. The query is submitted without
+        blocking the event loop.
+
+        Parameters
+        ----------
+        transport : `AsyncTransport` (default=None)
+            Transport used to fetch the page. If not supplied, a temporary
+            transport is created for this call.
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True. The loop's default executor
+            is used if not supplied.
+        offload : `bool` (default=False)
+            Run the CPU-bound HTML extraction in `executor` so that large pages
+            do not stall the event loop
+
+        Returns
+        -------
+        Parsed results from the specified URL
+        """
+        if transport is None:
+            async with AsyncTransport() as tmp:
+                return await self.aparse_html(tmp, executor=executor, offload=offload)
+
+        results = await self.apage_results(transport, executor=executor, offload=offload)
+        return list(self.filter_seen(results))
+
+
+    async def apage_results(self, transport:AsyncTransport, executor:Executor=None,
+                                  offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of `iter_page_results()`
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the pages
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Run the HTML extraction in `executor`
+
+        Returns
+        -------
+        Parsed results, whether or not they have been seen before
+        """
+        return await self.aquery(transport, executor=executor, offload=offload)
+
+
+    async def aquery(self, transport:AsyncTransport, params:dict=None,
+                           executor:Executor=None, offload:bool=False) -> List[ParserResult]:
+        """
+        Submit a single query on the event loop and parse the returned HTML.
+        Like `iter_query()`, the page is revalidated with `self.cache` if one
+        is set, or streamed if `self.stream` is True. Without `aiohttp`,
+        `iter_query()` itself is run in an executor.
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the page
+        params : `dict` (default=None)
+            Query parameters. Defaults to `self.get_params()`.
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Run the HTML extraction in `executor`
+
+        Returns
+        -------
+        Parsed results of the query, whether or not they have been seen before
+        """
+        params = self.get_params() if params is None else params
+        loop   = asyncio.get_running_loop()
+
+        # Without `aiohttp` the blocking fetch path, including the cache, is
+        # run in an executor
+        if not transport.native:
+            return await loop.run_in_executor(executor if offload else None,
+                                              lambda: list(self.iter_query(params)))
+
+        if self.cache is not None:
+            key, entry, headers = self.cache_lookup(params)
+            async with transport.request(self.get_url(), params, headers=headers,
+                                         parser_type=self.type) as resp:
+                status, headers, html = resp.status, resp.headers, await resp.text()
+
+            if offload:
+                return await loop.run_in_executor(executor, self.cache_results,
+                                                  key, entry, status, headers, html)
+            return self.cache_results(key, entry, status, headers, html)
+
+        if self.stream:
+            return await self.aquery_stream(transport, params, executor=executor,
+                                            offload=offload)
+
+        html = await transport.get_text(self.get_url(), params, parser_type=self.type)
+        if offload:
+            return await loop.run_in_executor(executor, self.extract, html)
+
+        return self.extract(html)
+
+    async def aquery_stream(self, transport:AsyncTransport, params:dict,
+                                  executor:Executor=None, offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of streaming a single query with `iter_query()`.
+        The page is parsed as each chunk of it arrives, and the connection is
+        closed once `self.limit` results have been found.
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the page, which must be native
+        params : `dict`
+            Query parameters
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Parse each chunk in `executor`
+
+        Returns
+        -------
+        Parsed results of the query, whether or not they have been seen before
+        """
+        loop    = asyncio.get_running_loop()
+        results = []
+        async with transport.request(self.get_url(), params, parser_type=self.type) as resp:
+            resp.raise_for_status()
+
+            # Containers that can't be matched on their own need the full page
+            if not self.tag_config.container.matchable():
+                html = await resp.read()
+                metrics.count('bytes_fetched', len(html), parser=self.type)
+                if offload:
+                    return await loop.run_in_executor(executor, self.extract, html)
+                return self.extract(html)
+
+            parser = self.pull_parser(resp.charset)
+            plan   = self.tag_config.compile()
+            async def feed(chunk):
+                extract = lambda: list(islice(self.feed_chunk(parser, plan, chunk),
+                                              self.limit - len(results)))
+                if offload:
+                    return await loop.run_in_executor(executor, extract)
+                return extract()
+
+            async for chunk in resp.content.iter_chunked(self.chunk_size):
+                metrics.count('bytes_fetched', len(chunk), parser=self.type)
+                results.extend(await feed(chunk))
+                if len(results) >= self.limit:
+                    break
+            else:
+                # Extract whatever the end of the page completes
+                results.extend(await feed(None))
 
         return results
-            
+
 
     def process_link(self, link:str) -> str:
         """
@@ -338,20 +997,29 @@ class SearchParser(Parser):
     and what tag to pass to the URL.
     """
 
-    def __init__(self, search_tag:str='q', **kwargs) -> None:
+    # Number of results on each page, and the query parameter holding the
+    # (1-based) position of the first result on a page. Sites without
+    # pagination leave these as None.
+    page_size  = None
+    offset_tag = None
+
+    def __init__(self, search_tag:str='q', page_workers:int=4, **kwargs) -> None:
         """Initialize the search parser
 
         Parameters
         ----------
         search_tag : `str` (default='q')
             String that represents the tag that is used in the search url
+        page_workers : `int` (default=4)
+            Maximum number of result pages fetched at the same time
         kwargs : 
             Additional parameters
         """
         super().__init__(**kwargs)
 
-        self.search_text = ''
-        self.search_tag  = search_tag
+        self.search_text  = ''
+        self.search_tag   = search_tag
+        self.page_workers = page_workers
 
 
     def search_term(self, text:str) -> None:
@@ -375,7 +1043,451 @@ class SearchParser(Parser):
         -------
         Python dict() containing parameters to submit to query
         """
-        # Add the search term to the query parameters
-        self.url['params'][self.search_tag] = self.search_text
+        # Build a new dictionary so repeated calls return the same query
+        params = dict(super().get_params())
+        params[self.search_tag] = self.search_text
+
+        return params
+
+
+    def num_pages(self) -> int:
+        """
+        Returns
+        -------
+        Number of result pages needed to reach `self.limit`
+        """
+        if self.page_size is None or self.offset_tag is None:
+            return 1
+
+        return max(1, -(-self.limit // self.page_size))
+
+
+    def page_params(self, page:int) -> dict:
+        """
+        Parameters
+        ----------
+        page : `int`
+            Index of the result page, starting at 0
+
+        Returns
+        -------
+        Query parameters selecting the given page of results
+        """
+        if page == 0 or self.offset_tag is None:
+            return {}
+
+        return {self.offset_tag: 1 + page * self.page_size}
+
+
+    def fetch_page(self, params:dict, page:int) -> List[ParserResult]:
+        """
+        Fetch and parse a single page of results, using the cache or
+        streaming like the first page
+
+        Parameters
+        ----------
+        params : `dict`
+            Query parameters of the first page
+        page : `int`
+            Index of the page to fetch
+
+        Returns
+        -------
+        Parsed results on the page
+        """
+        return list(self.iter_query({**params, **self.page_params(page)}))
+
+
+    def iter_page_results(self) -> Iterator[ParserResult]:
+        """
+        Lazily yield results from as many pages as needed to reach
+        `self.limit`. Results whose link appeared on an earlier page are
+        skipped, and no more pages are read once a page comes back short.
+
+        Returns
+        -------
+        Iterator over the parsed results
+        """
+        num_pages = self.num_pages()
+        if num_pages <= 1:
+            yield from super().iter_page_results()
+            return
+
+        seen  = set()
+        count = 0
+        for result in super().iter_page_results():
+            seen.add(result.link)
+            count += 1
+            yield result
+
+        if count < self.page_size:
+            return
+
+        params = self.get_params()
+
+        pages   = iter(range(1, num_pages))
+        workers = max(1, min(self.page_workers, num_pages - 1))
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while True:
+                    # Keep `workers` pages in flight, submitting the next page
+                    # only once an earlier one has been consumed
+                    for page in pages:
+                        pending.append(pool.submit(self.fetch_page, params, page))
+                        if len(pending) >= workers:
+                            break
+
+                    if len(pending) == 0:
+                        return
+
+                    # Yield in page order so results keep the site's ranking
+                    results = pending.popleft().result()
+                    fresh   = 0
+                    for result in results:
+                        if result.link in seen:
+                            continue
+                        seen.add(result.link)
+                        fresh += 1
+                        count += 1
+                        yield result
+
+                        if count >= self.limit:
+                            return
+
+                    if len(results) < self.page_size or fresh == 0:
+                        return
+            finally:
+                # Skip the pages that are no longer needed
+                for future in pending:
+                    future.cancel()
+
+
+    async def afetch_page(self, transport:AsyncTransport, params:dict, page:int,
+                                executor:Executor=None, offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of `fetch_page()`
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the page
+        params : `dict`
+            Query parameters of the first page
+        page : `int`
+            Index of the page to fetch
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Run the HTML extraction in `executor`
+
+        Returns
+        -------
+        Parsed results on the page
+        """
+        return await self.aquery(transport, {**params, **self.page_params(page)},
+                                 executor=executor, offload=offload)
+
+
+    async def apage_results(self, transport:AsyncTransport, executor:Executor=None,
+                                  offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of `iter_page_results()`. The pages after the
+        first are fetched `page_workers` at a time, and the same rules decide
+        when to stop: a short page, a page without new results or `limit`.
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the pages
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Run the HTML extraction in `executor`
+
+        Returns
+        -------
+        Parsed results, whether or not they have been seen before
+        """
+        results   = await super().apage_results(transport, executor=executor, offload=offload)
+        num_pages = self.num_pages()
+        if num_pages <= 1 or len(results) < self.page_size:
+            return results
+
+        params  = self.get_params()
+        seen    = {result.link for result in results}
+        workers = max(1, min(self.page_workers, num_pages - 1))
+        for start in range(1, num_pages, workers):
+            pages = await asyncio.gather(*[self.afetch_page(transport, params, page,
+                                                            executor=executor, offload=offload)
+                                           for page in range(start, min(start + workers, num_pages))])
+
+            # Merge in page order so results keep the site's ranking
+            for page in pages:
+                fresh = 0
+                for result in page:
+                    if result.link in seen:
+                        continue
+                    seen.add(result.link)
+                    fresh += 1
+                    results.append(result)
+
+                    if len(results) >= self.limit:
+                        return results
+
+                if len(page) < self.page_size or fresh == 0:
+                    return results
+
+        return results
+
+
+class SiteSearchParser(SearchParser):
+    """
+    Subclass of the SearchParser class for sites that support restricting the
+    search to specific sites with the 'site:' keyword
+    """
+
+    # Maximum number of words in a single query, for sites that ignore the
+    # rest of longer queries. None if there is no limit.
+    max_terms = None
+
+    def __init__(self, max_query_length:int=1500, **kwargs) -> None:
+        """
+        Initialize the site search parser
+
+        Parameters
+        ----------
+        max_query_length : `int` (default=1500)
+            Maximum length of the URL-encoded search text of a single query.
+            Site lists that don't fit are split over several queries.
+        kwargs :
+            Additional parameters
+        """
+        super().__init__(**kwargs)
+
+        self.max_query_length = max_query_length
+
+        # Sites to restrict the search to
+        self.sites = []
+
+        # Site chunks from the last call to `site_chunks()`, and the settings
+        # they were computed for
+        self.chunks     = None
+        self.chunks_key = None
+
+
+    def add_site(self, site:str) -> None:
+        """
+        Append a site to the list of sites to restrict querying to
+
+        Parameters
+        ----------
+        site : `str`
+            Site to be queried (examples: 'wsj.com', 'npr.org')
+        """
+        self.sites.append(site)
+
+
+    def site_query(self, sites:List[str]) -> str:
+        """
+        Parameters
+        ----------
+        sites : `List[str]`
+            Sites to restrict the search to
+
+        Returns
+        -------
+        Search text restricted to any of `sites`
+        """
+        if len(sites) == 0:
+            return self.search_text
+
+        return f"{self.search_text} {' OR '.join(f'site:{site}' for site in sites)}".strip()
+
+
+    def fits(self, sites:List[str]) -> bool:
+        """
+        Returns
+        -------
+        True if a query restricted to `sites` is within the site's limits
+        """
+        query = self.site_query(sites)
+        if self.max_terms is not None and len(query.split()) > self.max_terms:
+            return False
+
+        return len(quote_plus(query)) <= self.max_query_length
+
+
+    def site_chunks(self) -> List[List[str]]:
+        """
+        Split the site list into as few queries as possible, each within the
+        site's query limits. A site that doesn't fit with any other gets a
+        query of its own.
+
+        Returns
+        -------
+        List of site lists, one for each query to submit
+        """
+        # Only re-plan when the query changes, since parsers are re-run often
+        key = (self.search_text, tuple(self.sites), self.max_query_length, self.max_terms)
+        if self.chunks_key == key:
+            return self.chunks
+
+        chunks = []
+        chunk  = []
+        for site in dict.fromkeys(self.sites):
+            if len(chunk) > 0 and not self.fits(chunk + [site]):
+                chunks.append(chunk)
+                chunk = []
+            chunk.append(site)
+
+        if len(chunk) > 0 or len(chunks) == 0:
+            chunks.append(chunk)
+
+        self.chunks     = chunks
+        self.chunks_key = key
+        return chunks
+
+
+    def get_params(self, sites:List[str]=None) -> dict:
+        """
+        Assemble the query parameters. Calling this does not modify the
+        parser, so the same query is returned each time.
+
+        Parameters
+        ----------
+        sites : `List[str]` (default=None)
+            Sites to restrict the search to. Defaults to every added site.
+
+        Returns
+        -------
+        Python dict() containing parameters to submit to query
+        """
+        params = super().get_params()
+        params[self.search_tag] = self.site_query(self.sites if sites is None else sites)
+
+        return params
+
+
+    @staticmethod
+    def interleave(pages:List[List[ParserResult]], seen:set) -> Iterator[ParserResult]:
+        """
+        Merge the results of several queries, taking one from each in turn so
+        every query is represented. Results whose link is in `seen` are
+        skipped, and the links of the yielded results are added to it.
+        """
+        for results in zip_longest(*pages):
+            for result in results:
+                if result is None or result.link in seen:
+                    continue
+                seen.add(result.link)
+                yield result
 
-        return super().get_params()
+
+    def parse_cached(self, params:dict=None) -> List[ParserResult]:
+        """
+        Submits the query as a conditional request, revalidating any copy of
+        the page held in `self.cache`. A site list that needs several queries
+        is revalidated one chunk at a time.
+
+        Parameters
+        ----------
+        params : `dict` (default=None)
+            Query parameters. Defaults to the queries for every site chunk.
+
+        Returns
+        -------
+        Parsed results from the specified URL
+        """
+        if params is None and len(self.site_chunks()) > 1:
+            return list(self.iter_page_results())
+
+        return super().parse_cached(params)
+
+
+    async def apage_results(self, transport:AsyncTransport, executor:Executor=None,
+                                  offload:bool=False) -> List[ParserResult]:
+        """
+        Asynchronous version of `iter_page_results()`. When the site list
+        needs several queries, each page of the chunks is fetched with at
+        most `page_workers` queries in flight, and their results are
+        interleaved.
+
+        Parameters
+        ----------
+        transport : `AsyncTransport`
+            Transport used to fetch the pages
+        executor : `Executor` (default=None)
+            Executor used when `offload` is True
+        offload : `bool` (default=False)
+            Run the HTML extraction in `executor`
+
+        Returns
+        -------
+        Parsed results, whether or not they have been seen before
+        """
+        chunks = self.site_chunks()
+        if len(chunks) <= 1:
+            return await super().apage_results(transport, executor=executor, offload=offload)
+
+        semaphore = asyncio.Semaphore(max(1, self.page_workers))
+        async def fetch(params, page):
+            async with semaphore:
+                return await self.afetch_page(transport, params, page,
+                                              executor=executor, offload=offload)
+
+        queries = [self.get_params(sites) for sites in chunks]
+        seen    = set()
+        results = []
+        for page in range(self.num_pages()):
+            pages = await asyncio.gather(*[fetch(params, page) for params in queries])
+            results.extend(islice(self.interleave(pages, seen), self.limit - len(results)))
+            if len(results) >= self.limit:
+                return results
+
+            # Only chunks that returned a full page have more results
+            queries = [params for params,found in zip(queries, pages)
+                       if self.page_size is not None and len(found) >= self.page_size]
+            if len(queries) == 0:
+                break
+
+        return results
+
+
+    def iter_page_results(self) -> Iterator[ParserResult]:
+        """
+        Lazily yield results for every chunk of the site list. When the site
+        list fits in a single query this is the same as a plain search.
+        Otherwise the chunks are queried concurrently one page at a time, and
+        results are interleaved so every chunk is represented before `limit`
+        is reached.
+
+        Returns
+        -------
+        Iterator over the parsed results
+        """
+        chunks = self.site_chunks()
+        if len(chunks) <= 1:
+            yield from super().iter_page_results()
+            return
+
+        queries = [self.get_params(sites) for sites in chunks]
+        seen    = set()
+        count   = 0
+        workers = max(1, min(self.page_workers, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for page in range(self.num_pages()):
+                pages = list(pool.map(self.fetch_page, queries, repeat(page)))
+
+                for result in self.interleave(pages, seen):
+                    count += 1
+                    yield result
+
+                    if count >= self.limit:
+                        return
+
+                # Only chunks that returned a full page have more results
+                queries = [params for params,results in zip(queries, pages)
+                           if self.page_size is not None and len(results) >= self.page_size]
+                if len(queries) == 0:
+                    return
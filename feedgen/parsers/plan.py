@@ -0,0 +1,120 @@
+# File: feedgen/parsers/plan.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the ExtractionPlan class, which compiles a TagConfig into a
+# single plan for extracting every field from a container. Fields that share
+# the same CSS selector (e.g. Google News uses 'h3.ipQwMb' for both the title
+# and the description) are only evaluated once per container, and each
+# selector is compiled to only return its first match since that is the only
+# one that is ever used.
+#
+# Selectors that override `getValue()` can't be compiled, so the plan falls
+# back to calling their `get()` method directly.
+# =============================================================================
+
+import threading
+from lxml import etree
+from lxml.html import HtmlElement
+from typing import Any, List
+
+from .parser import CSSInnerText, CSSAttribute, TagConfig
+
+
+class ExtractionPlan():
+    """
+    Compiled plan for extracting all of the fields in a `TagConfig`
+    """
+
+    def __init__(self, tag_config:TagConfig) -> None:
+        """
+        Parameters
+        ----------
+        tag_config : `TagConfig`
+            Tag configuration to be compiled
+        """
+        fields = [('title', tag_config.title),
+                  ('link', tag_config.link),
+                  ('descrip', tag_config.descrip)]
+        fields.extend(tag_config.extras.items())
+
+        # Names of the extra tags, in the order they are extracted
+        self.extra_names = list(tag_config.extras.keys())
+
+        # Unique XPaths to evaluate for each container
+        self.paths = []
+
+        # (name, path index, attribute, default, fallback selector) for each field
+        self.fields = []
+
+        for name,tag in fields:
+            if not self.compilable(tag):
+                self.fields.append((name, None, None, tag.default, tag))
+                continue
+
+            path = f'({tag.path})[1]'
+            if path not in self.paths:
+                self.paths.append(path)
+            self.fields.append((name, self.paths.index(path), tag.attribute,
+                                tag.default, None))
+
+        # Compiled XPath objects for each thread
+        self.local = threading.local()
+
+
+    @staticmethod
+    def compilable(tag:CSSInnerText) -> bool:
+        """
+        Returns
+        -------
+        True if the value of `tag` can be computed by the plan directly
+        """
+        return type(tag).getValue in (CSSInnerText.getValue, CSSAttribute.getValue)
+
+
+    def xpaths(self) -> list:
+        """
+        Returns
+        -------
+        Compiled XPaths for the calling thread
+        """
+        xpaths = getattr(self.local, 'xpaths', None)
+        if xpaths is None:
+            xpaths = self.local.xpaths = [etree.XPath(path) for path in self.paths]
+
+        return xpaths
+
+
+    def extract(self, div:HtmlElement) -> List[Any]:
+        """
+        Extract all fields from a single container
+
+        Parameters
+        ----------
+        div : `HtmlElement`
+            Container element extracted from the webpage
+
+        Returns
+        -------
+        List of values for the title, link, description and then each of the
+        extra tags in `self.extra_names`. An IndexError is raised if a field
+        without a default has no match.
+        """
+        matches = [xpath(div) for xpath in self.xpaths()]
+
+        values = []
+        for name,indx,attr,default,fallback in self.fields:
+            if fallback is not None:
+                values.append(fallback.get(div))
+                continue
+
+            match = matches[indx]
+            if len(match) == 0:
+                if default is None:
+                    raise IndexError(f"No match found for '{name}'")
+                values.append(default)
+            elif attr is None:
+                values.append(match[0].text_content())
+            else:
+                values.append(match[0].get(attr))
+
+        return values
@@ -0,0 +1,348 @@
+# File: feedgen/parsers/profiler.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the SelectorProfiler class, which runs each selector of a
+# parser's TagConfig against a page on its own and reports how it behaves. This
+# is used to tune site configs: deep descendant selectors can be expensive to
+# evaluate, and a selector that silently falls back to its default hides both
+# broken site markup and wasted work.
+#
+# For every selector the report gives:
+#    - the CSS and the XPath it is translated to
+#    - the time spent evaluating it, in total and per container
+#    - the number of matches in each container (min/mean/max)
+#    - the rate at which containers fall back to the default value, or have no
+#      match at all where there is no default
+# Selectors that take several times as long as the typical field selector,
+# or longer than an optional fixed time per container, are flagged as slow,
+# as are those that never match. Selectors that all take about the same time
+# are not flagged.
+#
+# File defines `explain()`, which profiles a parser against a page fetched by
+# the parser or supplied by the caller.
+# =============================================================================
+
+import time
+from lxml.html import fromstring, HtmlElement
+from typing import List, Union
+
+from .parser import CSSInnerText, Parser, TagConfig
+from .plan import ExtractionPlan
+
+
+class SelectorProfile():
+    """
+    Measurements of a single selector
+    """
+
+    def __init__(self, name:str, tag:CSSInnerText) -> None:
+        """
+        Parameters
+        ----------
+        name : `str`
+            Field the selector extracts (e.g. 'title')
+        tag : `CSSInnerText`
+            Selector being profiled
+        """
+        self.name      = name
+        self.css       = tag.css
+        self.attribute = tag.attribute
+        self.path      = tag.path
+        self.default   = tag.default
+
+        # Selectors overriding `getValue()` are timed by calling it directly
+        self.custom = not ExtractionPlan.compilable(tag)
+
+        # Total evaluation time, and number of evaluations
+        self.seconds     = 0.0
+        self.evaluations = 0
+
+        # Number of matches found in each container
+        self.match_counts = []
+
+        # Containers that fell back to the default, and containers without a
+        # match or default
+        self.defaults = 0
+        self.missing  = 0
+
+        # Reasons the selector was flagged in the report
+        self.flags = []
+
+
+    @property
+    def containers(self) -> int:
+        return len(self.match_counts)
+
+
+    @property
+    def time_per_container(self) -> float:
+        """ Mean evaluation time, in seconds """
+        return self.seconds / self.evaluations if self.evaluations > 0 else 0.0
+
+
+    @property
+    def mean_matches(self) -> float:
+        return sum(self.match_counts) / self.containers if self.containers > 0 else 0.0
+
+
+    @property
+    def default_rate(self) -> float:
+        """ Fraction of containers that fell back to the default """
+        return self.defaults / self.containers if self.containers > 0 else 0.0
+
+
+    @property
+    def missing_rate(self) -> float:
+        """ Fraction of containers with no match and no default """
+        return self.missing / self.containers if self.containers > 0 else 0.0
+
+
+    def as_dict(self) -> dict:
+        """
+        Returns
+        -------
+        The measurements as a dictionary, e.g. for saving as JSON
+        """
+        return {
+            'name'              : self.name,
+            'css'               : self.css,
+            'attribute'         : self.attribute,
+            'xpath'             : self.path,
+            'seconds'           : self.seconds,
+            'time_per_container': self.time_per_container,
+            'containers'        : self.containers,
+            'min_matches'       : min(self.match_counts, default=0),
+            'mean_matches'      : self.mean_matches,
+            'max_matches'       : max(self.match_counts, default=0),
+            'default_rate'      : self.default_rate,
+            'missing_rate'      : self.missing_rate,
+            'flags'             : list(self.flags)
+        }
+
+
+class ProfileReport():
+    """
+    Results of profiling a `TagConfig` against a page
+    """
+
+    def __init__(self, container:SelectorProfile, selectors:List[SelectorProfile],
+                       parse_seconds:float) -> None:
+        """
+        Parameters
+        ----------
+        container : `SelectorProfile`
+            Profile of the container selector, evaluated against the page
+        selectors : `List[SelectorProfile]`
+            Profiles of the field selectors, evaluated against each container
+        parse_seconds : `float`
+            Time spent parsing the page
+        """
+        self.container     = container
+        self.selectors     = selectors
+        self.parse_seconds = parse_seconds
+
+
+    def slowest(self, count:int=3) -> List[SelectorProfile]:
+        """
+        Returns
+        -------
+        The `count` field selectors with the highest total evaluation time
+        """
+        return sorted(self.selectors, key=lambda prof: prof.seconds, reverse=True)[:count]
+
+
+    def as_dict(self) -> dict:
+        return {
+            'parse_seconds': self.parse_seconds,
+            'container'    : self.container.as_dict(),
+            'selectors'    : [prof.as_dict() for prof in self.selectors]
+        }
+
+
+    def __str__(self) -> str:
+        """
+        Returns
+        -------
+        Human readable 'explain' report
+        """
+        rep  = f'Parse: {self.parse_seconds*1e3:.2f} ms\n'
+        rep += (f'Container: {self.container.css}\n'
+                f'    xpath: {self.container.path}\n'
+                f'    {self.container.seconds*1e3:.2f} ms, '
+                f'{sum(self.container.match_counts)} containers\n')
+
+        for prof in self.selectors:
+            attr = '' if prof.attribute is None else f' @{prof.attribute}'
+            rep += (f'\n{prof.name}: {prof.css}{attr}\n'
+                    f'    xpath: {prof.path}\n'
+                    f'    {prof.seconds*1e3:.2f} ms total, '
+                    f'{prof.time_per_container*1e6:.1f} us/container\n'
+                    f'    matches/container: min {min(prof.match_counts, default=0)}, '
+                    f'mean {prof.mean_matches:.2f}, max {max(prof.match_counts, default=0)}\n'
+                    f'    default {prof.default_rate:.0%}, missing {prof.missing_rate:.0%}\n')
+            if prof.flags:
+                rep += f"    flags: {', '.join(prof.flags)}\n"
+
+        return rep
+
+
+class SelectorProfiler():
+    """
+    Profiles each selector of a `TagConfig` against a page
+    """
+
+    def __init__(self, tag_config:TagConfig, repeat:int=1, slow_ratio:float=2.0,
+                       slow_seconds:float=None) -> None:
+        """
+        Parameters
+        ----------
+        tag_config : `TagConfig`
+            Tag configuration to be profiled
+        repeat : `int` (default=1)
+            Number of times each selector is evaluated per container. Timings
+            of small pages are more stable with more repeats.
+        slow_ratio : `float` (default=2.0)
+            Field selectors that take longer than `slow_ratio` times the
+            median field selector are flagged as slow
+        slow_seconds : `float` (default=None)
+            Field selectors that take longer than this per container are also
+            flagged as slow. Not used by default.
+        """
+        self.tag_config   = tag_config
+        self.repeat       = max(1, repeat)
+        self.slow_ratio   = slow_ratio
+        self.slow_seconds = slow_seconds
+
+
+    def fields(self) -> List[SelectorProfile]:
+        """
+        Returns
+        -------
+        Empty profiles for the title, link, description and extra selectors
+        """
+        fields = [('title', self.tag_config.title),
+                  ('link', self.tag_config.link),
+                  ('descrip', self.tag_config.descrip)]
+        fields.extend(self.tag_config.extras.items())
+
+        return [SelectorProfile(name, tag) for name,tag in fields]
+
+
+    def time_selector(self, prof:SelectorProfile, tag:CSSInnerText, div:HtmlElement) -> None:
+        """
+        Evaluate a selector against a container and record the results
+        """
+        matches = None
+        start   = time.perf_counter()
+        for _ in range(self.repeat):
+            if prof.custom:
+                try:
+                    tag.getValue(div)
+                    matches = 1
+                except IndexError:
+                    matches = 0
+            else:
+                matches = len(tag(div))
+        prof.seconds     += time.perf_counter() - start
+        prof.evaluations += self.repeat
+
+        prof.match_counts.append(matches)
+        if matches == 0:
+            if prof.default is None:
+                prof.missing += 1
+            else:
+                prof.defaults += 1
+
+
+    def flag(self, container:SelectorProfile, selectors:List[SelectorProfile]) -> None:
+        """
+        Mark selectors that need attention
+        """
+        if sum(container.match_counts) == 0:
+            container.flags.append('no containers')
+            return
+
+        ranked = sorted(prof.seconds for prof in selectors)
+        median = ranked[(len(ranked) - 1) // 2]
+        for prof in selectors:
+            if (median > 0 and prof.seconds > self.slow_ratio * median) or \
+               (self.slow_seconds is not None and prof.time_per_container > self.slow_seconds):
+                prof.flags.append('slow')
+
+            if prof.missing > 0:
+                prof.flags.append('missing')
+            if prof.defaults == prof.containers:
+                prof.flags.append('always default')
+            elif prof.defaults > 0:
+                prof.flags.append('default')
+            if prof.mean_matches > 1:
+                # Only the first match is used
+                prof.flags.append('multiple matches')
+
+
+    def run(self, html:Union[str,bytes]) -> ProfileReport:
+        """
+        Profile the configuration against a page
+
+        Parameters
+        ----------
+        html : `str` or `bytes`
+            HTML of the page
+
+        Returns
+        -------
+        Report of the measurements
+        """
+        start = time.perf_counter()
+        root  = fromstring(html)
+        parse_seconds = time.perf_counter() - start
+
+        container = SelectorProfile('container', self.tag_config.container)
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            divs = self.tag_config.container(root)
+        container.seconds     = (time.perf_counter() - start) / self.repeat
+        container.evaluations = 1
+        container.match_counts.append(len(divs))
+
+        selectors = self.fields()
+        tags      = [self.tag_config.title, self.tag_config.link, self.tag_config.descrip]
+        tags.extend(self.tag_config.extras.values())
+
+        # XPaths are compiled on first use, which shouldn't count against
+        # whichever selector happens to run first
+        if len(divs) > 0:
+            for prof,tag in zip(selectors, tags):
+                if not prof.custom:
+                    tag(divs[0])
+
+        for div in divs:
+            for prof,tag in zip(selectors, tags):
+                self.time_selector(prof, tag, div)
+
+        self.flag(container, selectors)
+        return ProfileReport(container, selectors, parse_seconds)
+
+
+def explain(parser:Parser, html:Union[str,bytes]=None, **kwargs) -> ProfileReport:
+    """
+    Profile the selectors of a parser
+
+    Parameters
+    ----------
+    parser : `Parser`
+        Parser whose `tag_config` is profiled
+    html : `str` or `bytes` (default=None)
+        Page to profile against. If not given, the parser's query is
+        submitted and the returned page is used.
+    kwargs
+        Extra parameters passed to `SelectorProfiler`
+
+    Returns
+    -------
+    Report of the measurements
+    """
+    if html is None:
+        html = parser.fetch_html()
+
+    return SelectorProfiler(parser.tag_config, **kwargs).run(html)
@@ -0,0 +1,356 @@
+# File: feedgen/parsers/ratelimit.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the TokenBucket class, which limits the rate of requests sent to
+# a single host. Each request takes a token, tokens are refilled at `rate` per
+# second up to `burst`, and callers wait when the bucket is empty. Waits are
+# reserved under a lock, so any number of threads can share a bucket and the
+# requests are spread out evenly rather than all waking at once.
+#
+# File defines the RateLimiter class, a registry of token buckets keyed by
+# parser type and host. Limits are configured per parser type (`Parser.type`),
+# and a process-wide `rate_limiter` is shared by every transport, so all
+# parser instances and threads querying a host draw from the same bucket. The
+# built-in parsers start with the polite limits in `DEFAULT_LIMITS`.
+#
+# File defines the RetryPolicy class, which decides whether a failed request
+# is retried and how long to wait first: exponential backoff with full jitter,
+# or the delay requested by the server in a `Retry-After` header. When a host
+# asks for a delay its bucket is paused, so other threads back off as well.
+# =============================================================================
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+# <parser type, (rate, burst)> limits of the built-in parsers
+DEFAULT_LIMITS = {
+    'googlenews': (1.0, 2),
+    'bingnews'  : (2.0, 4),
+    'yahoonews' : (2.0, 4),
+}
+
+
+def check_limit(rate:float, burst:int) -> None:
+    """
+    Raise a ValueError if `rate` and `burst` don't describe a usable bucket
+    """
+    if not rate > 0:
+        raise ValueError(f'Rate must be a positive number of requests per second, not {rate!r}')
+    if not burst >= 1:
+        raise ValueError(f'Burst must be at least 1, not {burst!r}')
+
+
+class TokenBucket():
+    """
+    Thread-safe token bucket
+    """
+
+    def __init__(self, rate:float, burst:int=1) -> None:
+        """
+        Parameters
+        ----------
+        rate : `float`
+            Number of tokens added per second
+        burst : `int` (default=1)
+            Maximum number of tokens held, i.e. the number of requests that
+            can be sent at once after an idle period
+        """
+        check_limit(rate, burst)
+        self.rate   = rate
+        self.burst  = burst
+        self.tokens = float(burst)
+        self.last   = time.monotonic()
+
+        # Nothing is released before this time (set by `pause()`)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+
+    def reserve(self, tokens:float=1.0) -> float:
+        """
+        Take tokens from the bucket without blocking
+
+        Parameters
+        ----------
+        tokens : `float` (default=1.0)
+            Number of tokens to take
+
+        Returns
+        -------
+        Number of seconds the caller must wait before using the tokens
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last   = now
+
+            # Tokens may go negative, which queues callers behind each other
+            self.tokens -= tokens
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+            # Requests queued behind a pause keep their spacing once it ends
+            return max(0.0, self.paused_until - now) + wait
+
+
+    def acquire(self, tokens:float=1.0) -> float:
+        """
+        Take tokens from the bucket, waiting until they are available
+
+        Parameters
+        ----------
+        tokens : `float` (default=1.0)
+            Number of tokens to take
+
+        Returns
+        -------
+        Number of seconds spent waiting
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+    def pause(self, delay:float) -> None:
+        """
+        Stop releasing tokens for `delay` seconds (e.g. after a 429 response)
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+
+class RateLimiter():
+    """
+    Registry of per-host token buckets with limits set per parser type
+    """
+
+    def __init__(self, rate:float=None, burst:int=1,
+                       limits:Dict[str,Tuple[float,int]]=None) -> None:
+        """
+        Parameters
+        ----------
+        rate : `float` (default=None)
+            Default number of requests per second sent to each host. Hosts
+            are not limited by default.
+        burst : `int` (default=1)
+            Default burst size of each bucket
+        limits : `Dict[str,Tuple[float,int]]` (default=None)
+            <parser type, (rate, burst)> limits of specific parser types
+        """
+        if rate is not None:
+            check_limit(rate, burst)
+        self.default = (rate, burst)
+
+        # <parser type, (rate, burst)> limits
+        self.limits = {}
+        for parser_type,(type_rate, type_burst) in (limits or {}).items():
+            check_limit(type_rate, type_burst)
+            self.limits[parser_type] = (type_rate, type_burst)
+
+        # <(parser type, host), TokenBucket> buckets
+        self.buckets = {}
+        self.lock    = threading.Lock()
+
+
+    def configure(self, parser_type:str, rate:float, burst:int=1) -> None:
+        """
+        Set the request rate used by all parsers of a given type
+
+        Parameters
+        ----------
+        parser_type : `str`
+            Value of `Parser.type` (e.g. 'googlenews'), or None to set the
+            default for all other parsers
+        rate : `float`
+            Number of requests per second sent to each host, or None to
+            remove the limit
+        burst : `int` (default=1)
+            Number of requests that can be sent at once after an idle period
+        """
+        if rate is not None:
+            check_limit(rate, burst)
+
+        with self.lock:
+            if parser_type is None:
+                self.default = (rate, burst)
+            else:
+                self.limits[parser_type] = (rate, burst)
+
+            # Rebuild the affected buckets with the new limits
+            self.buckets = {key: bucket for key,bucket in self.buckets.items()
+                            if key[0] != parser_type and
+                               (parser_type is not None or key[0] in self.limits)}
+
+
+    def limit(self, parser_type:str) -> Tuple[float,int]:
+        """
+        Returns
+        -------
+        (rate, burst) limit for a parser type
+        """
+        return self.limits.get(parser_type, self.default)
+
+
+    def bucket(self, url:str, parser_type:str=None) -> TokenBucket:
+        """
+        Return the bucket shared by requests of a parser type to the host of
+        `url`
+
+        Parameters
+        ----------
+        url : `str`
+            URL being requested
+        parser_type : `str` (default=None)
+            Type of the parser submitting the request
+
+        Returns
+        -------
+        Token bucket, or None if the parser type is not rate limited
+        """
+        rate, burst = self.limit(parser_type)
+        if rate is None:
+            return None
+
+        key = (parser_type, urlsplit(url).netloc.lower())
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(rate, burst)
+
+        return bucket
+
+
+    def acquire(self, url:str, parser_type:str=None) -> float:
+        """
+        Wait until a request to the host of `url` is allowed
+
+        Returns
+        -------
+        Number of seconds spent waiting
+        """
+        bucket = self.bucket(url, parser_type)
+        if bucket is None:
+            return 0.0
+
+        return bucket.acquire()
+
+
+    def reserve(self, url:str, parser_type:str=None) -> float:
+        """
+        Reserve a request to the host of `url` without blocking
+
+        Returns
+        -------
+        Number of seconds the caller must wait before sending the request
+        """
+        bucket = self.bucket(url, parser_type)
+        if bucket is None:
+            return 0.0
+
+        return bucket.reserve()
+
+
+    def pause(self, url:str, parser_type:str, delay:float) -> None:
+        """
+        Hold back all requests to the host of `url` for `delay` seconds
+        """
+        bucket = self.bucket(url, parser_type)
+        if bucket is not None:
+            bucket.pause(delay)
+
+
+class RetryPolicy():
+    """
+    Exponential backoff with jitter that honours `Retry-After`
+    """
+
+    def __init__(self, max_retries:int=3, backoff_factor:float=0.5,
+                       max_backoff:float=60.0,
+                       statuses:Tuple[int,...]=(429, 500, 502, 503, 504)) -> None:
+        """
+        Parameters
+        ----------
+        max_retries : `int` (default=3)
+            Maximum number of times a request is retried
+        backoff_factor : `float` (default=0.5)
+            Base delay in seconds. The n-th retry waits a random time of up
+            to `backoff_factor * 2**n` seconds.
+        max_backoff : `float` (default=60.0)
+            Longest delay between retries, including delays requested with
+            `Retry-After`
+        statuses : `Tuple[int,...]` (default=(429, 500, 502, 503, 504))
+            Response status codes that are retried
+        """
+        self.max_retries    = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff    = max_backoff
+        self.statuses       = frozenset(statuses)
+
+
+    def should_retry(self, attempt:int, status:int) -> bool:
+        """
+        Returns
+        -------
+        True if a response with status `status` on retry `attempt` (starting
+        at 0) should be retried
+        """
+        return attempt < self.max_retries and status in self.statuses
+
+
+    @staticmethod
+    def retry_after(headers:Dict[str,str]) -> float:
+        """
+        Parse the `Retry-After` header of a response
+
+        Returns
+        -------
+        Number of seconds requested by the server, or None
+        """
+        value = headers.get('Retry-After')
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+    def delay(self, attempt:int, headers:Dict[str,str]=None) -> float:
+        """
+        Compute how long to wait before retrying
+
+        Parameters
+        ----------
+        attempt : `int`
+            Number of retries already made
+        headers : `Dict[str,str]` (default=None)
+            Headers of the failed response
+
+        Returns
+        -------
+        Number of seconds to wait
+        """
+        requested = None if headers is None else self.retry_after(headers)
+        if requested is not None:
+            return min(self.max_backoff, requested)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+# Process-wide rate limiter shared by all transports
+rate_limiter = RateLimiter(limits=DEFAULT_LIMITS)
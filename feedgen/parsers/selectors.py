@@ -0,0 +1,203 @@
+# File: feedgen/parsers/selectors.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the CompiledSelector class, which holds the XPath translation of
+# a CSS selector along with the method used to pull a value out of the matched
+# element (either its inner text or one of its attributes).
+#
+# File defines the SelectorCache class, a process-wide thread-safe cache of
+# compiled selectors keyed by (css, attr). Translating CSS to XPath is done in
+# pure Python by cssselect and is by far the most expensive part of building a
+# site parser, so sharing the translation means each selector used by the
+# built-in site configs is only translated once per process, the first time a
+# parser using it is constructed. The cache holds at most `max_size` selectors
+# and drops the least recently used first, so processes building parsers from
+# user-supplied selectors don't grow it without bound.
+#
+# lxml serializes concurrent calls to a single XPath object, so the compiled
+# XPath itself is kept per thread to avoid workers contending on a lock.
+# =============================================================================
+
+import threading
+from collections import OrderedDict
+from lxml import etree
+from lxml.cssselect import LxmlTranslator
+from lxml.html import HtmlElement
+from cssselect import SelectorSyntaxError, parse
+from cssselect.parser import CombinedSelector
+from typing import List
+
+
+class CompiledSelector():
+    """
+    CSS selector translated to XPath
+    """
+
+    def __init__(self, css:str, attr:str=None) -> None:
+        """
+        Parameters
+        ----------
+        css : `str`
+            CSS selection tag
+        attr : `str` (default=None)
+            Attribute to extract from matched elements. If None, the inner text
+            of the element is extracted.
+        """
+        self.css  = css
+        self.attr = attr
+
+        translator = LxmlTranslator()
+        self.path = translator.css_to_xpath(css)
+
+        # Self-matching only makes sense for selectors without combinators
+        try:
+            self.matchable = not any(isinstance(sel.parsed_tree, CombinedSelector)
+                                     for sel in parse(css))
+        except SelectorSyntaxError:
+            self.matchable = False
+
+        self.self_path = None
+        if self.matchable:
+            self.self_path = translator.css_to_xpath(css, prefix='self::')
+
+        # Compiled XPath objects for each thread
+        self.local = threading.local()
+
+
+    def xpath(self) -> etree.XPath:
+        """
+        Returns
+        -------
+        Compiled XPath for the calling thread
+        """
+        xpath = getattr(self.local, 'xpath', None)
+        if xpath is None:
+            xpath = self.local.xpath = etree.XPath(self.path)
+
+        return xpath
+
+
+    def __call__(self, element:HtmlElement) -> List[HtmlElement]:
+        """
+        Returns
+        -------
+        Elements under `element` (inclusive) that match the selector
+        """
+        return self.xpath()(element)
+
+
+    def value(self, element:HtmlElement, indx:int=0) -> str:
+        """
+        Extract the value of a matched element
+
+        Parameters
+        ----------
+        element : `HtmlElement`
+            Element to search
+        indx : `int` (default=0)
+            Index of the matched element to extract the value from
+
+        Returns
+        -------
+        Inner text or attribute value of the matched element. An IndexError is
+        raised if there are not enough matches.
+        """
+        match = self(element)[indx]
+        if self.attr is None:
+            return match.text_content()
+
+        return match.get(self.attr)
+
+
+    def matches(self, element:HtmlElement) -> bool:
+        """
+        Test whether an element itself is selected by this selector. Only valid
+        when `self.matchable` is True.
+
+        Parameters
+        ----------
+        element : `HtmlElement`
+            Element to be tested
+
+        Returns
+        -------
+        True if `element` matches the selector
+        """
+        xpath = getattr(self.local, 'self_xpath', None)
+        if xpath is None:
+            xpath = self.local.self_xpath = etree.XPath(self.self_path)
+
+        return len(xpath(element)) > 0
+
+
+class SelectorCache():
+    """
+    Thread-safe cache of compiled selectors keyed by (css, attr)
+    """
+
+    def __init__(self, max_size:int=1024) -> None:
+        """
+        Parameters
+        ----------
+        max_size : `int` (default=1024)
+            Maximum number of compiled selectors held. The least recently used
+            are dropped first.
+        """
+        self.max_size  = max_size
+        self.selectors = OrderedDict()
+        self.lock      = threading.Lock()
+        self.hits      = 0
+        self.misses    = 0
+
+
+    def get(self, css:str, attr:str=None) -> CompiledSelector:
+        """
+        Return the compiled selector for a CSS tag, compiling it on first use
+
+        Parameters
+        ----------
+        css : `str`
+            CSS selection tag
+        attr : `str` (default=None)
+            Attribute to extract from matched elements
+
+        Returns
+        -------
+        Compiled selector
+        """
+        key = (css, attr)
+        with self.lock:
+            selector = self.selectors.get(key)
+            if selector is None:
+                self.misses += 1
+                selector = self.selectors[key] = CompiledSelector(css, attr)
+                while len(self.selectors) > self.max_size:
+                    self.selectors.popitem(last=False)
+            else:
+                self.hits += 1
+                self.selectors.move_to_end(key)
+
+        return selector
+
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        Dictionary with the number of cache 'hits', 'misses' and cached 'size'
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.selectors)}
+
+
+    def clear(self) -> None:
+        """
+        Remove all compiled selectors and reset the counters
+        """
+        with self.lock:
+            self.selectors = OrderedDict()
+            self.hits      = 0
+            self.misses    = 0
+
+
+# Process-wide cache shared by all parsers
+selector_cache = SelectorCache()
@@ -0,0 +1,176 @@
+# File: feedgen/parsers/transport.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the HttpTransport class, which is responsible for submitting
+# the web requests made by parsers. Each transport holds a pooled
+# `requests.Session` so that connections to a given host are kept alive and
+# reused between queries instead of opening a new TCP+TLS connection each
+# time.
+#
+# By default all parsers share a single process-wide transport, which can be
+# replaced with `set_default_transport()` or overridden per parser by passing
+# `transport=` at construction time.
+#
+# Every request first waits on the per-host token bucket of the parser type
+# sending it (see `feedgen.parsers.ratelimit`). Connection failures are retried
+# by urllib3, while throttled or failing responses (429, 5xx) are retried by
+# the transport's `RetryPolicy`, which honours `Retry-After` and pauses the
+# host's bucket so other threads back off too.
+# =============================================================================
+
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .ratelimit import RateLimiter, RetryPolicy, rate_limiter
+
+
+class HttpTransport():
+    """
+    Pooled HTTP transport shared between parsers
+    """
+
+    def __init__(self, pool_connections:int=10, pool_maxsize:int=10,
+                       connect_timeout:float=5.0, read_timeout:float=30.0,
+                       retries:int=2, backoff_factor:float=0.5,
+                       headers:dict={}, limiter:RateLimiter=None,
+                       retry_policy:RetryPolicy=None) -> None:
+        """
+        Parameters
+        ----------
+        pool_connections : `int` (default=10)
+            Number of per-host connection pools to keep
+        pool_maxsize : `int` (default=10)
+            Maximum number of connections kept alive for each host
+        connect_timeout : `float` (default=5.0)
+            Seconds to wait when establishing a connection
+        read_timeout : `float` (default=30.0)
+            Seconds to wait between bytes received from the server
+        retries : `int` (default=2)
+            Number of times a failed connection or a 429/5xx response is
+            retried
+        backoff_factor : `float` (default=0.5)
+            Factor used to compute the sleep between retries
+        headers : `dict` (default={})
+            Headers sent with every request
+        limiter : `RateLimiter` (default=None)
+            Per-host rate limiter. By default the process-wide `rate_limiter`
+            is shared with all other transports.
+        retry_policy : `RetryPolicy` (default=None)
+            Policy for retrying throttled or failing responses. By default
+            responses are retried `retries` times with `backoff_factor`.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize     = pool_maxsize
+        self.timeout          = (connect_timeout, read_timeout)
+        self.retries          = retries
+        self.backoff_factor   = backoff_factor
+
+        self.limiter      = rate_limiter if limiter is None else limiter
+        self.retry_policy = retry_policy
+        if retry_policy is None:
+            self.retry_policy = RetryPolicy(max_retries=retries,
+                                            backoff_factor=backoff_factor)
+
+        # Assemble the session. Responses are retried in `get()`, so urllib3
+        # only retries failed connections.
+        retry = Retry(total=retries,
+                      status=0,
+                      respect_retry_after_header=False,
+                      backoff_factor=backoff_factor,
+                      allowed_methods=frozenset(['GET', 'HEAD']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+
+    def get(self, url:str, params:dict=None, headers:dict=None,
+                  stream:bool=False, parser_type:str=None) -> requests.Response:
+        """
+        Submit a GET request
+
+        Parameters
+        ----------
+        url : `str`
+            URL to be queried
+        params : `dict` (default=None)
+            Query parameters to pass with the URL
+        headers : `dict` (default=None)
+            Extra headers for this request only
+        stream : `bool` (default=False)
+            Defer downloading the response body until it is accessed
+        parser_type : `str` (default=None)
+            Type of the parser sending the request, which selects its rate limit
+
+        Returns
+        -------
+        Response returned by the server. If every retry fails, the last
+        response is returned.
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire(url, parser_type)
+            resp = self.session.get(url, params=params, headers=headers,
+                                    timeout=self.timeout, stream=stream)
+
+            if not self.retry_policy.should_retry(attempt, resp.status_code):
+                return resp
+
+            # Hold back every request to the host if the server asked for it
+            delay = self.retry_policy.delay(attempt, resp.headers)
+            if resp.status_code == 429 or 'Retry-After' in resp.headers:
+                self.limiter.pause(url, parser_type, delay)
+
+            resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+
+    def close(self) -> None:
+        """
+        Close all pooled connections
+        """
+        self.session.close()
+
+
+# Process-wide transport shared by all parsers
+_default_transport = None
+_default_lock      = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """
+    Returns
+    -------
+    Process-wide transport, which is created on first use
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+
+    return _default_transport
+
+
+def set_default_transport(transport:HttpTransport) -> None:
+    """
+    Replace the process-wide transport used by parsers that were not given
+    their own transport
+
+    Parameters
+    ----------
+    transport : `HttpTransport`
+        Transport to be shared
+    """
+    global _default_transport
+    with _default_lock:
+        _default_transport = transport
@@ -17,6 +17,11 @@ class YahooNews(SearchParser):
     Yahoo News parser
     """
 
+    # Results are paged 10 at a time, with the position of the first result
+    # given by the 'b' parameter
+    page_size  = 10
+    offset_tag = 'b'
+
     def __init__(self, **kwargs) -> None:
         """
         Initializes the Yahoo News parser
@@ -0,0 +1,8 @@
+# File: feedgen/scheduler/__init__.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the imports and sets up the `feedgen.scheduler` submodule.
+# =============================================================================
+
+from .job       import FeedJob
+from .scheduler import Scheduler
@@ -0,0 +1,184 @@
+# File: feedgen/scheduler/job.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the FeedJob class, which describes a single feed that is kept
+# up to date by the `Scheduler`: the parser class and query used to fetch
+# results, the writer and output file they are merged into, and how often the
+# query is polled.
+#
+# A new parser is created for every run, so no state is carried over between
+# polls. Results are merged into the output with the writer's `update()`
+# method, and the number of new items it returns drives the adaptive interval:
+#    - a run that finds new items shortens the interval (`speedup`)
+#    - a run that finds nothing, or fails, lengthens it (`slowdown`)
+# and the interval always stays between `min_interval` and `max_interval`.
+#
+# When the parser has a `seen_store`, results are only added to it once the
+# writer has merged them into the output, so a failed run loses nothing.
+# =============================================================================
+
+import time
+from typing import Any, Iterable, Iterator, Type
+
+from ..parsers.parser import Parser, ParserResult
+
+
+class FeedJob():
+    """
+    A feed that is periodically regenerated by polling a parser
+    """
+
+    def __init__(self, parser_cls:Type[Parser], writer:Any, output:str,
+                       search_term:str=None, sites:Iterable[str]=(),
+                       interval:float=900.0, min_interval:float=None,
+                       max_interval:float=None, speedup:float=0.75,
+                       slowdown:float=1.5, max_items:int=None,
+                       pretty_print:bool=True, parser_kwargs:dict=None,
+                       name:str=None) -> None:
+        """
+        Parameters
+        ----------
+        parser_cls : `Type[Parser]`
+            Parser class to create for each run (e.g. `GoogleNews`)
+        writer : `RssFeed` or `JsonFeed`
+            Writer used to merge new results into `output`
+        output : `str`
+            Name of the feed file that is kept up to date
+        search_term : `str` (default=None)
+            Search term passed to search parsers
+        sites : `Iterable[str]` (default=())
+            Sites the search is restricted to. The parser must support
+            `add_site()`.
+        interval : `float` (default=900.0)
+            Initial number of seconds between runs
+        min_interval : `float` (default=None)
+            Shortest allowed interval. Defaults to a quarter of `interval`.
+        max_interval : `float` (default=None)
+            Longest allowed interval. Defaults to four times `interval`.
+        speedup : `float` (default=0.75)
+            Factor applied to the interval after a run that found new items
+        slowdown : `float` (default=1.5)
+            Factor applied to the interval after a run that found no new items
+            or failed
+        max_items : `int` (default=None)
+            Maximum number of items kept in the feed
+        pretty_print : `bool` (default=True)
+            Whether the feed file is pretty printed
+        parser_kwargs : `dict` (default=None)
+            Extra keyword arguments passed to `parser_cls`
+        name : `str` (default=None)
+            Name of the job. Defaults to the output file name.
+        """
+        self.parser_cls    = parser_cls
+        self.writer        = writer
+        self.output        = output
+        self.search_term   = search_term
+        self.sites         = list(sites)
+        self.max_items     = max_items
+        self.pretty_print  = pretty_print
+        self.parser_kwargs = {} if parser_kwargs is None else parser_kwargs
+        self.name          = output if name is None else name
+
+        # Adaptive polling interval
+        self.interval     = interval
+        self.min_interval = interval / 4 if min_interval is None else min_interval
+        self.max_interval = interval * 4 if max_interval is None else max_interval
+        self.speedup      = speedup
+        self.slowdown     = slowdown
+
+        # Statistics of past runs
+        self.runs       = 0
+        self.failures   = 0
+        self.last_run   = None
+        self.last_new   = None
+        self.last_error = None
+
+        # Cleared when the job is removed from its scheduler
+        self.active = True
+
+
+    def __repr__(self) -> str:
+        return f'FeedJob({self.name!r}, interval={self.interval:.1f})'
+
+
+    def make_parser(self) -> Parser:
+        """
+        Returns
+        -------
+        Newly configured parser for a single run
+        """
+        parser = self.parser_cls(**self.parser_kwargs)
+        if self.search_term is not None:
+            parser.search_term(self.search_term)
+        for site in self.sites:
+            parser.add_site(site)
+
+        return parser
+
+
+    def run(self) -> int:
+        """
+        Poll the parser once and merge its results into the output feed
+
+        Returns
+        -------
+        Number of new items added to the feed
+        """
+        parser = self.make_parser()
+        if parser.seen_store is None:
+            return self.writer.update(parser.iter_results(), self.output,
+                                      max_items=self.max_items,
+                                      pretty_print=self.pretty_print)
+
+        # Results are only marked as seen once the feed has been written, so
+        # a failed run returns them again next time
+        parser.mark_seen = False
+        results   = []
+        new_items = self.writer.update(self.collect(parser.iter_results(), results),
+                                       self.output, max_items=self.max_items,
+                                       pretty_print=self.pretty_print)
+        parser.seen_store.add(results)
+        return new_items
+
+
+    @staticmethod
+    def collect(results:Iterable[ParserResult], taken:list) -> Iterator[ParserResult]:
+        """
+        Pass `results` on unchanged, appending each one to `taken`
+        """
+        for result in results:
+            taken.append(result)
+            yield result
+
+
+    def record(self, new_items:int=None, error:Exception=None) -> float:
+        """
+        Record the outcome of a run and adapt the polling interval
+
+        Parameters
+        ----------
+        new_items : `int` (default=None)
+            Number of new items found by the run
+        error : `Exception` (default=None)
+            Exception raised by the run, if it failed
+
+        Returns
+        -------
+        Updated interval, in seconds
+        """
+        self.runs      += 1
+        self.last_run   = time.time()
+        self.last_new   = new_items
+        self.last_error = error
+
+        if error is not None:
+            self.failures += 1
+            factor = self.slowdown
+        elif new_items:
+            factor = self.speedup
+        else:
+            factor = self.slowdown
+
+        self.interval = min(self.max_interval,
+                            max(self.min_interval, self.interval * factor))
+        return self.interval
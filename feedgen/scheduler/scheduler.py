@@ -0,0 +1,243 @@
+# File: feedgen/scheduler/scheduler.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the Scheduler class, a long-running service that keeps many
+# feeds (`FeedJob` objects) up to date.
+#
+# Jobs are held in a priority queue ordered by their next run time. A single
+# dispatcher thread sleeps until the earliest job is due and hands it to a
+# bounded thread pool. Jobs only leave the queue when a worker is free, so a
+# backlog waits in the queue (where it can still be removed) rather than in
+# the pool, and thousands of jobs can share a handful of threads.
+#
+# A job is never queued or run twice at once: adding a job that is already
+# queued reschedules it, and adding one that is running leaves it to be
+# requeued when the run completes.
+#
+# After each run the job adapts its interval (see `FeedJob.record()`), and the
+# next run time is randomly offset by up to `jitter` of the interval so jobs
+# with the same interval don't all hit the upstream sites at once.
+# =============================================================================
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from .job import FeedJob
+
+
+class Scheduler():
+    """
+    Runs feed jobs on their own intervals using a bounded worker pool
+    """
+
+    def __init__(self, max_workers:int=8, jitter:float=0.1, seed:int=None) -> None:
+        """
+        Parameters
+        ----------
+        max_workers : `int` (default=8)
+            Maximum number of jobs run at the same time
+        jitter : `float` (default=0.1)
+            Maximum random offset applied to each run time, as a fraction of
+            the job's interval
+        seed : `int` (default=None)
+            Seed for the jitter random number generator
+        """
+        self.max_workers = max_workers
+        self.jitter      = jitter
+        self.random      = random.Random(seed)
+
+        # Heap of (next run time, sequence number, job). Entries of
+        # rescheduled jobs are left in the heap and skipped; `queued` holds the
+        # sequence number of each job's current entry.
+        self.queue   = []
+        self.queued  = {}
+        self.counter = itertools.count()
+
+        # Jobs currently being run
+        self.in_flight = set()
+        self.cond      = threading.Condition()
+        self.running   = False
+        self.pool      = None
+        self.thread    = None
+
+
+    def __len__(self) -> int:
+        return len(self.jobs())
+
+
+    def jobs(self) -> List[FeedJob]:
+        """
+        Returns
+        -------
+        Jobs currently scheduled, in order of their next run time
+        """
+        with self.cond:
+            return [job for _,seq,job in sorted(self.queue, key=lambda entry: entry[:2])
+                    if job.active and self.queued.get(job) == seq]
+
+
+    def add(self, job:FeedJob, delay:float=0.0) -> FeedJob:
+        """
+        Schedule a job
+
+        Parameters
+        ----------
+        job : `FeedJob`
+            Job to be scheduled
+        delay : `float` (default=0.0)
+            Number of seconds before the first run. A random offset of up to
+            `jitter` of the job's interval is added, so a large number of jobs
+            added at once are spread out. A job that is already queued is
+            rescheduled, and a running job is queued again once its run
+            completes.
+
+        Returns
+        -------
+        The scheduled job
+        """
+        if self.jitter > 0:
+            delay += self.random.uniform(0, job.interval * self.jitter)
+
+        with self.cond:
+            job.active = True
+            # A running job is requeued once its run completes
+            if job not in self.in_flight:
+                self.push(job, time.monotonic() + delay)
+
+        return job
+
+
+    def remove(self, job:FeedJob) -> None:
+        """
+        Unschedule a job. A run that is already in progress is completed.
+        """
+        with self.cond:
+            job.active = False
+            self.queued.pop(job, None)
+            self.queue = [entry for entry in self.queue if entry[2] is not job]
+            heapq.heapify(self.queue)
+
+
+    def push(self, job:FeedJob, when:float) -> None:
+        """
+        Add a job to the queue, replacing any entry it already has. The caller
+        must hold `self.cond`.
+        """
+        seq = next(self.counter)
+        self.queued[job] = seq
+        heapq.heappush(self.queue, (when, seq, job))
+        self.cond.notify()
+
+
+    def next_delay(self, job:FeedJob) -> float:
+        """
+        Returns
+        -------
+        Number of seconds until the next run of a job, including jitter
+        """
+        offset = job.interval * self.jitter
+        return max(0.0, job.interval + self.random.uniform(-offset, offset))
+
+
+    def execute(self, job:FeedJob) -> None:
+        """
+        Run a job on a worker thread and reschedule it
+        """
+        new_items = None
+        error     = None
+        try:
+            new_items = job.run()
+        except Exception as e:
+            error = e
+
+        with self.cond:
+            self.in_flight.discard(job)
+            job.record(new_items=new_items, error=error)
+            if job.active:
+                self.push(job, time.monotonic() + self.next_delay(job))
+            self.cond.notify_all()
+
+
+    def dispatch(self) -> None:
+        """
+        Dispatcher loop that submits jobs to the pool as they become due
+        """
+        with self.cond:
+            while self.running:
+                if len(self.queue) == 0 or len(self.in_flight) >= self.max_workers:
+                    self.cond.wait()
+                    continue
+
+                when,seq,job = self.queue[0]
+                if self.queued.get(job) != seq:
+                    # Left behind when the job was rescheduled
+                    heapq.heappop(self.queue)
+                    continue
+
+                delay = when - time.monotonic()
+                if delay > 0:
+                    self.cond.wait(timeout=delay)
+                    continue
+
+                heapq.heappop(self.queue)
+                del self.queued[job]
+                if not job.active:
+                    continue
+
+                self.in_flight.add(job)
+                self.pool.submit(self.execute, job)
+
+
+    def start(self) -> None:
+        """
+        Start running jobs in the background
+        """
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+
+        self.pool   = ThreadPoolExecutor(max_workers=self.max_workers,
+                                         thread_name_prefix='feedgen-job')
+        self.thread = threading.Thread(target=self.dispatch, name='feedgen-scheduler',
+                                       daemon=True)
+        self.thread.start()
+
+
+    def stop(self, wait:bool=True) -> None:
+        """
+        Stop dispatching jobs. Jobs stay scheduled, so the scheduler can be
+        started again.
+
+        Parameters
+        ----------
+        wait : `bool` (default=True)
+            Wait for the runs in progress to finish
+        """
+        with self.cond:
+            if not self.running:
+                return
+            self.running = False
+            self.cond.notify_all()
+
+        self.thread.join()
+        self.pool.shutdown(wait=wait)
+
+
+    def run_forever(self) -> None:
+        """
+        Run jobs in the foreground until interrupted (e.g. with Ctrl+C)
+        """
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
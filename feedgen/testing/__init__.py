@@ -0,0 +1,8 @@
+# File: feedgen/testing/__init__.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the imports and sets up the `feedgen.testing` submodule.
+# =============================================================================
+
+from .fixtures import FixtureStore, RecordingTransport, ReplayTransport, make_response
+from .server   import NewsServer, synthetic_page
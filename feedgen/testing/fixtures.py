@@ -0,0 +1,281 @@
+# File: feedgen/testing/fixtures.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the record/replay layer for the parser fetch path, which lets
+# parsers be run and measured without a network connection.
+#
+# File defines the FixtureStore class, a directory of recorded responses. Each
+# fixture is stored as two files named after a hash of the request:
+#    - '<key>.json': parser type, URL, query parameters, status and headers
+#    - '<key>.html': raw body of the response
+#
+# File defines the RecordingTransport class, which forwards requests to a real
+# transport and saves every response to a store, and the ReplayTransport class,
+# which answers requests from a store instead of the network. Both can be
+# passed to any parser with `transport=`.
+# =============================================================================
+
+import hashlib
+import json
+import os
+import time
+from typing import Iterator, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ..parsers.transport import HttpTransport, get_default_transport
+
+# Headers that describe how a body was transferred rather than the body itself
+TRANSFER_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class FixtureStore():
+    """
+    Directory of recorded HTTP responses
+    """
+
+    def __init__(self, directory:str) -> None:
+        """
+        Parameters
+        ----------
+        directory : `str`
+            Directory holding the fixtures. It is created if needed.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    @staticmethod
+    def key(url:str, params:dict=None) -> str:
+        """
+        Returns
+        -------
+        Key identifying a request, independent of parameter order
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f'{url}?{query}'.encode('utf-8')).hexdigest()[:32]
+
+
+    def path(self, key:str, ext:str) -> str:
+        """
+        Returns
+        -------
+        Path of one of the files of a fixture
+        """
+        return os.path.join(self.directory, f'{key}.{ext}')
+
+
+    def save(self, url:str, params:dict, response:requests.Response,
+                   parser_type:str=None) -> str:
+        """
+        Record a response
+
+        Parameters
+        ----------
+        url : `str`
+            URL that was queried
+        params : `dict`
+            Query parameters passed with the URL
+        response : `requests.Response`
+            Response to be recorded. Its body is read if it hasn't been yet.
+        parser_type : `str` (default=None)
+            Type of the parser that sent the request
+
+        Returns
+        -------
+        Key of the fixture
+        """
+        key  = self.key(url, params)
+        meta = {
+            'parser_type': parser_type,
+            'url': url,
+            'params': dict(params or {}),
+            'status': response.status_code,
+            # Bodies are stored decoded, so drop headers describing the transfer
+            'headers': {name: value for name,value in response.headers.items()
+                        if name.lower() not in TRANSFER_HEADERS},
+            'encoding': response.encoding
+        }
+
+        with open(self.path(key, 'html'), 'wb') as fl:
+            fl.write(response.content)
+        with open(self.path(key, 'json'), 'w') as fl:
+            json.dump(meta, fl, indent=2)
+
+        return key
+
+
+    def load(self, url:str, params:dict=None) -> Tuple[dict, bytes]:
+        """
+        Load a recorded response
+
+        Parameters
+        ----------
+        url : `str`
+            URL that was queried
+        params : `dict` (default=None)
+            Query parameters passed with the URL
+
+        Returns
+        -------
+        (metadata, body) of the fixture, or None if it was not recorded
+        """
+        return self.load_key(self.key(url, params))
+
+
+    def load_key(self, key:str) -> Tuple[dict, bytes]:
+        """
+        Returns
+        -------
+        (metadata, body) of the fixture with the given key, or None
+        """
+        try:
+            with open(self.path(key, 'json'), 'r') as fl:
+                meta = json.load(fl)
+            with open(self.path(key, 'html'), 'rb') as fl:
+                body = fl.read()
+        except FileNotFoundError:
+            return None
+
+        return meta, body
+
+
+    def __iter__(self) -> Iterator[Tuple[dict, bytes]]:
+        """
+        Iterate over the (metadata, body) of every fixture
+        """
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.json'):
+                fixture = self.load_key(name[:-5])
+                if fixture is not None:
+                    yield fixture
+
+
+def make_response(url:str, status:int, headers:dict, body:bytes,
+                  encoding:str=None) -> requests.Response:
+    """
+    Build a response object equivalent to one returned by `requests`
+
+    Parameters
+    ----------
+    url : `str`
+        URL of the response
+    status : `int`
+        HTTP status code
+    headers : `dict`
+        Response headers
+    body : `bytes`
+        Response body
+    encoding : `str` (default=None)
+        Text encoding of the body
+
+    Returns
+    -------
+    Response whose body has already been read
+    """
+    response = requests.Response()
+    response.url         = url
+    response.status_code = status
+    response.headers     = CaseInsensitiveDict(headers)
+    response.encoding    = encoding
+    response._content    = body
+    response._content_consumed = True
+    return response
+
+
+class RecordingTransport():
+    """
+    Transport that saves every response it receives to a `FixtureStore`
+    """
+
+    def __init__(self, store:FixtureStore, transport:HttpTransport=None) -> None:
+        """
+        Parameters
+        ----------
+        store : `FixtureStore`
+            Store the responses are recorded to
+        transport : `HttpTransport` (default=None)
+            Transport that submits the requests. Defaults to the process-wide
+            transport.
+        """
+        self.store     = store
+        self.transport = transport
+
+
+    def get(self, url:str, params:dict=None, headers:dict=None,
+                  stream:bool=False, parser_type:str=None) -> requests.Response:
+        """
+        Submit a GET request and record the response. The body is always read
+        in full so it can be saved, even when `stream` is True. Responses to
+        conditional requests that come back unchanged (304) are not recorded.
+        """
+        transport = get_default_transport() if self.transport is None else self.transport
+        response  = transport.get(url, params=params, headers=headers,
+                                  parser_type=parser_type)
+        if response.status_code != 304:
+            self.store.save(url, params, response, parser_type=parser_type)
+
+        return response
+
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+
+class ReplayTransport():
+    """
+    Transport that answers requests from a `FixtureStore`
+    """
+
+    def __init__(self, store:FixtureStore, latency:float=0.0,
+                       strict:bool=True) -> None:
+        """
+        Parameters
+        ----------
+        store : `FixtureStore`
+            Store of recorded responses
+        latency : `float` (default=0.0)
+            Seconds to wait before answering each request, to simulate the
+            network
+        strict : `bool` (default=True)
+            Raise a KeyError for requests that were not recorded. Otherwise an
+            empty 404 response is returned.
+        """
+        self.store   = store
+        self.latency = latency
+        self.strict  = strict
+
+        # Number of requests answered
+        self.requests = 0
+
+
+    def get(self, url:str, params:dict=None, headers:dict=None,
+                  stream:bool=False, parser_type:str=None) -> requests.Response:
+        """
+        Return the recorded response for a request
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self.requests += 1
+
+        fixture = self.store.load(url, params)
+        if fixture is None:
+            if self.strict:
+                raise KeyError(f'No fixture recorded for {url} with {params}')
+            return make_response(url, 404, {}, b'')
+
+        meta, body = fixture
+
+        # Answer conditional requests like the server would
+        etag = CaseInsensitiveDict(meta['headers']).get('ETag')
+        if etag is not None and (headers or {}).get('If-None-Match') == etag:
+            return make_response(url, 304, meta['headers'], b'', meta['encoding'])
+
+        return make_response(url, meta['status'], meta['headers'], body, meta['encoding'])
+
+
+    def close(self) -> None:
+        pass
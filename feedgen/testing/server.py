@@ -0,0 +1,283 @@
+# File: feedgen/testing/server.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the NewsServer class, a local HTTP server that stands in for the
+# news sites so that concurrency, caching and streaming can be load-tested
+# without a network connection.
+#
+# Requests are routed by the first part of their path, which names a parser
+# type (e.g. '/googlenews/search?q=cats'). `NewsServer.point()` rewrites a
+# parser's base URL so it queries the server. For each request the server:
+#    - answers with a recorded fixture (see `FixtureStore`) if one matches the
+#      parser type, path and query parameters
+#    - otherwise generates a synthetic results page for the parser type with
+#      `containers` results, honouring the site's page offset parameter
+# Every response carries an ETag and conditional requests get a 304. An
+# artificial `latency` can be added before each response.
+#
+# File defines `synthetic_page()`, which renders synthetic results pages that
+# match the tag configuration of the built-in parsers.
+# =============================================================================
+
+import hashlib
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from .fixtures import FixtureStore
+
+# Markup of a single result for each parser type. Fields: {n} (position of the
+# result), {query}, {title}, {link}, {descrip} and {date}
+RESULT_TEMPLATES = {
+    'googlenews': ('<div class="NiLAwe"><h3 class="ipQwMb">{title}</h3>'
+                   '<a class="VDXfz" href="./articles/{link}">{title}</a>'
+                   '<time class="WW6dff" datetime="{date}">{date}</time></div>'),
+    'bingnews'  : ('<div class="news-card"><a class="title" href="https://example.com/{link}">'
+                   '{title}</a><div class="snippet">{descrip}</div></div>'),
+    'yahoonews' : ('<div class="NewsArticle"><h4 class="s-title">'
+                   '<a href="https://example.com/{link}">{title}</a></h4>'
+                   '<p class="s-desc">{descrip}</p></div>'),
+}
+
+# <parser type, (search parameter, page offset parameter)>
+QUERY_PARAMS = {
+    'googlenews': ('q', None),
+    'bingnews'  : ('q', 'first'),
+    'yahoonews' : ('p', 'b'),
+}
+
+
+def synthetic_page(parser_type:str, query:str='', offset:int=1, count:int=10,
+                   total:int=None, padding:int=0) -> bytes:
+    """
+    Render a synthetic results page
+
+    Parameters
+    ----------
+    parser_type : `str`
+        Parser type whose markup is used (a key of `RESULT_TEMPLATES`)
+    query : `str` (default='')
+        Search text, which is worked into every result
+    offset : `int` (default=1)
+        Position of the first result on the page
+    count : `int` (default=10)
+        Number of results on the page
+    total : `int` (default=None)
+        Total number of results for the query. The page is cut short past
+        this many results. No limit by default.
+    padding : `int` (default=0)
+        Number of bytes of filler markup between results, to mimic the size
+        of real pages
+
+    Returns
+    -------
+    HTML of the page
+    """
+    template = RESULT_TEMPLATES[parser_type]
+    if total is not None:
+        count = max(0, min(count, total - offset + 1))
+
+    slug   = '-'.join(query.lower().split()) or 'news'
+    filler = f'<div class="filler">{"x" * padding}</div>' if padding > 0 else ''
+    parts  = [f'<html><head><title>{escape(query)}</title></head><body>']
+    for n in range(offset, offset + count):
+        parts.append(template.format(
+            n       = n,
+            query   = escape(query),
+            title   = f'{escape(query)} story {n}',
+            link    = f'{slug}/{n}',
+            descrip = f'Synthetic result {n} for {escape(query)}',
+            date    = f'2022-01-01T00:{n // 60 % 60:02d}:{n % 60:02d}Z'))
+        parts.append(filler)
+    parts.append('</body></html>')
+
+    return ''.join(parts).encode('utf-8')
+
+
+class NewsServer():
+    """
+    Local HTTP server that serves fixtures and synthetic result pages
+    """
+
+    def __init__(self, store:FixtureStore=None, containers:int=10,
+                       total:int=None, latency:float=0.0, padding:int=0,
+                       host:str='127.0.0.1', port:int=0) -> None:
+        """
+        Parameters
+        ----------
+        store : `FixtureStore` (default=None)
+            Recorded responses served in place of synthetic pages
+        containers : `int` (default=10)
+            Number of results on each synthetic page
+        total : `int` (default=None)
+            Total number of synthetic results for a query, after which pages
+            come back short. No limit by default.
+        latency : `float` (default=0.0)
+            Seconds to wait before each response
+        padding : `int` (default=0)
+            Bytes of filler markup between synthetic results
+        host : `str` (default='127.0.0.1')
+            Address to listen on
+        port : `int` (default=0)
+            Port to listen on. A free port is picked by default.
+        """
+        self.store      = store
+        self.containers = containers
+        self.total      = total
+        self.latency    = latency
+        self.padding    = padding
+
+        # <(parser type, path, sorted params), fixture key> index of the store
+        self.fixtures = {}
+        if store is not None:
+            for meta,_ in store:
+                path = urlsplit(meta['url']).path
+                # Fixtures recorded through a server include the type prefix
+                prefix = f"/{meta['parser_type']}/"
+                if path.startswith(prefix):
+                    path = path[len(prefix)-1:]
+                self.fixtures[self.route(meta['parser_type'], path, meta['params'])] = \
+                    store.key(meta['url'], meta['params'])
+
+        self.requests = 0
+        self.lock     = threading.Lock()
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self) -> None:
+                server.handle(self)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.httpd  = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+
+    @property
+    def url(self) -> str:
+        """ Base URL of the server """
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+    @staticmethod
+    def route(parser_type:str, path:str, params:dict) -> tuple:
+        """
+        Returns
+        -------
+        Key matching a request to a fixture
+        """
+        return (parser_type, '/' + path.strip('/'),
+                tuple(sorted((name, str(value)) for name,value in params.items())))
+
+
+    def point(self, parser:Any) -> Any:
+        """
+        Make a parser query this server instead of the real site
+
+        Parameters
+        ----------
+        parser : `Parser`
+            Parser to redirect
+
+        Returns
+        -------
+        The same parser
+        """
+        parser.url['base'] = f'{self.url}/{parser.type}'
+        return parser
+
+
+    def body(self, parser_type:str, path:str, params:dict) -> bytes:
+        """
+        Returns
+        -------
+        Body of the response to a request, or None if there is none
+        """
+        key = self.fixtures.get(self.route(parser_type, path, params))
+        if key is not None:
+            return self.store.load_key(key)[1]
+
+        if parser_type not in RESULT_TEMPLATES:
+            return None
+
+        search_tag, offset_tag = QUERY_PARAMS[parser_type]
+        offset = int(params.get(offset_tag, 1)) if offset_tag is not None else 1
+        return synthetic_page(parser_type, params.get(search_tag, ''), offset=offset,
+                              count=self.containers, total=self.total,
+                              padding=self.padding)
+
+
+    def handle(self, request:BaseHTTPRequestHandler) -> None:
+        """
+        Answer a single request
+        """
+        with self.lock:
+            self.requests += 1
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        parts  = urlsplit(request.path)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        parser_type, _, path = parts.path.lstrip('/').partition('/')
+
+        body = self.body(parser_type, path, params)
+        if body is None:
+            request.send_response(404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+    def start(self) -> 'NewsServer':
+        """
+        Start serving in a background thread
+
+        Returns
+        -------
+        The running server
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name='feedgen-news-server', daemon=True)
+        self.thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        """
+        Stop the server and release its port
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+
+    def __enter__(self) -> 'NewsServer':
+        return self.start()
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
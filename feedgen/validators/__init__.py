@@ -4,4 +4,5 @@
 # This file defines the imports and sets up the `feedgen.validators` submodule.
 # =============================================================================
 
-from .rss_validator import RssValidator
\ No newline at end of file
+from .rss_validator import RssValidator
+from .schemas       import SchemaCache, schema_cache
@@ -1,19 +1,55 @@
 # File: feedgen/validators/rss_validator.py
 # Author: J. Cardenzana (c) 2022
 # =============================================================================
-# Defines the RssValidator class that is used (in conjunction with an RSS 
-# schema file) to validate that an RSS feed is properly formatted.
+# Defines the RssValidator class that is used (in conjunction with an RSS
+# schema file) to validate that an RSS feed is properly formatted. Time spent
+# validating, and feeds that fail, are reported to `feedgen.metrics`.
+#
+# Feeds can be validated from a file, from bytes, or directly from an element
+# tree (such as the output of `RssFeed.feed_xml()`) without being serialized
+# and parsed back. Compiled schemas are shared process-wide (see
+# `schema_cache`). `validate_many()` validates a batch of feed files on a
+# process pool and reports the errors found in each.
+#
+# Feeds too large to load at once can be checked with `validate_stream()`,
+# which parses the feed incrementally. Each <item> is validated against the
+# schema's global 'item' element as soon as it has been read and is then
+# discarded, and the rest of the document (the channel header) is validated
+# once the end of the feed is reached. Memory use stays bounded no matter how
+# many items the feed holds.
 # =============================================================================
 
+from io import BytesIO
 from lxml import etree
+from multiprocessing import Pool
 import os
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+from ..metrics import metrics
+from .schemas import schema_cache
+
+# Schema used by default
+RSS_SCHEMA = os.path.join(os.path.dirname(__file__), 'rss_schema.xml')
+
+# Validator used by the current worker process
+_worker_validator = None
+
+
+def error_entry(kind:str, message:str, line:int=None, column:int=None) -> Dict[str,Any]:
+    """
+    Returns
+    -------
+    Structured description of a validation error
+    """
+    return {'kind': kind, 'line': line, 'column': column, 'message': message}
+
 
 class RssValidator():
     """
     Validator class for RSS feeds
     """
 
-    def __init__(self, schema_filename:str=os.path.join(os.path.dirname(__file__),'rss_schema.xml')) -> None:
+    def __init__(self, schema_filename:str=RSS_SCHEMA) -> None:
         """
         Contructor for RssValidator class
 
@@ -23,19 +59,43 @@ class RssValidator():
             Filename containing schema definition for an RSS format. By default
             this is 'feedgen/validators/rss_schema.xml'
         """
-        schema_doc = etree.parse(schema_filename)
-        self.schema = etree.XMLSchema(schema_doc)
+        self.schema_filename = schema_filename
+
+        # Compile now so that a bad schema is reported straight away
+        schema_cache.get(schema_filename)
+
+
+    @property
+    def schema(self) -> etree.XMLSchema:
+        """ Compiled schema, shared by all validators of the same file """
+        return schema_cache.get(self.schema_filename)
+
+
+    @staticmethod
+    def load(rss_feed:Union[str,bytes,etree._Element,etree._ElementTree]) -> Any:
+        """
+        Returns
+        -------
+        `rss_feed` as a document or element that can be validated
+        """
+        if isinstance(rss_feed, (etree._Element, etree._ElementTree)):
+            return rss_feed
+        if isinstance(rss_feed, bytes):
+            return etree.fromstring(rss_feed)
+
+        return etree.parse(rss_feed)
 
 
-    def validate(self, rss_feed:str) -> bool:
+    def validate(self, rss_feed:Union[str,bytes,etree._Element]) -> bool:
         """
         Based on the validator that was supplied at construction time
         check if the supplied file is a validly formatted
 
         Parameters
         ----------
-        rss_feed : str
-            Filename of RSS feed stored as XML
+        rss_feed : `str`, `bytes` or `etree._Element`
+            Filename of RSS feed stored as XML, the XML itself, or an already
+            built element tree (e.g. from `RssFeed.feed_xml()`)
 
         Returns
         -------
@@ -43,5 +103,189 @@ class RssValidator():
         errors are printed.
         """
         # Open the file for validation
-        xml_doc = etree.parse(rss_feed)
-        return self.schema.assertValid(xml_doc) is None
+        with metrics.timer('validate', validator='rss'):
+            xml_doc = self.load(rss_feed)
+            return self.schema.assertValid(xml_doc) is None
+
+
+    def errors(self, rss_feed:Union[str,bytes,etree._Element]) -> List[Dict[str,Any]]:
+        """
+        Validate a feed and collect every error rather than raising
+
+        Parameters
+        ----------
+        rss_feed : `str`, `bytes` or `etree._Element`
+            Filename of RSS feed stored as XML, the XML itself, or an already
+            built element tree
+
+        Returns
+        -------
+        List of errors, each a dictionary with the 'kind' of error ('syntax'
+        or 'schema'), 'line', 'column' and 'message'. The list is empty if
+        the feed is valid.
+        """
+        with metrics.timer('validate', validator='rss'):
+            try:
+                xml_doc = self.load(rss_feed)
+            except etree.XMLSyntaxError as e:
+                metrics.count('errors', stage='validate', validator='rss')
+                line, column = e.position
+                return [error_entry('syntax', e.msg, line, column)]
+
+            schema = self.schema
+            if schema.validate(xml_doc):
+                return []
+
+            metrics.count('errors', stage='validate', validator='rss')
+            return [error_entry('schema', err.message, err.line, err.column)
+                    for err in schema.error_log]
+
+
+    def iter_stream_errors(self, rss_feed:Union[str,bytes,Any]) -> Iterator[Dict[str,Any]]:
+        """
+        Incrementally validate a feed, yielding errors as they are found
+
+        Parameters
+        ----------
+        rss_feed : `str`, `bytes` or binary file-like object
+            Filename of RSS feed stored as XML, the XML itself, or an open
+            binary stream
+
+        Returns
+        -------
+        Iterator over the errors, each a dictionary as returned by `errors()`
+        along with the index of the 'item' the error was found in (None for
+        errors outside of items)
+        """
+        if isinstance(rss_feed, bytes):
+            rss_feed = BytesIO(rss_feed)
+
+        schema  = self.schema
+        depth   = 0
+        channel = None
+        item    = 0
+
+        def schema_errors(index:int) -> Iterator[Dict[str,Any]]:
+            for err in schema.error_log:
+                entry = error_entry('schema', err.message, err.line, err.column)
+                entry['item'] = index
+                yield entry
+
+        try:
+            for event,element in etree.iterparse(rss_feed, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and channel is None and element.tag == 'channel':
+                        channel = element
+                    elif depth == 3 and element.getparent() is channel and \
+                         element.tag != 'item' and item > 0:
+                        # Items are removed once validated, so the schema can't
+                        # see header elements that follow them
+                        entry = error_entry('schema', f"Element '{element.tag}': "
+                                            "This element is not expected after 'item'.",
+                                            element.sourceline, 0)
+                        entry['item'] = None
+                        yield entry
+                    continue
+
+                depth -= 1
+                if depth == 2 and element.tag == 'item' and element.getparent() is channel:
+                    if not schema.validate(element):
+                        yield from schema_errors(item)
+
+                    # The item is no longer needed
+                    channel.remove(element)
+                    item += 1
+
+                elif depth == 0:
+                    # Root and channel header, with the items removed
+                    if not schema.validate(element):
+                        yield from schema_errors(None)
+
+        except etree.XMLSyntaxError as e:
+            line, column = e.position
+            entry = error_entry('syntax', e.msg, line, column)
+            entry['item'] = None
+            yield entry
+
+
+    def validate_stream(self, rss_feed:Union[str,bytes,Any],
+                              max_errors:int=1000) -> List[Dict[str,Any]]:
+        """
+        Validate a feed of any size without loading it into memory
+
+        Parameters
+        ----------
+        rss_feed : `str`, `bytes` or binary file-like object
+            Filename of RSS feed stored as XML, the XML itself, or an open
+            binary stream
+        max_errors : `int` (default=1000)
+            Validation stops once this many errors have been found. No limit
+            if None.
+
+        Returns
+        -------
+        List of errors as returned by `iter_stream_errors()`. The list is
+        empty if the feed is valid.
+        """
+        errors = []
+        with metrics.timer('validate', validator='rss'):
+            for entry in self.iter_stream_errors(rss_feed):
+                errors.append(entry)
+                if max_errors is not None and len(errors) >= max_errors:
+                    break
+
+        if len(errors) > 0:
+            metrics.count('errors', stage='validate', validator='rss')
+
+        return errors
+
+
+    def validate_many(self, filenames:Iterable[str], processes:int=None,
+                            chunksize:int=16) -> Dict[str,List[Dict[str,Any]]]:
+        """
+        Validate many feed files on a process pool
+
+        Parameters
+        ----------
+        filenames : `Iterable[str]`
+            Names of the feed files
+        processes : `int` (default=None)
+            Number of worker processes. Defaults to the number of cores.
+        chunksize : `int` (default=16)
+            Number of files sent to a worker at a time
+
+        Returns
+        -------
+        <filename, errors> dictionary, in the order of `filenames`. Each list
+        of errors is as returned by `errors()`, and is empty for valid feeds.
+        Files that can't be read are reported with an error of kind 'io'.
+        """
+        filenames = list(filenames)
+        with Pool(processes=processes, initializer=init_worker,
+                  initargs=(self.schema_filename,)) as pool:
+            results = pool.map(validate_task, filenames, chunksize=chunksize)
+
+        return dict(zip(filenames, results))
+
+
+def init_worker(schema_filename:str) -> None:
+    """
+    Create the validator used by a worker process
+    """
+    global _worker_validator
+    _worker_validator = RssValidator(schema_filename)
+
+
+def validate_task(filename:str) -> List[Dict[str,Any]]:
+    """
+    Validate a single feed file in a worker process
+
+    Returns
+    -------
+    List of errors found in the file
+    """
+    try:
+        return _worker_validator.errors(filename)
+    except OSError as e:
+        return [error_entry('io', str(e))]
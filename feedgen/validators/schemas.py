@@ -0,0 +1,110 @@
+# File: feedgen/validators/schemas.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# File defines the SchemaCache class, a process-wide thread-safe cache of
+# compiled XML schemas keyed by the schema's file name. Parsing and compiling
+# a schema costs far more than validating a typical feed against it, so every
+# validator in the process shares the compiled schema. A schema file that is
+# modified on disk is recompiled the next time it is requested.
+#
+# Validating with an XMLSchema object records errors in the object's own
+# error log, so the compiled schema is kept per thread to stop concurrent
+# validations from mixing up their errors.
+# =============================================================================
+
+import os
+import threading
+from lxml import etree
+
+
+class SchemaCache():
+    """
+    Thread-safe cache of compiled XML schemas keyed by file name
+    """
+
+    def __init__(self) -> None:
+        # <absolute file name, (modification time, parsed schema document)>
+        self.documents = {}
+        self.lock      = threading.Lock()
+        self.local     = threading.local()
+        self.hits      = 0
+        self.misses    = 0
+
+
+    def document(self, filename:str) -> etree._ElementTree:
+        """
+        Returns
+        -------
+        Parsed schema document, shared between threads
+        """
+        mtime = os.stat(filename).st_mtime_ns
+        with self.lock:
+            entry = self.documents.get(filename)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+
+        doc = etree.parse(filename)
+        with self.lock:
+            self.documents[filename] = (mtime, doc)
+
+        return doc
+
+
+    def get(self, filename:str) -> etree.XMLSchema:
+        """
+        Return the compiled schema for a file, compiling it on first use
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the schema file
+
+        Returns
+        -------
+        Compiled schema for the calling thread
+        """
+        filename = os.path.abspath(filename)
+        doc      = self.document(filename)
+
+        schemas = getattr(self.local, 'schemas', None)
+        if schemas is None:
+            schemas = self.local.schemas = {}
+
+        entry = schemas.get(filename)
+        if entry is not None and entry[0] is doc:
+            with self.lock:
+                self.hits += 1
+            return entry[1]
+
+        schema = etree.XMLSchema(doc)
+        schemas[filename] = (doc, schema)
+        with self.lock:
+            self.misses += 1
+
+        return schema
+
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        Dictionary with the number of cached schema files, hits and misses
+        """
+        with self.lock:
+            return {'size': len(self.documents), 'hits': self.hits, 'misses': self.misses}
+
+
+    def clear(self) -> None:
+        """
+        Drop all cached schemas. Schemas already compiled by other threads are
+        recompiled the next time they are requested.
+        """
+        with self.lock:
+            self.documents = {}
+            self.hits      = 0
+            self.misses    = 0
+        self.local.schemas = {}
+
+
+# Process-wide cache of compiled schemas
+schema_cache = SchemaCache()
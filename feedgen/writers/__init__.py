@@ -5,4 +5,5 @@
 # =============================================================================
 
 from .rssfeed  import RssFeed
-from .jsonfeed import JsonFeed
\ No newline at end of file
+from .jsonfeed import JsonFeed
+from .feedindex import FeedIndex
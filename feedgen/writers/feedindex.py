@@ -0,0 +1,293 @@
+# File: feedgen/writers/feedindex.py
+# Author: J. Cardenzana (c) 2022
+# =============================================================================
+# This file defines the `FeedIndex` class and the `update_feed()` function,
+# which allow the feed writers to merge new items into an existing feed file
+# without regenerating it from scratch.
+#
+# Each feed written in update mode gets a sidecar index ('<filename>.idx') that
+# records the id (RSS guid or JSON Feed id) of every item along with the byte
+# range it occupies in the file. When the feed is updated:
+#    - new items are checked against the index, and only unseen items are kept
+#    - the header is regenerated and the new items are serialized
+#    - the items being kept are copied over as a single raw byte range, so they
+#      are never parsed or re-serialized
+#    - items past the maximum item count are dropped from the end
+# If the index is missing or no longer matches the feed file (e.g. the feed
+# was rewritten by `write()`), the existing items are read once to rebuild it.
+#
+# The feed and its index are written to uniquely named temporary files next to
+# them and then moved into place, so concurrent updates never write to the
+# same file and readers only ever see a complete feed. An update keeps the feed
+# file it read open until it has copied the kept items, so a concurrent update
+# replacing the feed in the meantime can't change the bytes it copies. New
+# files are created with mode 0o644 unless told otherwise; replaced files keep
+# the mode of the file they replace.
+# =============================================================================
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager, nullcontext
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Tuple
+
+@contextmanager
+def replace_file(filename:str, mode:str='wb', permissions:int=0o644) -> Iterator[BinaryIO]:
+    """
+    Write a file atomically. The contents are written to a uniquely named
+    temporary file in the same directory, which replaces `filename` once the
+    block completes. The temporary file is removed if the block fails.
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of the file to write
+    mode : `str` (default='wb')
+        Mode the temporary file is opened with
+    permissions : `int` (default=0o644)
+        Permission bits given to `filename` if it doesn't exist yet. An
+        existing file keeps its own permissions. (`tempfile` would otherwise
+        limit the file to its owner.)
+
+    Returns
+    -------
+    Context manager giving the open temporary file
+    """
+    directory, name = os.path.split(os.path.abspath(filename))
+    fd, tmp_file    = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode) as fl:
+            yield fl
+
+        try:
+            os.chmod(tmp_file, os.stat(filename).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_file, permissions)
+        os.replace(tmp_file, filename)
+
+    except BaseException:
+        try:
+            os.unlink(tmp_file)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class FeedIndex():
+    """ Sidecar index of the item ids and byte offsets of a feed file """
+
+    def __init__(self, filename:str, pretty_print:bool,
+                       items:List[Tuple[str,int,int]]=None) -> None:
+        """
+        Parameters
+        ----------
+        filename : `str`
+            Name of the feed file being indexed
+        pretty_print : `bool`
+            Whether the feed file was written with pretty printing
+        items : `List[Tuple[str,int,int]]` (default=None)
+            List of (id, start, end) byte ranges for each item, in file order
+        """
+        self.filename     = filename
+        self.index_file   = filename + '.idx'
+        self.pretty_print = pretty_print
+        self.items        = [] if items is None else items
+
+
+    @classmethod
+    def load(cls, filename:str, pretty_print:bool, src:BinaryIO=None) -> 'FeedIndex':
+        """
+        Load the index of a feed file
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the feed file
+        pretty_print : `bool`
+            Whether the feed is expected to be pretty printed
+        src : `BinaryIO` (default=None)
+            Open feed file to check the index against, in case `filename` is
+            replaced after it was opened
+
+        Returns
+        -------
+        Index of the feed, or None if there is no index or it does not match
+        the current contents of the feed file
+        """
+        try:
+            with open(filename + '.idx', 'r') as fl:
+                data = json.load(fl)
+            stat = os.stat(filename) if src is None else os.fstat(src.fileno())
+        except (OSError, ValueError):
+            return None
+
+        if data.get('size') != stat.st_size or \
+           data.get('mtime_ns') != stat.st_mtime_ns or \
+           data.get('pretty_print') != pretty_print:
+            return None
+
+        return cls(filename, pretty_print, [tuple(item) for item in data['items']])
+
+
+    def save(self, stat:os.stat_result=None) -> None:
+        """
+        Write the index next to the feed file
+
+        Parameters
+        ----------
+        stat : `os.stat_result` (default=None)
+            Status of the feed file as written, in case it has since been
+            replaced. Defaults to the current status of the file.
+        """
+        if stat is None:
+            stat = os.stat(self.filename)
+        data = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'pretty_print': self.pretty_print,
+            'items': self.items
+        }
+
+        with replace_file(self.index_file, 'w') as fl:
+            json.dump(data, fl)
+
+
+    def ids(self) -> List[str]:
+        """
+        Returns
+        -------
+        Ids of the items in the feed, newest first
+        """
+        return [item[0] for item in self.items]
+
+
+def update_feed(filename:str, pretty_print:bool, header:bytes, footer:bytes,
+                empty_footer:bytes, separator:bytes,
+                new_items:Iterable[Tuple[str,bytes]],
+                load_items:Callable[[str],List[Tuple[str,bytes]]],
+                max_items:int=None) -> int:
+    """
+    Merge new items into the head of an existing feed file
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of the feed file. It is created if it does not exist.
+    pretty_print : `bool`
+        Whether the feed is pretty printed
+    header : `bytes`
+        Serialized feed content before the first item
+    footer : `bytes`
+        Serialized feed content after the last item
+    empty_footer : `bytes`
+        Serialized feed content following `header` when there are no items
+    separator : `bytes`
+        Bytes placed between consecutive items
+    new_items : `Iterable[Tuple[str,bytes]]`
+        (id, serialized item) pairs for the new items, newest first
+    load_items : `Callable`
+        Function that reads the (id, serialized item) pairs from an existing
+        feed file. Only used when the feed has no valid index.
+    max_items : `int` (default=None)
+        Maximum number of items to keep in the feed. Older items are dropped.
+
+    Returns
+    -------
+    Number of new items added to the feed
+    """
+    # Keep the current feed open, so the items copied from it match its index
+    # even if another update replaces the file in the meantime
+    try:
+        src = open(filename, 'rb')
+    except FileNotFoundError:
+        src = None
+
+    with src if src is not None else nullcontext():
+        return merge_feed(filename, pretty_print, src, header, footer, empty_footer,
+                          separator, new_items, load_items, max_items)
+
+
+def merge_feed(filename:str, pretty_print:bool, src:BinaryIO, header:bytes, footer:bytes,
+               empty_footer:bytes, separator:bytes, new_items:Iterable[Tuple[str,bytes]],
+               load_items:Callable[[str],List[Tuple[str,bytes]]], max_items:int=None) -> int:
+    """
+    Body of `update_feed()`, given the open feed file `src` (None if the feed
+    doesn't exist yet)
+    """
+    index = None if src is None else FeedIndex.load(filename, pretty_print, src)
+
+    # Existing items, either as byte ranges in the file or as serialized items
+    if index is not None:
+        old_ids = index.ids()
+    elif src is not None:
+        old_items = load_items(filename)
+        old_ids   = [item_id for item_id,_ in old_items]
+    else:
+        old_items = []
+        old_ids   = []
+
+    # Only keep items that aren't already in the feed
+    seen  = set(old_ids)
+    fresh = []
+    for item_id,item in new_items:
+        if item_id not in seen:
+            seen.add(item_id)
+            fresh.append((item_id, item))
+
+    # Trim to the maximum size of the feed
+    num_keep = len(old_ids)
+    if max_items is not None:
+        fresh    = fresh[:max_items]
+        num_keep = min(num_keep, max_items - len(fresh))
+
+    if index is not None and len(fresh) == 0 and num_keep == len(old_ids):
+        return 0
+
+    new_index = FeedIndex(filename, pretty_print)
+    with replace_file(filename) as out:
+        out.write(header)
+
+        def write_item(item_id:str, item:bytes) -> None:
+            if len(new_index.items) > 0:
+                out.write(separator)
+            start = out.tell()
+            out.write(item)
+            new_index.items.append((item_id, start, out.tell()))
+
+        for item_id,item in fresh:
+            write_item(item_id, item)
+
+        if index is None:
+            for item_id,item in old_items[:num_keep]:
+                write_item(item_id, item)
+
+        elif num_keep > 0:
+            # Copy the kept items as one raw block and shift their offsets
+            kept = index.items[:num_keep]
+            if len(new_index.items) > 0:
+                out.write(separator)
+            shift = out.tell() - kept[0][1]
+            src.seek(kept[0][1])
+            copy_range(src, out, kept[-1][2] - kept[0][1])
+            new_index.items.extend((item_id, start + shift, end + shift)
+                                   for item_id,start,end in kept)
+
+        out.write(footer if len(new_index.items) > 0 else empty_footer)
+        out.flush()
+        stat = os.fstat(out.fileno())
+
+    new_index.save(stat)
+
+    return len(fresh)
+
+
+def copy_range(src, dst, length:int, chunk_size:int=1024*1024) -> None:
+    """
+    Copy `length` bytes from the current position of `src` to `dst`
+    """
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            raise IOError('Feed file is shorter than its index')
+        dst.write(chunk)
+        length -= len(chunk)
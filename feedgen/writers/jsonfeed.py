@@ -22,9 +22,12 @@
 
 import json
 import datetime
-from typing import Any, List, Dict
+import os
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple, Union
 
+from ..metrics import metrics
 from ..parsers.parser import ParserResult
+from .feedindex import update_feed
 
 class JsonFeed():
     """ Class for constructing a JSON feed from a list of ParseResult objects """
@@ -96,18 +99,13 @@ class JsonFeed():
         return parent
 
 
-    def feed_json(self, entries:List[ParserResult]) -> Dict[str, Any]:
+    def gen_header(self) -> Dict[str, Any]:
         """
-        Generate a dictionary containing the parsed results in `entries`.
+        Create the top-level tags of the feed
 
-        Parameters
-        ----------
-        entries : `List[ParserResult]`
-            List of parsed results
-        
         Returns
         -------
-        Dictionary of items ready to be written to a JSON file
+        Dictionary of top-level tags, with "items" set to an empty list
         """
         # Construct the top element
         channel = {
@@ -122,6 +120,24 @@ class JsonFeed():
         for tag, val in self.extra_tags.items():
             channel[tag] = val
 
+        return channel
+
+
+    def feed_json(self, entries:Iterable[ParserResult]) -> Dict[str, Any]:
+        """
+        Generate a dictionary containing the parsed results in `entries`.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
+        
+        Returns
+        -------
+        Dictionary of items ready to be written to a JSON file
+        """
+        channel = self.gen_header()
+
         # add all the entries
         for entry in entries:
             channel["items"].append(self.gen_item(entry))
@@ -129,19 +145,272 @@ class JsonFeed():
         return channel
 
 
-    def write(self, entries:List[ParserResult], filename:str, pretty_print:bool=True) -> None:
+    def gen_layout(self, pretty_print:bool=True) -> Tuple[str,str]:
+        """
+        Serialize the top-level tags of the feed, split around the items
+
+        Parameters
+        ----------
+        pretty_print : `bool` (default=True)
+            Generates the output with newlines and 2 space indentation
+
+        Returns
+        -------
+        The text before the first item (ending with '"items": [') and the text
+        following the closing ']' of the items list
+        """
+        top_pad   = '\n  ' if pretty_print else ''
+        separator = ','     if pretty_print else ', '
+
+        head = '{'
+        tail = ''
+        after_items = False
+        for count,(tag,val) in enumerate(self.gen_header().items()):
+            piece = separator if count > 0 else ''
+            piece += f'{top_pad}{json.dumps(tag)}: '
+
+            if tag == 'items':
+                head += piece + '['
+                after_items = True
+                continue
+
+            piece += self.dumps(val, top_pad, pretty_print)
+            if after_items:
+                tail += piece
+            else:
+                head += piece
+
+        tail += '\n}' if pretty_print else '}'
+        return head, tail
+
+
+    @staticmethod
+    def dumps(value:Any, pad:str, pretty_print:bool=True) -> str:
+        """
+        Serialize a value nested inside the feed, indenting it relative to
+        its parent
+        """
+        indent = 2 if pretty_print else None
+        return json.dumps(value, indent=indent).replace('\n', pad)
+
+
+    def serialize_item(self, item:Dict[str,Any], pretty_print:bool=True) -> str:
+        """
+        Serialize a single item as it appears inside the items list
+
+        Parameters
+        ----------
+        item : `Dict[str,Any]`
+            Item generated by `gen_item()`
+        pretty_print : `bool` (default=True)
+            Generates the output with newlines and 2 space indentation
+
+        Returns
+        -------
+        Serialized item, including its leading indentation
+        """
+        item_pad = '\n    ' if pretty_print else ''
+        return item_pad + self.dumps(item, item_pad, pretty_print)
+
+
+    def iter_json(self, entries:Iterable[ParserResult], pretty_print:bool=True) -> Iterator[str]:
+        """
+        Serialize the feed one piece at a time. Each item is converted to JSON
+        only when it is pulled from `entries`. Joining the returned pieces
+        gives the same text as `json.dumps(self.feed_json(entries))`.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
+        pretty_print : `bool` (default=True)
+            Generates the output with newlines and 2 space indentation
+
+        Returns
+        -------
+        Iterator over pieces of the JSON document
+        """
+        top_pad   = '\n  ' if pretty_print else ''
+        separator = ','     if pretty_print else ', '
+        head,tail = self.gen_layout(pretty_print)
+
+        yield head
+        num_items = 0
+        for entry in entries:
+            if num_items > 0:
+                yield separator
+            yield self.serialize_item(self.gen_item(entry), pretty_print)
+            num_items += 1
+
+        yield (f'{top_pad}]' if num_items > 0 else ']') + tail
+
+
+    def iter_ndjson(self, entries:Iterable[ParserResult]) -> Iterator[str]:
+        """
+        Serialize each item as a single line of JSON (newline-delimited JSON)
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
+
+        Returns
+        -------
+        Iterator over lines, each ending with a newline
+        """
+        for entry in entries:
+            yield json.dumps(self.gen_item(entry)) + '\n'
+
+
+    def write_stream(self, entries:Iterable[ParserResult], output:Union[str,TextIO],
+                           pretty_print:bool=True) -> None:
+        """
+        Writes parsed site data incrementally, so that memory use does not
+        grow with the size of the feed.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
+        output : `str` or text file-like object
+            Name of the file, or open text stream, to write to
+        pretty_print : `bool` (default=True)
+            Generates the file with newlines and 2 space indentation
+        """
+        if isinstance(output, str):
+            with open(output, 'w') as fl:
+                self.write_stream(entries, fl, pretty_print=pretty_print)
+            return
+
+        for piece in self.iter_json(entries, pretty_print=pretty_print):
+            output.write(piece)
+
+
+    def write_ndjson(self, entries:Iterable[ParserResult], output:Union[str,TextIO]) -> None:
+        """
+        Writes each item as a single line of JSON. Unlike a JSON Feed
+        document, the output can be processed line-by-line (or split into
+        chunks) without loading the whole file, and appended to later.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
+        output : `str` or text file-like object
+            Name of the file, or open text stream, to write to
+        """
+        if isinstance(output, str):
+            entries = metrics.counted(entries, 'items_written', writer='ndjson')
+            with metrics.timer('serialize', writer='ndjson') as timer:
+                entries = metrics.untimed(entries, timer)
+                with open(output, 'w') as fl:
+                    self.write_ndjson(entries, fl)
+
+            if metrics.enabled:
+                metrics.count('bytes_written', os.path.getsize(output), writer='ndjson')
+            return
+
+        for line in self.iter_ndjson(entries):
+            output.write(line)
+
+
+    def write(self, entries:Iterable[ParserResult], filename:str, pretty_print:bool=True,
+                    stream:bool=False) -> None:
         """
         Writes parsed site data to a given file.
 
         Parameters
         ----------
-        entries : `List[ParserResult]`
-            List of parsed results
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable, such as `Parser.iter_results()`)
         filename : `str`
             File name to write the entries to
         pretty_print : `bool` (default=True)
             Generates the file with newlines and 2 space indentation
+        stream : `bool` (default=False)
+            Write items one at a time with `write_stream()` rather than
+            building the whole feed in memory first
         """
-        indent = 2 if pretty_print else None
-        with open(filename, 'w') as fl:
-            json.dump(self.feed_json(entries), fl, indent=indent)
+        entries = metrics.counted(entries, 'items_written', writer='json')
+        with metrics.timer('serialize', writer='json') as timer:
+            entries = metrics.untimed(entries, timer)
+            if stream:
+                self.write_stream(entries, filename, pretty_print=pretty_print)
+            else:
+                indent = 2 if pretty_print else None
+                with open(filename, 'w') as fl:
+                    json.dump(self.feed_json(entries), fl, indent=indent)
+
+        if metrics.enabled:
+            metrics.count('bytes_written', os.path.getsize(filename), writer='json')
+
+
+    def load_items(self, filename:str, pretty_print:bool=True) -> List[Tuple[str,bytes]]:
+        """
+        Read the items of an existing JSON feed file
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the JSON feed file
+        pretty_print : `bool` (default=True)
+            Formatting to serialize the items with
+
+        Returns
+        -------
+        List of (id, serialized item) pairs, in file order
+        """
+        with open(filename, 'r') as fl:
+            items = json.load(fl).get('items', [])
+
+        return [(item.get('id'), self.serialize_item(item, pretty_print).encode('utf-8'))
+                for item in items]
+
+
+    def update(self, entries:Iterable[ParserResult], filename:str, max_items:int=None,
+                     pretty_print:bool=True) -> int:
+        """
+        Merge entries into an existing feed file. Entries whose id is already
+        in the feed are skipped, new entries are placed at the head of the
+        feed, and the oldest items are dropped once there are more than
+        `max_items`. Existing items are copied over as raw bytes using a
+        sidecar index ('<filename>.idx'), so the cost of an update scales with
+        the number of new items rather than the size of the feed.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results (any iterable), newest first
+        filename : `str`
+            File name to update. It is created if it does not exist.
+        max_items : `int` (default=None)
+            Maximum number of items to keep in the feed
+        pretty_print : `bool` (default=True)
+            Generates the file with newlines and 2 space indentation
+
+        Returns
+        -------
+        Number of new items added to the feed
+        """
+        top_pad   = '\n  ' if pretty_print else ''
+        separator = ','     if pretty_print else ', '
+        head,tail = self.gen_layout(pretty_print)
+
+        entries = metrics.counted(entries, 'items_written', writer='json')
+        with metrics.timer('serialize', writer='json') as timer:
+            new_items = ((entry.link,
+                          self.serialize_item(self.gen_item(entry), pretty_print).encode('utf-8'))
+                         for entry in metrics.untimed(entries, timer))
+            added = update_feed(filename, pretty_print,
+                                header       = head.encode('utf-8'),
+                                footer       = f'{top_pad}]{tail}'.encode('utf-8'),
+                                empty_footer = f']{tail}'.encode('utf-8'),
+                                separator    = separator.encode('utf-8'),
+                                new_items    = new_items,
+                                load_items   = lambda fname: self.load_items(fname, pretty_print),
+                                max_items    = max_items)
+
+        if metrics.enabled:
+            metrics.count('bytes_written', os.path.getsize(filename), writer='json')
+
+        return added
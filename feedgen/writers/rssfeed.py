@@ -19,14 +19,20 @@
 #    - guid (string): Unless set by the parser author, defaults to the link
 #    - src_name (string): Name of base site (e.g. 'Yahoo News')
 #    - src_url (string): Base URL for the source (e.g. 'https://news.search.yahoo.com/search?')
+# Time spent writing feeds, and the items and bytes written, are reported to
+# `feedgen.metrics` under the 'serialize' stage. Time spent producing the
+# entries (e.g. fetching and parsing in `Parser.iter_results()`) is left out.
 # =============================================================================
 
 from lxml.etree import Element, ElementTree
 from lxml import etree
 import lxml
-from typing import Any, List, Dict
+import os
+from typing import Any, BinaryIO, Dict, Iterable, List, Tuple, Union
 
+from ..metrics import metrics
 from ..parsers.parser import ParserResult
+from .feedindex import update_feed
 
 class RssFeed():
     """ Class for constructing an RSS feed from a list of ParseResult objects """
@@ -106,23 +112,15 @@ class RssFeed():
         return parent
 
 
-    def feed_xml(self, entries:List[ParserResult]) -> lxml.etree.Element:
+    def gen_header(self) -> List[lxml.etree.Element]:
         """
-        Returns a list of parsed website results as an XML formatted list
+        Create the elements that appear in the channel before any items
 
-        Parameters
-        ----------
-        entries : `List[ParserResult]`
-            List of parsed results to be converted to XML
-        
         Returns
         -------
-        XML formatted results from `entries`
+        List of XML elements for the channel's title, link, description and
+        any extra top-level tags
         """
-        # Construct the top element
-        channel = Element('channel')
-        
-        # Add the children
         # define the required keys
         channel_title = Element('title')
         channel_title.text = self.title
@@ -131,15 +129,37 @@ class RssFeed():
         channel_descrip = Element('description')
         channel_descrip.text = self.descrip
 
-        channel.append( channel_title )
-        channel.append( channel_link )
-        channel.append( channel_descrip )
+        header = [channel_title, channel_link, channel_descrip]
 
         # Add extra tags
         for tag, val in self.extra_tags.items():
             channel_tag = Element(tag)
             channel_tag.text = val
-            channel.append( channel_tag )
+            header.append( channel_tag )
+
+        return header
+
+
+    def feed_xml(self, entries:Iterable[ParserResult]) -> lxml.etree.Element:
+        """
+        Returns a list of parsed website results as an XML formatted list
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Parsed results to be converted to XML (any iterable, such as
+            `Parser.iter_results()`)
+        
+        Returns
+        -------
+        XML formatted results from `entries`
+        """
+        # Construct the top element
+        channel = Element('channel')
+        
+        # Add the children
+        for child in self.gen_header():
+            channel.append( child )
 
         # add all the entries
         for entry in entries:
@@ -152,14 +172,14 @@ class RssFeed():
         return root
 
 
-    def feed_str(self, entries:List[ParserResult], pretty_print:bool=True) -> str:
+    def feed_str(self, entries:Iterable[ParserResult], pretty_print:bool=True) -> str:
         """
         Convert parsed results into a string suitable for outputing to a file
 
         Parameters
         ----------
-        entries : `List[ParserResult]`
-            List of entries parsed from the web
+        entries : `Iterable[ParserResult]`
+            Entries parsed from the web (any iterable)
         pretty_print : `bool` (default=True)
             Creates formatted XML output
 
@@ -176,19 +196,194 @@ class RssFeed():
                               pretty_print=pretty_print)
 
 
-    def write(self, entries:List[ParserResult], filename:str, pretty_print:bool=True) -> None:
+    def write_stream(self, entries:Iterable[ParserResult], output:Union[str,BinaryIO],
+                           pretty_print:bool=True) -> None:
+        """
+        Writes parsed site data incrementally. The channel header is written
+        first and then each item is serialized and written as it is pulled
+        from `entries`, so memory use does not grow with the size of the feed.
+        The output is identical to that of `feed_str()`.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Entries parsed from the web (any iterable)
+        output : `str` or binary file-like object
+            Name of the file, or open binary file/socket stream, to write to
+        pretty_print : `bool` (default=True)
+            Creates formatted XML output
+        """
+        # Whitespace placed before channel children and the closing tags
+        child_indent   = '\n    ' if pretty_print else ''
+        channel_indent = '\n  '   if pretty_print else ''
+
+        if isinstance(output, str):
+            with open(output, 'wb') as fl:
+                self.write_stream(entries, fl, pretty_print=pretty_print)
+            return
+
+        # Match the declaration and ASCII output of `feed_str()`
+        output.write(b'<?xml version="1.0"?>\n')
+        with etree.xmlfile(output, encoding='ascii') as xf:
+            with xf.element('rss', version='2.0'):
+                xf.write(channel_indent)
+                with xf.element('channel'):
+                    for child in self.gen_header():
+                        xf.write(child_indent, child)
+
+                    for entry in entries:
+                        item = self.gen_item(entry)
+                        if pretty_print:
+                            etree.indent(item, level=2)
+                        xf.write(child_indent, item)
+
+                    xf.write(channel_indent)
+                if pretty_print:
+                    xf.write('\n')
+        if pretty_print:
+            output.write(b'\n')
+
+
+    def write(self, entries:Iterable[ParserResult], filename:str, pretty_print:bool=True,
+                    stream:bool=False) -> None:
         """
         Writes parsed site data to a given file
 
         Parameters
         ----------
-        entries : `List[ParserResult]`
-            List of entries parsed from the web
+        entries : `Iterable[ParserResult]`
+            Entries parsed from the web (any iterable)
         filename : `str`
             Name of the file to write results to
         pretty_print : `bool` (default=True)
             Creates formatted XML output
+        stream : `bool` (default=False)
+            Write items one at a time with `write_stream()` rather than
+            building the whole feed in memory first
+        """
+        entries = metrics.counted(entries, 'items_written', writer='rss')
+        with metrics.timer('serialize', writer='rss') as timer:
+            entries = metrics.untimed(entries, timer)
+            if stream:
+                self.write_stream(entries, filename, pretty_print=pretty_print)
+            else:
+                with open(filename, 'wb') as fl:
+                    fl.write( self.feed_str(entries=entries, 
+                                            pretty_print=pretty_print) )
+
+        if metrics.enabled:
+            metrics.count('bytes_written', os.path.getsize(filename), writer='rss')
+
+
+    def serialize_item(self, entry:ParserResult, pretty_print:bool=True) -> bytes:
+        """
+        Serialize a single item as it appears inside the channel
+
+        Parameters
+        ----------
+        entry : `ParserResult`
+            Parsed result to be serialized
+        pretty_print : `bool` (default=True)
+            Creates formatted XML output
+
+        Returns
+        -------
+        Serialized item, including its leading indentation
+        """
+        return self.serialize_element(self.gen_item(entry), pretty_print)
+
+
+    @staticmethod
+    def serialize_element(item:lxml.etree.Element, pretty_print:bool=True) -> bytes:
+        """
+        Serialize an item element as it appears inside the channel
+        """
+        if pretty_print:
+            etree.indent(item, level=2)
+            return b'\n    ' + etree.tostring(item, with_tail=False)
+
+        return etree.tostring(item, with_tail=False)
+
+
+    def load_items(self, filename:str, pretty_print:bool=True) -> List[Tuple[str,bytes]]:
+        """
+        Read the items of an existing RSS feed file
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the RSS feed file
+        pretty_print : `bool` (default=True)
+            Formatting to serialize the items with
+
+        Returns
+        -------
+        List of (guid, serialized item) pairs, in file order
+        """
+        items = []
+        for _,item in etree.iterparse(filename, tag='item'):
+            item_id = item.findtext('guid')
+            if item_id is None:
+                item_id = item.findtext('link')
+
+            items.append((item_id, self.serialize_element(item, pretty_print)))
+
+            # Items are no longer needed once serialized
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+
+        return items
+
+
+    def update(self, entries:Iterable[ParserResult], filename:str, max_items:int=None,
+                     pretty_print:bool=True) -> int:
+        """
+        Merge entries into an existing feed file. Entries whose guid is already
+        in the feed are skipped, new entries are placed at the head of the
+        feed, and the oldest items are dropped once there are more than
+        `max_items`. Existing items are copied over as raw bytes using a
+        sidecar index ('<filename>.idx'), so the cost of an update scales with
+        the number of new items rather than the size of the feed.
+
+        Parameters
+        ----------
+        entries : `Iterable[ParserResult]`
+            Entries parsed from the web (any iterable), newest first
+        filename : `str`
+            Name of the file to update. It is created if it does not exist.
+        max_items : `int` (default=None)
+            Maximum number of items to keep in the feed
+        pretty_print : `bool` (default=True)
+            Creates formatted XML output
+
+        Returns
+        -------
+        Number of new items added to the feed
         """
-        with open(filename, 'wb') as fl:
-            fl.write( self.feed_str(entries=entries, 
-                                    pretty_print=pretty_print) )
+        channel_indent = b'\n  ' if pretty_print else b''
+        child_indent   = b'\n    ' if pretty_print else b''
+        root_indent    = b'\n' if pretty_print else b''
+
+        header = b'<?xml version="1.0"?>\n<rss version="2.0">' + channel_indent + b'<channel>'
+        for child in self.gen_header():
+            header += child_indent + etree.tostring(child)
+        footer = channel_indent + b'</channel>' + root_indent + b'</rss>' + root_indent
+
+        entries = metrics.counted(entries, 'items_written', writer='rss')
+        with metrics.timer('serialize', writer='rss') as timer:
+            new_items = ((entry.link, self.serialize_item(entry, pretty_print))
+                         for entry in metrics.untimed(entries, timer))
+            added = update_feed(filename, pretty_print,
+                                header       = header,
+                                footer       = footer,
+                                empty_footer = footer,
+                                separator    = b'',
+                                new_items    = new_items,
+                                load_items   = lambda fname: self.load_items(fname, pretty_print),
+                                max_items    = max_items)
+
+        if metrics.enabled:
+            metrics.count('bytes_written', os.path.getsize(filename), writer='rss')
+
+        return added
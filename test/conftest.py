@@ -0,0 +1,55 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+from feedgen.parsers import (BingNews, GoogleNews, HttpTransport, RateLimiter,
+                             YahooNews)
+from feedgen.testing import FixtureStore, NewsServer, RecordingTransport
+
+PARSERS = {'googlenews': GoogleNews, 'bingnews': BingNews, 'yahoonews': YahooNews}
+SITES   = [f'site{n}.example.com' for n in range(12)]
+
+
+def make_parser(parser_type:str, base:str, transport, sites=(), **kwargs):
+    parser = PARSERS[parser_type](transport=transport, **kwargs)
+    parser.url['base'] = base
+    parser.search_term('cats')
+    for site in sites:
+        parser.add_site(site)
+    return parser
+
+
+def titles(results) -> list:
+    return [res.title for res in results]
+
+
+@pytest.fixture(scope='session')
+def recorded(tmp_path_factory):
+    """
+    Record the responses of a local news server for every parser type, with
+    enough results for three pages on the sites that paginate, and for a
+    Bing search over a site list split into several queries
+
+    Returns
+    -------
+    (store, live) tuple of the `FixtureStore` and a <name, (base URL, titles)>
+    dictionary of the results returned while recording
+    """
+    store     = FixtureStore(str(tmp_path_factory.mktemp('fixtures')))
+    transport = RecordingTransport(store, HttpTransport(limiter=RateLimiter()))
+    live      = {}
+    with NewsServer(total=25) as server:
+        for parser_type in PARSERS:
+            base = f'{server.url}/{parser_type}'
+            live[parser_type] = (base, titles(make_parser(parser_type, base, transport,
+                                                          limit=30).parse_html()))
+
+        base = f'{server.url}/bingnews'
+        live['chunked'] = (base, titles(make_parser('bingnews', base, transport, sites=SITES,
+                                                    max_query_length=200,
+                                                    limit=30).parse_html()))
+    transport.close()
+    return store, live
@@ -0,0 +1,25 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+from feedgen.parsers import GoogleNews, BingNews, YahooNews
+from feedgen.testing import FixtureStore, RecordingTransport, ReplayTransport
+
+if __name__ == '__main__':
+    # Responses are saved next to this script
+    store = FixtureStore(os.path.join(os.path.dirname(__file__), 'fixtures'))
+    terms = sys.argv[1:] or ['cats']
+
+    # Record the live responses of each site
+    for parser_cls in (GoogleNews, BingNews, YahooNews):
+        for term in terms:
+            parser = parser_cls(limit=30, transport=RecordingTransport(store))
+            parser.search_term(term)
+            print(f'{parser.name} ({term}): recorded {len(parser.parse_html())} results')
+
+    # Check that the recordings replay without a network connection
+    for parser_cls in (GoogleNews, BingNews, YahooNews):
+        for term in terms:
+            parser = parser_cls(limit=30, transport=ReplayTransport(store))
+            parser.search_term(term)
+            print(f'{parser.name} ({term}): replayed {len(parser.parse_html())} results')
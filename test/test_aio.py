@@ -0,0 +1,184 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from feedgen.parsers import (GoogleNews, HttpCache, HttpTransport, RateLimiter, YahooNews,
+                             aio, gather_parsers)
+from feedgen.testing import NewsServer, make_response, synthetic_page
+
+
+class PageTransport():
+    """ Blocking transport that answers every request with a synthetic page """
+
+    def __init__(self) -> None:
+        self.requests = []
+
+    def get(self, url:str, params:dict=None, headers:dict=None,
+                  stream:bool=False, parser_type:str=None):
+        self.requests.append((url, params))
+        page = synthetic_page('googlenews', params.get('q', ''), count=3)
+        return make_response(url, 200, {}, page, 'utf-8')
+
+    def close(self) -> None:
+        pass
+
+
+class PageResponse():
+    """ Stand-in for an `aiohttp` response """
+
+    def __init__(self, status:int, headers:dict, body:bytes) -> None:
+        self.status  = status
+        self.headers = headers
+        self.body    = body
+        self.charset = 'utf-8'
+        self.content = self
+        self.chunks  = 0
+
+    async def __aenter__(self) -> 'PageResponse':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        assert self.status < 400
+
+    async def text(self) -> str:
+        return self.body.decode('utf-8')
+
+    async def iter_chunked(self, size:int):
+        for start in range(0, len(self.body), size):
+            self.chunks += 1
+            yield self.body[start:start+size]
+
+
+class PageSession():
+    """
+    Stand-in for `aiohttp.ClientSession` answering with synthetic pages, and
+    with 304 Not Modified to requests revalidating them
+    """
+
+    requests  = []
+    responses = []
+    count     = 3
+
+    def __init__(self, timeout=None) -> None:
+        pass
+
+    def get(self, url:str, params:dict=None, headers:dict=None) -> PageResponse:
+        self.requests.append((url, params, headers))
+        etag = '"' + params.get('q', '') + '"'
+        if (headers or {}).get('If-None-Match') == etag:
+            resp = PageResponse(304, {'ETag': etag}, b'')
+        else:
+            page = synthetic_page('googlenews', params.get('q', ''), count=self.count,
+                                  padding=1000)
+            resp = PageResponse(200, {'ETag': etag}, page)
+
+        self.responses.append(resp)
+        return resp
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def native(monkeypatch):
+    """ Run the async path as if `aiohttp` were installed """
+    PageSession.requests  = []
+    PageSession.responses = []
+    monkeypatch.setattr(aio, 'aiohttp', SimpleNamespace(ClientTimeout=lambda total: None,
+                                                        ClientSession=PageSession))
+    return PageSession.requests
+
+
+def test_fallback_uses_the_parsers_transport(monkeypatch):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    transports = [PageTransport(), PageTransport()]
+    parsers    = [GoogleNews(transport=transport) for transport in transports]
+    for n,parser in enumerate(parsers):
+        parser.search_term(f'cats {n}')
+
+    results = asyncio.run(gather_parsers(parsers, return_exceptions=False))
+    assert [[res.title for res in found] for found in results] == \
+        [[f'cats {n} story {m}' for m in range(1, 4)] for n in range(2)]
+    assert [len(transport.requests) for transport in transports] == [1, 1]
+
+
+def test_fallback_without_a_transport_argument(monkeypatch):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    transport = PageTransport()
+    parser    = GoogleNews(transport=transport)
+    parser.search_term('dogs')
+
+    results = asyncio.run(parser.aparse_html())
+    assert len(results) == 3
+    assert len(transport.requests) == 1
+
+
+def test_native_queries_are_revalidated_with_the_cache(native, tmp_path, monkeypatch):
+    cache  = HttpCache(str(tmp_path / 'cache'))
+    parser = GoogleNews(cache=cache)
+    parser.search_term('cats')
+    transport = aio.AsyncTransport(limiter=RateLimiter())
+
+    first = asyncio.run(parser.aparse_html(transport))
+    assert len(cache.index) == 1
+
+    # The second query is conditional, and the 304 reuses the stored results
+    parsed = []
+    monkeypatch.setattr(GoogleNews, 'extract', lambda self, html: parsed.append(html))
+    again = asyncio.run(parser.aparse_html(transport, offload=True))
+    assert [res.title for res in again] == [res.title for res in first]
+    assert parsed == []
+    assert [headers for _,_,headers in native] == [{}, {'If-None-Match': '"cats"'}]
+
+
+def test_fallback_queries_are_revalidated_with_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    cache     = HttpCache(str(tmp_path / 'cache'))
+    transport = HttpTransport(limiter=RateLimiter())
+    with NewsServer(total=25) as server:
+        def search():
+            parser = server.point(YahooNews(limit=100, page_workers=1, transport=transport,
+                                            cache=cache))
+            parser.search_term('cats')
+            return asyncio.run(parser.aparse_html())
+
+        first = search()
+        assert len(first) == 25
+        assert len(cache.index) == 3
+
+        parsed = []
+        monkeypatch.setattr(YahooNews, 'extract', lambda self, html: parsed.append(html))
+        assert [res.title for res in search()] == [res.title for res in first]
+        assert parsed == []
+        assert server.requests == 6
+    transport.close()
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_native_queries_are_streamed(native, monkeypatch, offload):
+    monkeypatch.setattr(PageSession, 'count', 10)
+    transport = aio.AsyncTransport(limiter=RateLimiter())
+    parser    = GoogleNews(limit=3, stream=True, chunk_size=512)
+    parser.search_term('cats')
+
+    results = asyncio.run(parser.aparse_html(transport, offload=offload))
+    assert [res.title for res in results] == [f'cats story {n}' for n in range(1, 4)]
+
+    # Reading stopped once the limit was reached
+    resp = PageSession.responses[0]
+    assert 0 < resp.chunks < -(-len(resp.body) // 512)
+
+    # The whole page is read when it holds fewer results than the limit
+    parser.limit = 20
+    results = asyncio.run(parser.aparse_html(transport, offload=offload))
+    assert len(results) == 10
+    resp = PageSession.responses[1]
+    assert resp.chunks == -(-len(resp.body) // 512)
@@ -0,0 +1,81 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import pickle
+from multiprocessing import Pool
+
+import pytest
+
+from feedgen.parsers import MISSING, ParserResult, ResultBatch
+
+
+def make_results() -> list:
+    return [
+        ParserResult('First', 'https://a.com/1', 'One',
+                     extras={'src_name': 'GoogleNews', 'src_url': 'https://news.google.com',
+                             'date': 'Mon'}),
+        ParserResult('Second', 'https://a.com/2', 'Two',
+                     extras={'src_name': 'GoogleNews', 'src_url': 'https://news.google.com',
+                             'author': 'Ann', 'score': None}),
+        ParserResult('Third', 'https://b.com/3', None,
+                     extras={'src_name': 'BingNews', 'date': 'Tue'}),
+        ParserResult('Fourth', 'https://c.com/4', 'Four'),
+    ]
+
+
+def fields(result:ParserResult) -> tuple:
+    return (result.title, result.link, result.descrip, result.extras)
+
+
+def summarize(batch:ResultBatch) -> tuple:
+    """ Runs in a worker process, on a batch sent from the parent """
+    return len(batch), batch.column('author'), ResultBatch(list(batch)[::-1])
+
+
+def test_round_trip():
+    results = make_results()
+    batch   = ResultBatch(results)
+    assert len(batch) == len(results)
+    assert [fields(res) for res in batch] == [fields(res) for res in results]
+    assert fields(batch[2]) == fields(results[2])
+
+    # Sources are stored once
+    assert len(batch.sources) == 3
+
+
+def test_column_accessors():
+    batch = ResultBatch(make_results())
+    assert batch.column('title') == ['First', 'Second', 'Third', 'Fourth']
+    assert batch.column('link') == ['https://a.com/1', 'https://a.com/2',
+                                    'https://b.com/3', 'https://c.com/4']
+    assert batch.column('descrip') == ['One', 'Two', None, 'Four']
+    assert batch.column('src_name') == ['GoogleNews', 'GoogleNews', 'BingNews', MISSING]
+    assert batch.column('date') == ['Mon', MISSING, 'Tue', MISSING]
+    assert batch.column('score') == [MISSING, None, MISSING, MISSING]
+    with pytest.raises(KeyError):
+        batch.column('missing')
+
+
+def test_missing_survives_pickling():
+    assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+
+    batch = pickle.loads(pickle.dumps(ResultBatch(make_results())))
+    assert batch.column('date')[1] is MISSING
+    assert 'date' not in batch[1].extras
+    assert [fields(res) for res in batch] == [fields(res) for res in make_results()]
+
+
+def test_batches_cross_a_pool_boundary():
+    batches = [ResultBatch(make_results()), ResultBatch(make_results()[:2])]
+    with Pool(2) as pool:
+        summaries = pool.map(summarize, batches)
+
+    assert [size for size,_,_ in summaries] == [4, 2]
+    assert summaries[0][1] == [MISSING, 'Ann', MISSING, MISSING]
+    assert summaries[0][1][0] is MISSING
+
+    # Batches built in a worker come back intact
+    returned = summaries[0][2]
+    assert [fields(res) for res in returned] == [fields(res) for res in make_results()[::-1]]
+    assert returned.column('date')[0] is MISSING
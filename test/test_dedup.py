@@ -0,0 +1,113 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import itertools
+import random
+
+from feedgen.filters import Deduplicator, MinHashIndex, SimHashIndex, simhash
+from feedgen.filters.dedup import word_set
+from feedgen.parsers import ParserResult
+
+# Headlines of the same story from different outlets, differing by a word
+NEAR_DUPLICATES = [
+    ('Fed raises interest rates by half a point to fight inflation',
+     'Fed raises interest rates by half a point to combat inflation'),
+    ('Apple unveils new iPhone with faster chip and better camera',
+     'Apple unveils new iPhone with faster processor and better camera'),
+    ('Stocks rally as investors cheer strong jobs report',
+     'Stocks rally as investors cheer solid jobs report'),
+    ('Scientists discover new species of frog in the Amazon rainforest',
+     'Scientists find new species of frog in the Amazon rainforest'),
+    ('Cat rescued from tree after three days, firefighters say',
+     'Cat rescued from tree after four days, firefighters say'),
+]
+
+
+def result(title:str, link:str, descrip:str='') -> ParserResult:
+    return ParserResult(title=title, link=link, descrip=descrip)
+
+
+def headlines(rng:random.Random, count:int) -> list:
+    vocab = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9)))
+             for _ in range(5000)]
+    stops = ['the', 'a', 'to', 'in', 'of', 'for', 'on', 'with']
+    return [' '.join(rng.sample(vocab, 8) + rng.sample(stops, 3)) for _ in range(count)]
+
+
+def test_near_duplicate_headlines_are_removed():
+    for n,(first,second) in enumerate(NEAR_DUPLICATES):
+        dedup = Deduplicator()
+        assert not dedup.is_duplicate(result(first, f'https://a.com/{n}'))
+        assert dedup.is_duplicate(result(second, f'https://b.com/{n}'))
+
+
+def test_distinct_headlines_are_kept():
+    dedup = Deduplicator()
+    headlines = [title for pair in NEAR_DUPLICATES for title in pair[:1]]
+    assert not any(dedup.is_duplicate(result(title, f'https://a.com/{n}'))
+                   for n,title in enumerate(headlines))
+
+    # Unrelated headlines are far apart
+    for first,second in itertools.combinations(headlines, 2):
+        assert bin(simhash(first) ^ simhash(second)).count('1') > 16
+
+
+def test_empty_text_is_only_compared_by_link():
+    dedup = Deduplicator()
+    results = [result('', 'https://a.com/1'),
+               result(None, 'https://a.com/2', descrip=None),
+               result(' - ', 'https://a.com/3'),
+               result('', 'https://www.a.com/1/?utm_source=feed')]
+    assert [dedup.is_duplicate(res) for res in results] == [False, False, False, True]
+
+
+def test_identical_links_are_removed():
+    dedup = Deduplicator(use_content=False)
+    results = [result('First', 'https://www.example.com/story?utm_source=x'),
+               result('Second', 'http://example.com/story/'),
+               result('Third', 'https://example.com/other')]
+    assert [res.title for res in dedup.filter(results)] == ['First', 'Third']
+
+
+def test_index_finds_every_fingerprint_within_distance():
+    rng   = random.Random(7)
+    index = SimHashIndex()
+    fingerprints = [rng.getrandbits(64) for _ in range(2000)]
+    for key,fingerprint in enumerate(fingerprints):
+        index.add(key, fingerprint)
+
+    for _ in range(100):
+        query = fingerprints[rng.randrange(len(fingerprints))]
+        query ^= sum(1 << bit for bit in rng.sample(range(64), index.max_distance))
+        expected = {key for key,fingerprint in enumerate(fingerprints)
+                    if bin(query ^ fingerprint).count('1') <= index.max_distance}
+        assert set(index.candidates(query)) == expected
+
+
+def test_index_lookup_cost_does_not_grow_with_size():
+    rng     = random.Random(7)
+    stored  = headlines(rng, 20000)
+    queries = headlines(rng, 500)
+
+    compared = {}
+    for size in (1000, 20000):
+        index = MinHashIndex()
+        for key,text in enumerate(stored[:size]):
+            index.add(key, word_set(text))
+
+        # Unrelated headlines only share stop words with the stored ones, so
+        # a lookup compares next to none of them however many are stored
+        compared[size] = sum(len(list(index.candidates(word_set(text))))
+                             for text in queries) / len(queries)
+
+        # Near-duplicates still match on some band
+        found = 0
+        for key in rng.sample(range(size), 200):
+            words = stored[key].split()
+            words[rng.randrange(8)] = 'changed'
+            found += key in set(index.candidates(word_set(' '.join(words))))
+        assert found >= 196
+
+    assert compared[1000] < 0.1
+    assert compared[20000] < 0.5
@@ -0,0 +1,95 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import threading
+import time
+
+from feedgen.parsers import ParserGroup, ParserResult
+
+
+class StubParser():
+    """ Parser returning canned results after a delay, or raising an error """
+
+    def __init__(self, name:str, count:int=2, delay:float=0.0, error:Exception=None,
+                       wait:threading.Event=None) -> None:
+        self.type        = 'stub'
+        self.search_text = name
+        self.count       = count
+        self.delay       = delay
+        self.error       = error
+        self.wait        = wait
+
+    def parse_html(self) -> list:
+        time.sleep(self.delay)
+        if self.wait is not None:
+            self.wait.wait()
+        if self.error is not None:
+            raise self.error
+        return [ParserResult(title=f'{self.search_text} {n}', link=f'https://a.com/{n}',
+                             descrip='') for n in range(self.count)]
+
+
+def titles(results) -> list:
+    return [res.title for res in results]
+
+
+def test_errors_do_not_lose_other_results():
+    group = ParserGroup([StubParser('a'), StubParser('b', error=ValueError('bad page')),
+                         StubParser('c')])
+    result = group.run()
+
+    assert not result.ok()
+    assert list(result.errors) == ['stub:b']
+    assert isinstance(result.errors['stub:b'], ValueError)
+    assert list(result.results) == ['stub:a', 'stub:c']
+    assert titles(result.merged()) == ['a 0', 'a 1', 'c 0', 'c 1']
+
+
+def test_results_keep_the_order_sources_were_added():
+    # The first sources finish last
+    group = ParserGroup([StubParser(name, delay=delay)
+                         for name,delay in [('a', 0.15), ('b', 0.1), ('c', 0.05), ('d', 0.0)]])
+    result = group.run()
+
+    assert result.ok()
+    assert list(result.results) == ['stub:a', 'stub:b', 'stub:c', 'stub:d']
+    assert titles(result.merged()) == [f'{name} {n}' for name in 'abcd' for n in range(2)]
+
+
+def test_merged_results_are_tagged_with_their_source():
+    group = ParserGroup()
+    group.add(StubParser('a'), label='first')
+    group.add(StubParser('a'), label='second')
+
+    merged = group.run().merged()
+    assert [(res.extras['src_label'], res.title) for res in merged] == \
+        [('first', 'a 0'), ('first', 'a 1'), ('second', 'a 0'), ('second', 'a 1')]
+
+
+def test_duplicate_labels_are_made_unique():
+    group  = ParserGroup()
+    labels = [group.add(StubParser('cats')), group.add(StubParser('cats')),
+              group.add(StubParser('dogs'), label='stub:cats'),
+              group.add(StubParser('fish'), label='fish'), group.add(StubParser('fish'), label='fish')]
+    assert labels == ['stub:cats', 'stub:cats#2', 'stub:cats#3', 'fish', 'fish#2']
+
+    result = group.run()
+    assert list(result.results) == labels
+    assert titles(result.results['stub:cats#3']) == ['dogs 0', 'dogs 1']
+
+
+def test_slow_sources_time_out():
+    release = threading.Event()
+    group   = ParserGroup([StubParser('a'), StubParser('slow', wait=release), StubParser('c')],
+                          timeout=0.2)
+    try:
+        start  = time.monotonic()
+        result = group.run()
+        assert time.monotonic() - start < 1.0
+    finally:
+        release.set()
+
+    assert list(result.errors) == ['stub:slow']
+    assert isinstance(result.errors['stub:slow'], TimeoutError)
+    assert titles(result.merged()) == ['a 0', 'a 1', 'c 0', 'c 1']
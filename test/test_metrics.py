@@ -0,0 +1,67 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import time
+
+import pytest
+
+from feedgen.metrics import MetricsHook, metrics
+from feedgen.parsers import ParserResult
+from feedgen.writers import JsonFeed, RssFeed
+
+
+class Recorder(MetricsHook):
+    def __init__(self) -> None:
+        self.stages = []
+        self.counts = []
+
+    def observe(self, stage:str, seconds:float, labels:dict) -> None:
+        self.stages.append((stage, seconds))
+
+    def count(self, name:str, value:float, labels:dict) -> None:
+        self.counts.append((name, value, labels))
+
+
+@pytest.fixture
+def recorder():
+    hook = metrics.add_hook(Recorder())
+    yield hook
+    metrics.remove_hook(hook)
+
+
+def slow_results(count:int, delay:float=0.05):
+    for n in range(count):
+        time.sleep(delay)
+        yield ParserResult(title=f'Story {n}', link=f'https://a.com/{n}', descrip='')
+
+
+WRITES = {
+    'rss':          lambda fname: RssFeed('T', 'https://a.com', 'D').write(slow_results(4), fname),
+    'rss_stream':   lambda fname: RssFeed('T', 'https://a.com', 'D').write(slow_results(4), fname, stream=True),
+    'rss_update':   lambda fname: RssFeed('T', 'https://a.com', 'D').update(slow_results(4), fname),
+    'json':         lambda fname: JsonFeed('T', 'https://a.com', 'D').write(slow_results(4), fname),
+    'json_update':  lambda fname: JsonFeed('T', 'https://a.com', 'D').update(slow_results(4), fname),
+    'ndjson':       lambda fname: JsonFeed('T', 'https://a.com', 'D').write_ndjson(slow_results(4), fname),
+}
+
+
+@pytest.mark.parametrize('kind', sorted(WRITES))
+def test_serialize_time_excludes_upstream(kind, recorder, tmp_path):
+    WRITES[kind](str(tmp_path / 'feed'))
+
+    serialize = [seconds for stage,seconds in recorder.stages if stage == 'serialize']
+    assert len(serialize) == 1
+    assert 0 <= serialize[0] < 0.1
+    assert ('items_written', 4) in [(name, value) for name,value,_ in recorder.counts]
+
+
+def test_upstream_errors_are_not_counted_against_serialize(recorder, tmp_path):
+    def failing():
+        yield from slow_results(1, delay=0)
+        raise RuntimeError('fetch failed')
+
+    with pytest.raises(RuntimeError):
+        RssFeed('T', 'https://a.com', 'D').write(failing(), str(tmp_path / 'feed.xml'))
+
+    assert not [labels for name,_,labels in recorder.counts if name == 'errors']
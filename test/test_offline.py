@@ -0,0 +1,84 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import tarfile
+from multiprocessing import Pool
+
+import pytest
+
+from feedgen.parsers import GoogleNews, iter_offline, register_parser
+from feedgen.parsers.offline import init_worker, iter_chunk_results
+from feedgen.testing import synthetic_page
+
+
+class RenamedNews(GoogleNews):
+    """ Parser registered under a type unknown to the worker modules """
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    directory = tmp_path / 'pages'
+    directory.mkdir()
+    for n in range(6):
+        page = synthetic_page('googlenews', f'query {n}', count=3)
+        (directory / f'page{n}.html').write_bytes(page)
+    (directory / 'blank.html').write_bytes(b'  \n ')
+    (directory / 'notes.txt').write_bytes(b'ignored')
+    return directory
+
+
+def expected_titles(directory) -> list:
+    parser = GoogleNews()
+    titles = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html') and name != 'blank.html':
+            titles += [res.title for res in parser.extract((directory / name).read_bytes())]
+    return titles
+
+
+def titles(results) -> list:
+    return [res.title for res in results]
+
+
+def test_directory(snapshots):
+    results = titles(iter_offline(str(snapshots), 'googlenews', processes=2, chunksize=2))
+    assert len(results) == 18
+    assert results == expected_titles(snapshots)
+
+
+@pytest.mark.parametrize('mode', ['w', 'w:gz'])
+def test_tar_archives(snapshots, tmp_path, mode):
+    archive = str(tmp_path / 'pages.tar')
+    with tarfile.open(archive, mode) as tar:
+        for name in sorted(os.listdir(snapshots)):
+            tar.add(str(snapshots / name), arcname=name)
+
+    results = titles(iter_offline(archive, 'googlenews', processes=2, limit=2))
+    assert len(results) == 12
+
+
+def test_registered_parser_types(snapshots):
+    register_parser('renamednews', RenamedNews)
+    results = titles(iter_offline(str(snapshots), 'renamednews', processes=1))
+    assert results == expected_titles(snapshots)
+
+    with pytest.raises(ValueError):
+        next(iter_offline(str(snapshots), 'unknownnews'))
+
+
+def test_in_flight_tasks_are_bounded():
+    pulled = []
+    def tasks():
+        for n in range(20):
+            pulled.append(n)
+            yield (f'page{n}.html', synthetic_page('googlenews', f'query {n}', count=1))
+
+    with Pool(processes=1, initializer=init_worker,
+              initargs=(GoogleNews, 10, {})) as pool:
+        outcomes = iter_chunk_results(pool, tasks(), chunksize=2, max_pending=2)
+        name, results, error = next(outcomes)
+        assert (name, len(results), error) == ('page0.html', 1, None)
+        assert len(pulled) <= 6
+
+        assert len(list(outcomes)) == 19
@@ -0,0 +1,78 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import asyncio
+
+import pytest
+
+from feedgen.parsers import HttpCache, HttpTransport, RateLimiter, YahooNews, aio
+from feedgen.testing import NewsServer
+
+
+@pytest.fixture
+def transport():
+    # Not rate limited, so the tests don't wait on the default site limits
+    transport = HttpTransport(limiter=RateLimiter())
+    yield transport
+    transport.close()
+
+
+def search(server:NewsServer, transport:HttpTransport, **kwargs) -> YahooNews:
+    parser = server.point(YahooNews(transport=transport, **kwargs))
+    parser.search_term('cats')
+    return parser
+
+
+def titles(results) -> list:
+    return [res.title for res in results]
+
+
+@pytest.mark.parametrize('page_workers', [1, 2, 4])
+def test_pages_stop_at_the_first_short_page(transport, page_workers):
+    with NewsServer(total=35) as server:
+        results = search(server, transport, limit=100, page_workers=page_workers).parse_html()
+        assert titles(results) == [f'cats story {n}' for n in range(1, 36)]
+
+        # Four pages hold every result; at most `page_workers - 1` more are
+        # in flight when the short page is found
+        assert 4 <= server.requests <= 4 + page_workers - 1
+
+
+def test_pages_stop_at_the_limit(transport):
+    with NewsServer() as server:
+        results = search(server, transport, limit=25, page_workers=4).parse_html()
+        assert titles(results) == [f'cats story {n}' for n in range(1, 26)]
+        assert server.requests == 3
+
+
+def test_every_page_is_cached(transport, tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    with NewsServer(total=35) as server:
+        first = search(server, transport, limit=100, page_workers=1, cache=cache).parse_html()
+        assert len(cache.index) == 4
+
+        # Unchanged pages are answered with a 304 and not parsed again
+        parsed = []
+        monkeypatch.setattr(YahooNews, 'extract', lambda self, html: parsed.append(html))
+        again = search(server, transport, limit=100, page_workers=1, cache=cache).parse_html()
+        assert titles(again) == titles(first)
+        assert parsed == []
+        assert server.requests == 8
+
+
+def test_every_page_is_streamed(transport):
+    with NewsServer(total=35) as server:
+        plain    = search(server, transport, limit=100).parse_html()
+        streamed = search(server, transport, limit=100, stream=True).parse_html()
+        assert titles(streamed) == titles(plain)
+
+
+@pytest.mark.parametrize('limit,expected', [(30, 30), (100, 35)])
+def test_async_queries_fetch_every_page(transport, monkeypatch, limit, expected):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    with NewsServer(total=35) as server:
+        parser  = search(server, transport, limit=limit, page_workers=2)
+        results = asyncio.run(parser.aparse_html())
+        assert titles(results) == titles(parser.parse_html())
+        assert titles(results) == [f'cats story {n}' for n in range(1, expected + 1)]
@@ -0,0 +1,85 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import pytest
+
+from conftest import PARSERS, SITES, make_parser, titles
+from feedgen.parsers import HttpCache
+from feedgen.testing import ReplayTransport
+
+
+@pytest.mark.parametrize('parser_type', sorted(PARSERS))
+def test_extraction(recorded, parser_type):
+    store, live = recorded
+    base, expected = live[parser_type]
+    results = make_parser(parser_type, base, ReplayTransport(store), limit=30).parse_html()
+
+    assert titles(results) == expected
+    assert all(res.link and res.extras['src_name'] for res in results)
+
+
+def test_result_counts(recorded):
+    _, live = recorded
+    # Google has a single page of 10, Bing and Yahoo page through all 25
+    assert [len(live[parser_type][1]) for parser_type in sorted(PARSERS)] == [25, 10, 25]
+
+
+@pytest.mark.parametrize('parser_type', sorted(PARSERS))
+def test_stream(recorded, parser_type):
+    store, live = recorded
+    base, expected = live[parser_type]
+    results = make_parser(parser_type, base, ReplayTransport(store), limit=30,
+                          stream=True).parse_html()
+    assert titles(results) == expected
+
+    # Streaming stops once `limit` results have been found
+    limited = make_parser(parser_type, base, ReplayTransport(store), limit=5,
+                          stream=True).parse_html()
+    assert titles(limited) == expected[:5]
+
+
+@pytest.mark.parametrize('parser_type', sorted(PARSERS))
+def test_cache(recorded, parser_type, tmp_path, monkeypatch):
+    store, live = recorded
+    base, expected = live[parser_type]
+    cache = HttpCache(str(tmp_path / 'cache'))
+    first = make_parser(parser_type, base, ReplayTransport(store), limit=30,
+                        cache=cache).parse_html()
+    assert titles(first) == expected
+
+    # Revalidated pages come back unchanged and aren't parsed again
+    cls = PARSERS[parser_type]
+    monkeypatch.setattr(cls, 'extract', lambda self, html: pytest.fail('page was parsed'))
+    replay = ReplayTransport(store)
+    again  = make_parser(parser_type, base, replay, limit=30, cache=cache).parse_html()
+    assert titles(again) == expected
+    assert replay.requests == len(cache.index)
+
+
+def test_pagination_only_requests_recorded_pages(recorded):
+    store, live = recorded
+    base, expected = live['yahoonews']
+
+    # A strict replay raises for any page that wasn't recorded, so fetching
+    # past the short third page would fail
+    replay  = ReplayTransport(store, strict=True)
+    results = make_parser('yahoonews', base, replay, limit=30, page_workers=1).parse_html()
+    assert titles(results) == expected
+    assert replay.requests == 3
+
+
+def test_site_chunking(recorded):
+    store, live = recorded
+    base, expected = live['chunked']
+    replay = ReplayTransport(store)
+    parser = make_parser('bingnews', base, replay, sites=SITES, max_query_length=200,
+                         limit=30)
+    results = parser.parse_html()
+
+    assert len(parser.site_chunks()) > 1
+    assert titles(results) == expected
+    assert len(results) == 30
+    # Each chunk's query is worked into its synthetic results
+    queries = {title.rsplit(' story ', 1)[0] for title in titles(results)}
+    assert queries == {parser.site_query(sites) for sites in parser.site_chunks()}
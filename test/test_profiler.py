@@ -0,0 +1,86 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import time
+
+from feedgen.parsers import CSSAttribute, CSSInnerText, SelectorProfiler, TagConfig, explain
+from feedgen.parsers import GoogleNews
+from feedgen.testing import synthetic_page
+
+PAGE = ''.join(['<html><body>'] +
+               [f'<div class="story"><h4>Story {n}</h4><a href="/{n}">more</a>'
+                f'<p>About {n}</p><span>{n}</span><span>again</span></div>' for n in range(5)] +
+               ['</body></html>'])
+
+
+class SlowText(CSSInnerText):
+    """ Selector that takes a fixed time to evaluate """
+
+    def __init__(self, css:str, delay:float, default=None) -> None:
+        super().__init__(css, default=default)
+        self.delay = delay
+
+    def getValue(self, div, indx:int=0) -> str:
+        time.sleep(self.delay)
+        return super().getValue(div, indx)
+
+
+def config(title:CSSInnerText, descrip:CSSInnerText, extras:dict={}) -> TagConfig:
+    return TagConfig(container=CSSInnerText('div.story'), title=title,
+                     link=CSSAttribute('a', 'href'), descrip=descrip, extras=extras)
+
+
+def test_per_selector_timings_and_flags():
+    tags   = config(SlowText('h4', 0.02), CSSInnerText('p'),
+                    extras={'byline': CSSInnerText('span.byline', default=''),
+                            'count' : CSSInnerText('span')})
+    report = SelectorProfiler(tags).run(PAGE)
+
+    assert report.container.match_counts == [5]
+    profiles = {prof.name: prof for prof in report.selectors}
+    assert list(profiles) == ['title', 'link', 'descrip', 'byline', 'count']
+    assert all(prof.containers == 5 and prof.evaluations == 5 for prof in profiles.values())
+    assert profiles['title'].seconds >= 5 * 0.02
+    assert profiles['title'].time_per_container >= 0.02
+    assert report.slowest(1) == [profiles['title']]
+
+    assert profiles['title'].flags == ['slow']
+    assert profiles['link'].flags == []
+    assert profiles['byline'].flags == ['always default']
+    assert profiles['count'].flags == ['multiple matches']
+    assert profiles['count'].mean_matches == 2
+
+
+def test_equal_selectors_are_not_flagged_as_slow():
+    tags   = config(SlowText('h4', 0.005), SlowText('p', 0.005))
+    tags.link = SlowText('a', 0.005)
+    report = SelectorProfiler(tags).run(PAGE)
+    assert [prof.flags for prof in report.selectors] == [[], [], []]
+
+    # A fixed time per container still flags them
+    report = SelectorProfiler(tags, slow_seconds=0.001).run(PAGE)
+    assert [prof.flags for prof in report.selectors] == [['slow']] * 3
+
+
+def test_explain_report():
+    parser = GoogleNews()
+    report = explain(parser, html=synthetic_page('googlenews', 'cats', count=4))
+    text   = str(report)
+
+    assert report.container.match_counts == [4]
+    assert text.startswith('Parse: ')
+    assert f'Container: {parser.tag_config.container.css}' in text
+    for prof in report.selectors:
+        assert f'\n{prof.name}: {prof.css}' in text
+        assert f'    xpath: {prof.path}\n' in text
+        assert prof.as_dict()['containers'] == 4
+
+    data = report.as_dict()
+    assert [prof['name'] for prof in data['selectors']] == [prof.name for prof in report.selectors]
+
+
+def test_pages_without_containers_are_flagged():
+    report = SelectorProfiler(config(CSSInnerText('h4'), CSSInnerText('p'))).run('<html></html>')
+    assert report.container.flags == ['no containers']
+    assert all(prof.flags == [] for prof in report.selectors)
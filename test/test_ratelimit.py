@@ -0,0 +1,95 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from feedgen.parsers import RateLimiter, RetryPolicy, TokenBucket, aio, rate_limiter
+
+
+class FakeResponse():
+    def __init__(self, status:int, headers:dict, text:str) -> None:
+        self.status  = status
+        self.headers = headers
+        self._text   = text
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def text(self) -> str:
+        return self._text
+
+
+class FakeSession():
+    """ Stand-in for `aiohttp.ClientSession` answering with canned responses """
+
+    responses = []
+
+    def __init__(self, timeout=None) -> None:
+        self.requests = []
+
+    def get(self, url:str, params:dict=None, headers:dict=None) -> FakeResponse:
+        self.requests.append((url, params))
+        return self.responses.pop(0)
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.mark.parametrize('rate,burst', [(0, 1), (-1.0, 1), (1.0, 0)])
+def test_invalid_limits_are_rejected(rate, burst):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, burst)
+    with pytest.raises(ValueError):
+        RateLimiter().configure('googlenews', rate=rate, burst=burst)
+    with pytest.raises(ValueError):
+        RateLimiter(limits={'googlenews': (rate, burst)})
+
+
+def test_built_in_parsers_are_limited_by_default():
+    for parser_type in ('googlenews', 'bingnews', 'yahoonews'):
+        rate, burst = rate_limiter.limit(parser_type)
+        assert rate is not None and rate > 0 and burst >= 1
+
+    # Other parsers and hosts are not limited
+    assert rate_limiter.bucket('https://example.com', 'default') is None
+
+
+def test_async_requests_are_retried(monkeypatch):
+    FakeSession.responses = [FakeResponse(429, {'Retry-After': '0'}, 'slow down'),
+                             FakeResponse(503, {}, 'unavailable'),
+                             FakeResponse(200, {}, '<html>ok</html>')]
+    monkeypatch.setattr(aio, 'aiohttp', SimpleNamespace(ClientTimeout=lambda total: None,
+                                                        ClientSession=FakeSession))
+    limiter   = RateLimiter(rate=1000.0, burst=10)
+    transport = aio.AsyncTransport(limiter=limiter,
+                                   retry_policy=RetryPolicy(max_retries=3, backoff_factor=0.01))
+
+    async def fetch():
+        async with transport:
+            text = await transport.get_text('https://example.com/search', {'q': 'cats'})
+            return text, transport.session.requests
+
+    text, requests = asyncio.run(fetch())
+    assert text == '<html>ok</html>'
+    assert len(requests) == 3
+
+
+def test_async_retries_give_up(monkeypatch):
+    FakeSession.responses = [FakeResponse(500, {}, 'error')] * 2
+    monkeypatch.setattr(aio, 'aiohttp', SimpleNamespace(ClientTimeout=lambda total: None,
+                                                        ClientSession=FakeSession))
+    transport = aio.AsyncTransport(limiter=RateLimiter(),
+                                   retry_policy=RetryPolicy(max_retries=1, backoff_factor=0.01))
+
+    async def fetch():
+        async with transport:
+            return await transport.get_text('https://example.com/search', {})
+
+    assert asyncio.run(fetch()) == 'error'
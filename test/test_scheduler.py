@@ -0,0 +1,90 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import threading
+import time
+
+from lxml import etree
+
+from feedgen.parsers import GoogleNews, ParserResult
+from feedgen.scheduler import FeedJob, Scheduler
+from feedgen.writers import RssFeed
+
+
+class SlowJob(FeedJob):
+    """ Job that records how many of its runs overlap """
+
+    def __init__(self, duration:float, **kwargs) -> None:
+        super().__init__(GoogleNews, None, 'slow.xml', **kwargs)
+        self.duration = duration
+        self.lock     = threading.Lock()
+        self.active_runs = 0
+        self.max_active  = 0
+        self.run_count   = 0
+
+    def run(self) -> int:
+        with self.lock:
+            self.active_runs += 1
+            self.run_count   += 1
+            self.max_active   = max(self.max_active, self.active_runs)
+        time.sleep(self.duration)
+        with self.lock:
+            self.active_runs -= 1
+        return 0
+
+
+def test_adding_a_queued_job_reschedules_it():
+    scheduler = Scheduler(jitter=0)
+    job = SlowJob(0.0, interval=60)
+    scheduler.add(job, delay=30)
+    scheduler.add(job, delay=10)
+    scheduler.add(job, delay=20)
+
+    assert scheduler.jobs() == [job]
+    assert len(scheduler) == 1
+
+
+def test_a_job_never_runs_twice_at_once():
+    scheduler = Scheduler(max_workers=4, jitter=0)
+    job = SlowJob(0.2, interval=60)
+
+    # Added both while queued, before the scheduler starts, and while running
+    scheduler.add(job)
+    scheduler.add(job)
+    scheduler.start()
+    try:
+        for _ in range(5):
+            time.sleep(0.02)
+            scheduler.add(job)
+        time.sleep(0.3)
+    finally:
+        scheduler.stop()
+
+    assert job.run_count >= 1
+    assert job.max_active == 1
+
+
+def test_concurrent_updates_of_the_same_feed(tmp_path):
+    filename = str(tmp_path / 'feed.xml')
+    writer   = RssFeed('Feed', 'https://a.com', 'Test feed')
+    errors   = []
+
+    def update(n:int) -> None:
+        results = [ParserResult(title=f'Story {n}.{m}', link=f'https://a.com/{n}/{m}',
+                                descrip='') for m in range(50)]
+        try:
+            writer.update(results, filename, max_items=1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=update, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    items = etree.parse(filename).findall('channel/item')
+    assert 50 <= len(items) <= 400
+    assert sorted(os.listdir(tmp_path)) == ['feed.xml', 'feed.xml.idx']
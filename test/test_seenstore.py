@@ -0,0 +1,63 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+from feedgen.filters import SeenStore
+from feedgen.parsers import ParserResult
+
+
+def results(count:int, start:int=0) -> list:
+    return [ParserResult(title=f'Story {n}', link=f'https://a.com/{n}',
+                         descrip='')
+            for n in range(start, start+count)]
+
+
+def test_first_result_is_not_held_back():
+    pulled = []
+    def source():
+        for result in results(10):
+            pulled.append(result)
+            yield result
+
+    with SeenStore(':memory:', batch_size=100) as store:
+        first = next(store.filter(source()))
+        assert first.title == 'Story 0'
+        assert len(pulled) == 1
+
+
+def test_unseen_results_are_returned_once():
+    with SeenStore(':memory:', batch_size=4) as store:
+        batch = results(10) + results(3)
+        assert [res.title for res in store.filter(batch)] == [f'Story {n}' for n in range(10)]
+        assert [res.title for res in store.filter(results(12))] == ['Story 10', 'Story 11']
+        assert len(store) == 12
+
+
+def test_results_are_marked_once_taken():
+    with SeenStore(':memory:', batch_size=4) as store:
+        filtered = store.filter(results(10))
+        taken    = [next(filtered) for _ in range(5)]
+        filtered.close()
+
+        # The fifth result was yielded, but the consumer never came back
+        assert store.seen(taken) == [True] * 4 + [False]
+        assert len(store) == 4
+
+
+def test_results_are_not_marked_when_the_consumer_fails():
+    with SeenStore(':memory:') as store:
+        try:
+            for result in store.filter(results(3)):
+                raise RuntimeError('write failed')
+        except RuntimeError:
+            pass
+
+        assert len(store) == 0
+
+
+def test_unmarked_results_can_be_added_later():
+    with SeenStore(':memory:') as store:
+        fresh = list(store.filter(results(5), mark=False))
+        assert len(store) == 0
+        store.add(fresh)
+        assert list(store.filter(results(5))) == []
@@ -0,0 +1,59 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+from lxml.html import fromstring
+
+from feedgen.parsers import CSSAttribute, CSSInnerText, SelectorCache, TagConfig, selector_cache
+
+
+def test_repeated_selectors_hit_the_cache():
+    cache = SelectorCache()
+    first = cache.get('div.story')
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'size': 1}
+
+    assert cache.get('div.story') is first
+    assert cache.get('div.story') is first
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 1}
+
+    # The attribute is part of the key
+    assert cache.get('div.story', 'href') is not first
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'size': 2}
+
+
+def test_cache_is_bounded():
+    cache = SelectorCache(max_size=3)
+    for n in range(10):
+        cache.get(f'div.story{n}')
+    assert cache.stats() == {'hits': 0, 'misses': 10, 'size': 3}
+
+    # The most recently used selectors are kept
+    cache.get('div.story7')
+    cache.get('div.story10')
+    assert cache.stats() == {'hits': 1, 'misses': 11, 'size': 3}
+    assert list(key for key,_ in cache.selectors) == ['div.story9', 'div.story7', 'div.story10']
+
+    cache.get('div.story8')
+    assert cache.stats()['misses'] == 12
+
+
+def test_parsers_share_compiled_selectors():
+    before = selector_cache.stats()
+
+    def config():
+        return TagConfig(container=CSSInnerText('article.test-story'),
+                         title=CSSInnerText('h4.test-title'),
+                         link=CSSAttribute('a.test-link', 'href'),
+                         descrip=CSSInnerText('p.test-descrip', default=''))
+
+    first, second = config(), config()
+    after = selector_cache.stats()
+    assert after['misses'] - before['misses'] == 4
+    assert after['hits'] - before['hits'] == 4
+    assert first.title.selector is second.title.selector
+
+    # The plan is built from the cached translations
+    html = fromstring('<div><article class="test-story"><h4 class="test-title">Cats</h4>'
+                      '<a class="test-link" href="/cats">more</a></article></div>')
+    div  = first.container(html)[0]
+    assert second.compile().extract(div) == ['Cats', '/cats', '']
@@ -0,0 +1,84 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import asyncio
+
+import pytest
+
+from feedgen.parsers import BingNews, HttpCache, HttpTransport, RateLimiter, aio
+from feedgen.testing import NewsServer
+
+SITES = [f'site{n}.example.com' for n in range(12)]
+
+
+@pytest.fixture
+def transport():
+    transport = HttpTransport(limiter=RateLimiter())
+    yield transport
+    transport.close()
+
+
+def search(server:NewsServer, transport:HttpTransport, **kwargs) -> BingNews:
+    parser = server.point(BingNews(transport=transport, max_query_length=200, **kwargs))
+    parser.search_term('cats')
+    for site in SITES:
+        parser.add_site(site)
+    return parser
+
+
+def queries(results) -> set:
+    """ Search text of the query each synthetic result came from """
+    return {res.title.rsplit(' story ', 1)[0] for res in results}
+
+
+def test_sites_are_split_into_chunks(transport):
+    with NewsServer(total=5) as server:
+        parser  = search(server, transport, limit=100)
+        chunks  = parser.site_chunks()
+        results = parser.parse_html()
+
+        assert len(chunks) > 1
+        assert sorted(sum(chunks, [])) == sorted(SITES)
+        assert queries(results) == {parser.site_query(sites) for sites in chunks}
+        assert len(results) == 5 * len(chunks)
+        assert server.requests == len(chunks)
+
+
+def test_chunks_are_cached(transport, tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    with NewsServer(total=5) as server:
+        first  = search(server, transport, limit=100, cache=cache).parse_html()
+        chunks = search(server, transport).site_chunks()
+        assert len(cache.index) == len(chunks)
+
+        parsed = []
+        monkeypatch.setattr(BingNews, 'extract', lambda self, html: parsed.append(html))
+        again = search(server, transport, limit=100, cache=cache).parse_cached()
+        assert [res.title for res in again] == [res.title for res in first]
+        assert parsed == []
+
+
+def test_chunks_are_streamed(transport):
+    with NewsServer(total=5) as server:
+        plain    = search(server, transport, limit=100).parse_html()
+        streamed = search(server, transport, limit=100, stream=True).parse_html()
+        assert [res.title for res in streamed] == [res.title for res in plain]
+
+
+def test_async_queries_use_the_chunks(transport, monkeypatch):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    with NewsServer(total=5) as server:
+        parser  = search(server, transport, limit=100)
+        results = asyncio.run(parser.aparse_html())
+        assert queries(results) == {parser.site_query(sites) for sites in parser.site_chunks()}
+        assert len(results) == 5 * len(parser.site_chunks())
+
+
+def test_async_queries_page_through_the_chunks(transport, monkeypatch):
+    monkeypatch.setattr(aio, 'aiohttp', None)
+    with NewsServer(total=15) as server:
+        parser  = search(server, transport, limit=100)
+        results = asyncio.run(parser.aparse_html())
+        assert [res.title for res in results] == [res.title for res in parser.parse_html()]
+        assert len(results) == 15 * len(parser.site_chunks())
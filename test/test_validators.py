@@ -0,0 +1,87 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import pytest
+from lxml import etree
+
+from conftest import make_parser
+from feedgen.testing import ReplayTransport
+from feedgen.validators import RssValidator
+from feedgen.writers import RssFeed
+
+
+@pytest.fixture(scope='module')
+def validator():
+    return RssValidator()
+
+
+@pytest.fixture
+def feed(recorded, tmp_path):
+    """ RSS feed file written from replayed results """
+    store, live = recorded
+    base, _  = live['yahoonews']
+    parser   = make_parser('yahoonews', base, ReplayTransport(store), limit=30)
+    filename = str(tmp_path / 'feed.xml')
+    RssFeed('Cats', 'https://example.com', 'News about cats').write(parser.iter_results(),
+                                                                    filename, stream=True)
+    return filename
+
+
+def read(filename:str) -> bytes:
+    with open(filename, 'rb') as fl:
+        return fl.read()
+
+
+def test_valid_feed(validator, feed):
+    assert validator.validate(feed)
+    assert validator.validate(read(feed))
+    assert validator.validate(etree.parse(feed).getroot())
+    assert validator.errors(feed) == []
+    assert validator.validate_stream(feed) == []
+
+
+def test_schema_errors(validator, feed):
+    bad = read(feed).replace(b'<title>cats story 2</title>', b'<bogus>cats story 2</bogus>', 1)
+    with pytest.raises(etree.DocumentInvalid):
+        validator.validate(bad)
+
+    errors = validator.errors(bad)
+    assert [error['kind'] for error in errors] == ['schema']
+    assert "'bogus'" in errors[0]['message']
+
+    # The streaming validator also reports which item the error is in
+    streamed = validator.validate_stream(bad)
+    assert [(error['kind'], error['item']) for error in streamed] == [('schema', 1)]
+
+
+def test_header_after_items(validator, feed):
+    bad = read(feed).replace(b'</channel>', b'<title>Late</title></channel>')
+    assert validator.errors(bad) != []
+    assert any(error['item'] is None for error in validator.validate_stream(bad))
+
+
+def test_syntax_errors(validator, feed):
+    broken = read(feed)[:-30]
+    assert [error['kind'] for error in validator.errors(broken)] == ['syntax']
+    assert [error['kind'] for error in validator.validate_stream(broken)] == ['syntax']
+
+
+def test_stream_stops_at_max_errors(validator, feed):
+    bad = read(feed).replace(b'<title>cats story', b'<bogus>cats story') \
+                    .replace(b'</title>\n      <link>', b'</bogus>\n      <link>')
+    assert len(validator.errors(bad)) == 25
+    assert len(validator.validate_stream(bad, max_errors=3)) == 3
+
+
+def test_validate_many(validator, feed, tmp_path):
+    broken  = str(tmp_path / 'broken.xml')
+    missing = str(tmp_path / 'missing.xml')
+    with open(broken, 'wb') as fl:
+        fl.write(read(feed)[:-30])
+
+    report = validator.validate_many([feed, broken, missing], processes=2)
+    assert list(report) == [feed, broken, missing]
+    assert report[feed] == []
+    assert [error['kind'] for error in report[broken]] == ['syntax']
+    assert [error['kind'] for error in report[missing]] == ['io']
@@ -0,0 +1,147 @@
+# Update the path so that we pull from the current version of the code
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__),'..'))
+
+import json
+
+import pytest
+from lxml import etree
+
+from conftest import make_parser
+from feedgen.parsers import ParserResult
+from feedgen.testing import ReplayTransport
+from feedgen.writers import JsonFeed, RssFeed
+
+
+def replayed(recorded, parser_type:str='yahoonews', limit:int=30):
+    """ Lazily yielded results of a replayed query """
+    store, live = recorded
+    base, _ = live[parser_type]
+    return make_parser(parser_type, base, ReplayTransport(store), limit=limit).iter_results()
+
+
+def rss_links(filename:str) -> list:
+    return [item.findtext('link') for item in etree.parse(filename).iterfind('channel/item')]
+
+
+def json_links(filename:str) -> list:
+    with open(filename) as fl:
+        return [item['url'] for item in json.load(fl)['items']]
+
+
+@pytest.fixture
+def rss():
+    return RssFeed('Cats', 'https://example.com', 'News about cats')
+
+
+@pytest.fixture
+def jsn():
+    return JsonFeed('Cats', 'https://example.com', 'News about cats')
+
+
+@pytest.mark.parametrize('pretty_print', [True, False])
+def test_rss_stream_matches_feed_str(recorded, rss, tmp_path, pretty_print):
+    results  = list(replayed(recorded))
+    filename = str(tmp_path / 'feed.xml')
+    rss.write(iter(results), filename, pretty_print=pretty_print, stream=True)
+
+    with open(filename, 'rb') as fl:
+        assert fl.read() == rss.feed_str(results, pretty_print=pretty_print)
+    assert len(rss_links(filename)) == 25
+
+
+@pytest.mark.parametrize('pretty_print', [True, False])
+def test_json_stream_matches_write(recorded, jsn, tmp_path, pretty_print):
+    results = list(replayed(recorded))
+    streamed, written = str(tmp_path / 'stream.json'), str(tmp_path / 'write.json')
+    jsn.write(iter(results), streamed, pretty_print=pretty_print, stream=True)
+    jsn.write(results, written, pretty_print=pretty_print)
+
+    with open(streamed) as fl1, open(written) as fl2:
+        assert json.load(fl1) == json.load(fl2)
+
+
+def test_ndjson(recorded, jsn, tmp_path):
+    filename = str(tmp_path / 'feed.ndjson')
+    jsn.write_ndjson(replayed(recorded), filename)
+
+    with open(filename) as fl:
+        items = [json.loads(line) for line in fl]
+    assert len(items) == 25
+    assert items[0]['title'] == 'cats story 1'
+
+
+@pytest.mark.parametrize('kind', ['rss', 'json'])
+def test_update_merges_new_items(recorded, rss, jsn, tmp_path, kind):
+    writer, links = (rss, rss_links) if kind == 'rss' else (jsn, json_links)
+    filename = str(tmp_path / 'feed')
+
+    # The first update creates the feed
+    assert writer.update(replayed(recorded, limit=10), filename) == 10
+    first = links(filename)
+
+    # Items already in the feed are skipped and new ones go to the head
+    assert writer.update(replayed(recorded, limit=20), filename) == 10
+    assert links(filename)[10:] == first
+    assert writer.update(replayed(recorded, limit=20), filename) == 0
+
+    # The oldest items are dropped past `max_items`
+    assert writer.update(replayed(recorded, limit=25), filename, max_items=12) == 5
+    assert len(links(filename)) == 12
+
+    # A missing index is rebuilt from the feed
+    kept = links(filename)
+    os.remove(filename + '.idx')
+    assert writer.update([], filename, max_items=12) == 0
+    assert links(filename) == kept
+    assert os.path.isfile(filename + '.idx')
+
+
+@pytest.mark.parametrize('kind', ['rss', 'json'])
+def test_update_matches_write(recorded, rss, jsn, tmp_path, kind):
+    writer = rss if kind == 'rss' else jsn
+    updated, written = str(tmp_path / 'updated'), str(tmp_path / 'written')
+    writer.update(replayed(recorded), updated)
+    writer.write(replayed(recorded), written)
+
+    with open(updated, 'rb') as fl1, open(written, 'rb') as fl2:
+        if kind == 'rss':
+            assert fl1.read() == fl2.read()
+        else:
+            assert json.load(fl1) == json.load(fl2)
+
+
+def stories(prefix:str, count:int) -> list:
+    return [ParserResult(title=f'{prefix} {n}', link=f'https://example.com/{prefix}/{n}',
+                         descrip='') for n in range(count)]
+
+
+def test_update_file_permissions(rss, tmp_path):
+    filename = str(tmp_path / 'feed.xml')
+    rss.update(stories('a', 3), filename)
+    assert os.stat(filename).st_mode & 0o777 == 0o644
+
+    # Existing files keep their permissions
+    os.chmod(filename, 0o600)
+    rss.update(stories('b', 3), filename)
+    assert os.stat(filename).st_mode & 0o777 == 0o600
+
+
+def test_update_while_the_feed_is_replaced(rss, tmp_path):
+    filename = str(tmp_path / 'feed.xml')
+    rss.update(stories('a', 20), filename)
+
+    def replaced_midway():
+        # Another update replaces the feed after this one has read its index
+        rss.update(stories('b', 5), filename)
+        yield from stories('c', 3)
+
+    rss.update(replaced_midway(), filename)
+
+    # The last update wins, and keeps the items it read
+    expected = [res.link for res in stories('c', 3) + stories('a', 20)]
+    assert rss_links(filename) == expected
+
+    # The index matches the feed, so the next update copies the right bytes
+    rss.update(stories('d', 1), filename)
+    assert rss_links(filename) == [stories('d', 1)[0].link] + expected